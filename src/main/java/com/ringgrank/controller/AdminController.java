@@ -0,0 +1,111 @@
+package com.ringgrank.controller;
+
+import java.util.List;
+
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.http.HttpStatus;
+import org.springframework.http.ResponseEntity;
+import org.springframework.validation.annotation.Validated;
+import org.springframework.web.bind.annotation.DeleteMapping;
+import org.springframework.web.bind.annotation.GetMapping;
+import org.springframework.web.bind.annotation.PathVariable;
+import org.springframework.web.bind.annotation.PutMapping;
+import org.springframework.web.bind.annotation.RequestMapping;
+import org.springframework.web.bind.annotation.RestController;
+
+import com.ringgrank.dto.ExpiryMetricsResponse;
+import com.ringgrank.dto.IngestionMetricsResponse;
+import com.ringgrank.dto.WindowResponse;
+import com.ringgrank.service.ScoreIngestionService;
+import com.ringgrank.service.WindowAdminService;
+
+import jakarta.validation.constraints.Min;
+
+/**
+ * Admin endpoints for managing the sliding windows of a game at runtime and
+ * monitoring their expiry and score ingestion.
+ */
+@RestController
+@RequestMapping("/api/v1/admin")
+@Validated
+public class AdminController {
+
+    private final WindowAdminService windowAdminService;
+    private final ScoreIngestionService scoreIngestionService;
+
+    private static final long MIN_ID_VALUE = 1L; // Game IDs must be positive.
+
+    @Autowired
+    public AdminController(WindowAdminService windowAdminService, ScoreIngestionService scoreIngestionService) {
+        this.windowAdminService = windowAdminService;
+        this.scoreIngestionService = scoreIngestionService;
+    }
+
+    /**
+     * Lists the windows of a game with their status.
+     *
+     * @param gameId The numeric ID of the game. Must be a positive number.
+     * @return ResponseEntity containing the game's windows.
+     */
+    @GetMapping("/games/{gameId}/windows")
+    public ResponseEntity<List<WindowResponse>> getWindows(
+            @PathVariable @Min(value = MIN_ID_VALUE, message = "Game ID must be a positive number.") Long gameId) {
+        return ResponseEntity.ok(windowAdminService.getWindows(gameId));
+    }
+
+    /**
+     * Adds a window (e.g., "7d") to a game. A new window is backfilled from
+     * the game's existing scores in the background and is served once its
+     * status is ACTIVE.
+     *
+     * @param gameId The numeric ID of the game. Must be a positive number.
+     * @param window The window to add.
+     * @return HTTP 202 if the window was added, HTTP 200 if it already existed.
+     */
+    @PutMapping("/games/{gameId}/windows/{window}")
+    public ResponseEntity<WindowResponse> addWindow(
+            @PathVariable @Min(value = MIN_ID_VALUE, message = "Game ID must be a positive number.") Long gameId,
+            @PathVariable String window) {
+        boolean added = windowAdminService.addWindow(gameId, window);
+        return ResponseEntity.status(added ? HttpStatus.ACCEPTED : HttpStatus.OK)
+                .body(windowAdminService.getWindow(gameId, window));
+    }
+
+    /**
+     * Removes a window from a game.
+     *
+     * @param gameId The numeric ID of the game. Must be a positive number.
+     * @param window The window to remove.
+     * @return HTTP 204 once removed.
+     */
+    @DeleteMapping("/games/{gameId}/windows/{window}")
+    public ResponseEntity<Void> removeWindow(
+            @PathVariable @Min(value = MIN_ID_VALUE, message = "Game ID must be a positive number.") Long gameId,
+            @PathVariable String window) {
+        windowAdminService.removeWindow(gameId, window);
+        return ResponseEntity.noContent().build();
+    }
+
+    /**
+     * Reports how far window expiry is behind: the timing wheel's lag, how long
+     * the oldest due score has been waiting for removal, and the backlog.
+     *
+     * @return ResponseEntity containing the expiry metrics.
+     */
+    @GetMapping("/metrics/expiry")
+    public ResponseEntity<ExpiryMetricsResponse> getExpiryMetrics() {
+        return ResponseEntity.ok(windowAdminService.getExpiryMetrics());
+    }
+
+    /**
+     * Reports the state of the ingestion queues: how many accepted scores are
+     * waiting for a writer, and how many were rejected because a queue was
+     * full.
+     *
+     * @return ResponseEntity containing the ingestion metrics.
+     */
+    @GetMapping("/metrics/ingestion")
+    public ResponseEntity<IngestionMetricsResponse> getIngestionMetrics() {
+        return ResponseEntity.ok(scoreIngestionService.getIngestionMetrics());
+    }
+}
@@ -0,0 +1,47 @@
+package com.ringgrank.controller;
+
+import org.springframework.http.HttpHeaders;
+import org.springframework.http.HttpStatus;
+import org.springframework.http.ProblemDetail;
+import org.springframework.http.ResponseEntity;
+import org.springframework.web.bind.annotation.ExceptionHandler;
+import org.springframework.web.bind.annotation.RestControllerAdvice;
+
+import com.ringgrank.exception.GameNotFoundException;
+import com.ringgrank.exception.IngestionQueueFullException;
+import com.ringgrank.exception.InvalidScoreException;
+import com.ringgrank.exception.InvalidWindowException;
+import com.ringgrank.exception.UserNotFoundInLeaderboardException;
+import com.ringgrank.exception.WindowBackfillInProgressException;
+
+/**
+ * Maps the service's exceptions to HTTP responses with an RFC 7807 problem
+ * body.
+ */
+@RestControllerAdvice
+public class ApiExceptionHandler {
+    // Seconds a client rejected by backpressure is asked to wait
+    private static final String RETRY_AFTER_SECONDS = "1";
+
+    @ExceptionHandler({ GameNotFoundException.class, UserNotFoundInLeaderboardException.class })
+    public ProblemDetail handleNotFound(RuntimeException e) {
+        return ProblemDetail.forStatusAndDetail(HttpStatus.NOT_FOUND, e.getMessage());
+    }
+
+    @ExceptionHandler({ InvalidScoreException.class, InvalidWindowException.class })
+    public ProblemDetail handleBadRequest(RuntimeException e) {
+        return ProblemDetail.forStatusAndDetail(HttpStatus.BAD_REQUEST, e.getMessage());
+    }
+
+    @ExceptionHandler(WindowBackfillInProgressException.class)
+    public ProblemDetail handleBackfillInProgress(WindowBackfillInProgressException e) {
+        return ProblemDetail.forStatusAndDetail(HttpStatus.SERVICE_UNAVAILABLE, e.getMessage());
+    }
+
+    @ExceptionHandler(IngestionQueueFullException.class)
+    public ResponseEntity<ProblemDetail> handleIngestionQueueFull(IngestionQueueFullException e) {
+        return ResponseEntity.status(HttpStatus.TOO_MANY_REQUESTS)
+                .header(HttpHeaders.RETRY_AFTER, RETRY_AFTER_SECONDS)
+                .body(ProblemDetail.forStatusAndDetail(HttpStatus.TOO_MANY_REQUESTS, e.getMessage()));
+    }
+}
@@ -3,18 +3,30 @@ package com.ringgrank.controller;
 import java.util.List;
 
 import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.http.CacheControl;
+import org.springframework.http.HttpHeaders;
+import org.springframework.http.HttpStatus;
+import org.springframework.http.MediaType;
 import org.springframework.http.ResponseEntity;
 import org.springframework.validation.annotation.Validated;
 import org.springframework.web.bind.annotation.GetMapping;
 import org.springframework.web.bind.annotation.PathVariable;
+import org.springframework.web.bind.annotation.PostMapping;
+import org.springframework.web.bind.annotation.RequestBody;
+import org.springframework.web.bind.annotation.RequestHeader;
 import org.springframework.web.bind.annotation.RequestMapping;
 import org.springframework.web.bind.annotation.RequestParam;
 import org.springframework.web.bind.annotation.RestController;
 
+import com.ringgrank.dto.GameRanksResponse;
 import com.ringgrank.dto.LeaderboardEntryResponse;
 import com.ringgrank.dto.UserRankResponse;
+import com.ringgrank.dto.UserRanksRequest;
+import com.ringgrank.dto.UserRanksResponse;
 import com.ringgrank.service.LeaderboardQueryService;
+import com.ringgrank.service.PlayerRankService;
 
+import jakarta.validation.Valid;
 import jakarta.validation.constraints.Max;
 import jakarta.validation.constraints.Min;
 import jakarta.validation.constraints.Pattern;
@@ -30,49 +42,96 @@ import jakarta.validation.constraints.Pattern;
 public class LeaderboardController {
 
     private final LeaderboardQueryService leaderboardQueryService;
+    private final PlayerRankService playerRankService;
 
     // Define constants for validation limits to maintain consistency and ease of
     // modification.
     private static final int MAX_LEADERBOARD_LIMIT = 1000;
     private static final int MIN_LEADERBOARD_LIMIT = 1;
+    private static final int MAX_NEIGHBOR_RADIUS = 500;
     private static final long MIN_ID_VALUE = 1L; // Game and User IDs must be positive.
     private static final String WINDOW_REGEX = "^([1-9][0-9]*[hmMdsS])?$"; // Allows formats like "24h", "7d", "30m", or
                                                                            // empty for all-time.
+    private static final String PRECISION_EXACT = "exact";
+    private static final String PRECISION_APPROX = "approx";
+    private static final String PRECISION_REGEX = "^(" + PRECISION_EXACT + "|" + PRECISION_APPROX + ")$";
 
     /**
      * Constructor for LeaderboardController.
      * 
      * @param leaderboardQueryService Service to handle leaderboard data retrieval.
+     * @param playerRankService Service to look up a user's ranks across windows.
      */
     @Autowired
-    public LeaderboardController(LeaderboardQueryService leaderboardQueryService) {
+    public LeaderboardController(LeaderboardQueryService leaderboardQueryService,
+            PlayerRankService playerRankService) {
         this.leaderboardQueryService = leaderboardQueryService;
+        this.playerRankService = playerRankService;
     }
 
     /**
-     * Endpoint to get the top K leaders for a game.
+     * Endpoint to get the top K leaders for a game, or any page of the
+     * leaderboard (e.g., ranks 50,001 to 50,050 with offset=50000, limit=50).
      * Supports all-time leaderboards and sliding-window leaderboards.
      * 
      * @param gameId The numeric ID of the game. Must be a positive number.
      * @param limit  The number of top players to return (K). Must be between
      *               MIN_LEADERBOARD_LIMIT and MAX_LEADERBOARD_LIMIT.
+     * @param offset Number of ranks to skip (default 0). The page is found by
+     *               seeking to rank offset + 1 (O(log N); a selection over
+     *               the buckets of a bucketed window), not by walking from
+     *               the top.
      * @param window Optional sliding window duration (e.g., "24h"). If not
      *               provided, returns all-time leaderboard.
-     * @return ResponseEntity containing a list of top K players or an appropriate
-     *         error response.
+     * @param ifNoneMatch Optional ETag of a previous response. If the top K
+     *                    has not changed since, HTTP 304 is returned without a
+     *                    body.
+     * @return ResponseEntity containing the JSON list of players with their ranks
+     *         (pre-encoded, see LeaderboardQueryService.getLeadersJson) or an
+     *         appropriate error response.
      */
-    @GetMapping("/leaders")
-    public ResponseEntity<List<LeaderboardEntryResponse>> getTopKLeaders(
+    @GetMapping(path = "/leaders", produces = MediaType.APPLICATION_JSON_VALUE)
+    public ResponseEntity<byte[]> getTopKLeaders(
             @PathVariable @Min(value = MIN_ID_VALUE, message = "Game ID must be a positive number.") Long gameId,
 
             @RequestParam(defaultValue = "10") @Min(value = MIN_LEADERBOARD_LIMIT, message = "Limit must be at least "
                     + MIN_LEADERBOARD_LIMIT + ".") @Max(value = MAX_LEADERBOARD_LIMIT, message = "Limit cannot exceed "
                             + MAX_LEADERBOARD_LIMIT + ".") int limit,
 
-            @RequestParam(required = false) @Pattern(regexp = WINDOW_REGEX, message = "Window format is invalid. Examples: '24h', '7d', '30m'. Leave empty for all-time leaderboard.") String window) {
+            @RequestParam(defaultValue = "0") @Min(value = 0, message = "Offset cannot be negative.") int offset,
+
+            @RequestParam(required = false) @Pattern(regexp = WINDOW_REGEX, message = "Window format is invalid. Examples: '24h', '7d', '30m'. Leave empty for all-time leaderboard.") String window,
+
+            @RequestHeader(value = HttpHeaders.IF_NONE_MATCH, required = false) String ifNoneMatch) {
+
+        LeaderboardQueryService.EncodedLeaders leaders = leaderboardQueryService.getLeadersJson(gameId, offset, limit,
+                window);
+        if (leaders.etag() == null) {
+            return ResponseEntity.ok().body(leaders.body());
+        }
+        if (matchesETag(ifNoneMatch, leaders.etag())) {
+            return ResponseEntity.status(HttpStatus.NOT_MODIFIED).eTag(leaders.etag())
+                    .cacheControl(CacheControl.noCache()).build();
+        }
+        // The cached bytes are written to the response as they are
+        return ResponseEntity.ok().eTag(leaders.etag()).cacheControl(CacheControl.noCache()).body(leaders.body());
+    }
 
-        List<LeaderboardEntryResponse> leaders = leaderboardQueryService.getTopKLeaders(gameId, limit, window);
-        return ResponseEntity.ok(leaders);
+    // Weak comparison, as If-None-Match requires
+    private static boolean matchesETag(String ifNoneMatch, String etag) {
+        if (ifNoneMatch == null) {
+            return false;
+        }
+        for (String candidate : ifNoneMatch.split(",")) {
+            String tag = candidate.trim();
+            if (tag.startsWith("W/")) {
+                tag = tag.substring(2);
+            }
+            if (tag.equals("*") || tag.equals(etag)) {
+                return true;
+            }
+        }
+        return false;
     }
 
     /**
@@ -81,8 +140,11 @@ public class LeaderboardController {
      * 
      * @param gameId The numeric ID of the game. Must be a positive number.
      * @param userId The numeric ID of the user. Must be a positive number.
-     * @param window Optional sliding window duration (e.g., "24h"). If not
-     *               provided, returns all-time leaderboard.
+     * @param window    Optional sliding window duration (e.g., "24h"). If not
+     *                  provided, returns all-time leaderboard.
+     * @param precision "exact" (default) walks the sorted index; "approx" answers
+     *                  from the score histogram at a cost independent of the
+     *                  number of players.
      * @return ResponseEntity containing the user's rank and percentile or an
      *         appropriate error response.
      */
@@ -92,9 +154,82 @@ public class LeaderboardController {
 
             @PathVariable @Min(value = MIN_ID_VALUE, message = "User ID must be a positive number.") Long userId,
 
-            @RequestParam(required = false) @Pattern(regexp = WINDOW_REGEX, message = "Window format is invalid. Examples: '24h', '7d', '30m'. Leave empty for all-time leaderboard.") String window) {
+            @RequestParam(required = false) @Pattern(regexp = WINDOW_REGEX, message = "Window format is invalid. Examples: '24h', '7d', '30m'. Leave empty for all-time leaderboard.") String window,
 
-        UserRankResponse rank = leaderboardQueryService.getUserRank(gameId, userId, window);
+            @RequestParam(defaultValue = PRECISION_EXACT) @Pattern(regexp = PRECISION_REGEX, message = "Precision must be 'exact' or 'approx'.") String precision) {
+
+        UserRankResponse rank = leaderboardQueryService.getUserRank(gameId, userId, window,
+                PRECISION_APPROX.equals(precision));
         return ResponseEntity.ok(rank);
     }
-}
\ No newline at end of file
+
+    /**
+     * Endpoint to get the exact ranks of up to 500 users at once (e.g., a
+     * friends list). All of them are resolved under one read lock of the
+     * leaderboard.
+     *
+     * @param gameId The numeric ID of the game. Must be a positive number.
+     * @param userRanksRequest The user IDs to look up.
+     * @param window Optional sliding window duration (e.g., "24h"). If not
+     *               provided, uses the all-time leaderboard.
+     * @return ResponseEntity containing the ranks in rank order and the users
+     *         without a score, or an appropriate error response.
+     */
+    @PostMapping("/ranks")
+    public ResponseEntity<UserRanksResponse> getUserRanks(
+            @PathVariable @Min(value = MIN_ID_VALUE, message = "Game ID must be a positive number.") Long gameId,
+
+            @Valid @RequestBody UserRanksRequest userRanksRequest,
+
+            @RequestParam(required = false) @Pattern(regexp = WINDOW_REGEX, message = "Window format is invalid. Examples: '24h', '7d', '30m'. Leave empty for all-time leaderboard.") String window) {
+
+        return ResponseEntity.ok(leaderboardQueryService.getUserRanks(gameId, userRanksRequest.userIds(), window));
+    }
+
+    /**
+     * Endpoint to get a user's rank, score and percentile in the all-time
+     * leaderboard and every window of the game at once (e.g., a profile
+     * screen). The leaderboards are looked up concurrently.
+     *
+     * @param gameId The numeric ID of the game. Must be a positive number.
+     * @param userId The numeric ID of the user. Must be a positive number.
+     * @return ResponseEntity containing one rank per leaderboard in which the
+     *         user has a score, all-time first, or an appropriate error response.
+     */
+    @GetMapping("/users/{userId}/ranks")
+    public ResponseEntity<GameRanksResponse> getGameRanks(
+            @PathVariable @Min(value = MIN_ID_VALUE, message = "Game ID must be a positive number.") Long gameId,
+
+            @PathVariable @Min(value = MIN_ID_VALUE, message = "User ID must be a positive number.") Long userId) {
+
+        return ResponseEntity.ok(playerRankService.getGameRanks(gameId, userId));
+    }
+
+    /**
+     * Endpoint to get the players ranked around a user ("10 players above and
+     * below me"), found by seeking to the user's rank.
+     * Supports all-time leaderboards and sliding-window leaderboards.
+     *
+     * @param gameId The numeric ID of the game. Must be a positive number.
+     * @param userId The numeric ID of the user. Must be a positive number.
+     * @param radius Number of players to return above and below the user
+     *               (default 10, at most MAX_NEIGHBOR_RADIUS).
+     * @param window Optional sliding window duration (e.g., "24h"). If not
+     *               provided, uses the all-time leaderboard.
+     * @return ResponseEntity containing the players in rank order, including the
+     *         user, or an appropriate error response.
+     */
+    @GetMapping("/users/{userId}/neighbors")
+    public ResponseEntity<List<LeaderboardEntryResponse>> getNeighbors(
+            @PathVariable @Min(value = MIN_ID_VALUE, message = "Game ID must be a positive number.") Long gameId,
+
+            @PathVariable @Min(value = MIN_ID_VALUE, message = "User ID must be a positive number.") Long userId,
+
+            @RequestParam(defaultValue = "10") @Min(value = 0, message = "Radius cannot be negative.") @Max(value =
+                    MAX_NEIGHBOR_RADIUS, message = "Radius cannot exceed " + MAX_NEIGHBOR_RADIUS + ".") int radius,
+
+            @RequestParam(required = false) @Pattern(regexp = WINDOW_REGEX, message = "Window format is invalid. Examples: '24h', '7d', '30m'. Leave empty for all-time leaderboard.") String window) {
+
+        return ResponseEntity.ok(leaderboardQueryService.getNeighbors(gameId, userId, radius, window));
+    }
+}
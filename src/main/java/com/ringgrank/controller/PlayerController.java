@@ -0,0 +1,60 @@
+package com.ringgrank.controller;
+
+import java.util.List;
+
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.http.ResponseEntity;
+import org.springframework.validation.annotation.Validated;
+import org.springframework.web.bind.annotation.GetMapping;
+import org.springframework.web.bind.annotation.PathVariable;
+import org.springframework.web.bind.annotation.RequestMapping;
+import org.springframework.web.bind.annotation.RequestParam;
+import org.springframework.web.bind.annotation.RestController;
+
+import com.ringgrank.dto.PlayerRanksResponse;
+import com.ringgrank.service.PlayerRankService;
+
+import jakarta.validation.constraints.Min;
+import jakarta.validation.constraints.NotNull;
+import jakarta.validation.constraints.Size;
+
+/**
+ * Controller for queries about one player across games.
+ * All IDs (gameId, userId) are expected to be numeric.
+ */
+@RestController
+@RequestMapping("/api/v1/users/{userId}")
+@Validated
+public class PlayerController {
+
+    private final PlayerRankService playerRankService;
+
+    private static final int MAX_GAMES = 50;
+    private static final long MIN_ID_VALUE = 1L; // Game and User IDs must be positive.
+
+    @Autowired
+    public PlayerController(PlayerRankService playerRankService) {
+        this.playerRankService = playerRankService;
+    }
+
+    /**
+     * Endpoint to get a user's rank, score and percentile in the all-time
+     * leaderboard and every window of several games at once. The leaderboards
+     * are looked up concurrently.
+     *
+     * @param userId The numeric ID of the user. Must be a positive number.
+     * @param gameIds The games to look up (e.g., gameIds=1,2), at most MAX_GAMES.
+     * @return ResponseEntity containing the ranks per game in request order and
+     *         the games that do not exist.
+     */
+    @GetMapping("/ranks")
+    public ResponseEntity<PlayerRanksResponse> getPlayerRanks(
+            @PathVariable @Min(value = MIN_ID_VALUE, message = "User ID must be a positive number.") Long userId,
+
+            @RequestParam @Size(min = 1, max = MAX_GAMES, message = "Between 1 and " + MAX_GAMES
+                    + " game IDs are allowed.") List<@NotNull @Min(value = MIN_ID_VALUE, message =
+                            "Game ID must be a positive number.") Long> gameIds) {
+
+        return ResponseEntity.ok(playerRankService.getPlayerRanks(userId, gameIds));
+    }
+}
@@ -1,10 +1,15 @@
 package com.ringgrank.controller;
 
+import com.ringgrank.dto.BatchScoreSubmissionResponse;
 import com.ringgrank.dto.ScoreSubmissionRequest;
 import com.ringgrank.service.ScoreIngestionService;
 import jakarta.validation.Valid;
+import java.io.IOException;
+import java.io.InputStream;
+import java.util.List;
 import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.http.HttpStatus;
+import org.springframework.http.MediaType;
 import org.springframework.http.ResponseEntity;
 import org.springframework.web.bind.annotation.PostMapping;
 import org.springframework.web.bind.annotation.RequestBody;
@@ -16,7 +21,7 @@ import org.springframework.web.bind.annotation.RestController;
  * All IDs (userId, gameId) are expected to be numeric.
  */
 @RestController
-@RequestMapping("/api/v1/scores")
+@RequestMapping("/api/v1")
 public class ScoreController {
 
     private final ScoreIngestionService scoreIngestionService;
@@ -34,15 +39,43 @@ public class ScoreController {
      * Endpoint to submit a player's score.
      * Validates the submission request before processing.
      * @param scoreSubmissionRequest The score details with numeric IDs.
-     * @return ResponseEntity indicating acceptance (HTTP 202).
+     * @return ResponseEntity indicating acceptance (HTTP 202), or HTTP 429 if the
+     *         ingestion queue is full.
      */
-    @PostMapping
+    @PostMapping("/scores")
     public ResponseEntity<Void> submitScore(@Valid @RequestBody ScoreSubmissionRequest scoreSubmissionRequest) {
         // The @Valid annotation triggers Bean Validation on the ScoreSubmissionRequest DTO.
         // Validation rules (e.g., @NotNull, @Min) are defined within the DTO itself.
         scoreIngestionService.processScore(scoreSubmissionRequest);
-        // HTTP 202 Accepted is returned to indicate the request has been accepted for processing,
-        // which might involve asynchronous operations like WAL writes.
+        // HTTP 202 Accepted is returned to indicate the request has been accepted for processing:
+        // with async ingestion the score is queued, and the WAL write and leaderboard update follow.
         return ResponseEntity.status(HttpStatus.ACCEPTED).build();
     }
+
+    /**
+     * Endpoint to submit many scores in one request, as a JSON array.
+     * Each score is validated on its own; the valid ones are written to the WAL
+     * together and applied one game at a time before the response is sent.
+     * @param scoreSubmissionRequests The scores to record.
+     * @return ResponseEntity with the number of recorded scores and the index and
+     *         reason of every rejected one (HTTP 200).
+     */
+    @PostMapping(path = "/scores:batch", consumes = MediaType.APPLICATION_JSON_VALUE)
+    public ResponseEntity<BatchScoreSubmissionResponse> submitScores(
+            @RequestBody List<ScoreSubmissionRequest> scoreSubmissionRequests) {
+        return ResponseEntity.ok(scoreIngestionService.processScores(scoreSubmissionRequests));
+    }
+
+    /**
+     * Endpoint to stream scores as newline-delimited JSON, one score per line.
+     * Scores are recorded in chunks while the body is read, so a single request
+     * can carry any number of them.
+     * @param body The request body.
+     * @return ResponseEntity with the number of recorded scores and the index and
+     *         reason of every rejected one (HTTP 200).
+     */
+    @PostMapping(path = "/scores:batch", consumes = MediaType.APPLICATION_NDJSON_VALUE)
+    public ResponseEntity<BatchScoreSubmissionResponse> submitScoreStream(InputStream body) throws IOException {
+        return ResponseEntity.ok(scoreIngestionService.processScoreStream(body));
+    }
 } 
\ No newline at end of file
@@ -0,0 +1,16 @@
+package com.ringgrank.dto;
+
+import java.util.List;
+
+/**
+ * Result of a batch score submission. Every item not listed in rejections was
+ * recorded.
+ */
+public record BatchScoreSubmissionResponse(int accepted, int rejected, List<Rejection> rejections) {
+
+    /**
+     * @param index position of the item in the submitted batch, starting at 0
+     */
+    public record Rejection(int index, String error) {
+    }
+}
@@ -0,0 +1,9 @@
+package com.ringgrank.dto;
+
+/**
+ * @param oldestOverdueMs how long the oldest expired score still in its window
+ *                        has been overdue; 0 when expiry is keeping up
+ */
+public record ExpiryMetricsResponse(long wheelLagMs, long oldestOverdueMs, long pendingScores, long scheduledScores,
+        int workers) {
+}
@@ -0,0 +1,10 @@
+package com.ringgrank.dto;
+
+import java.util.List;
+
+/**
+ * @param ranks the user's rank in the all-time leaderboard and every window of
+ *              the game in which they have a score
+ */
+public record GameRanksResponse(long gameId, List<WindowRankResponse> ranks) {
+}
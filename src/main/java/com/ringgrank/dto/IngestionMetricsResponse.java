@@ -0,0 +1,13 @@
+package com.ringgrank.dto;
+
+/**
+ * @param queueDepth          submissions queued but not yet taken by a writer;
+ *                            a batch's share for one writer counts once
+ * @param maxWriterQueueDepth depth of the fullest writer's queue; scores for
+ *                            its games are rejected once it reaches
+ *                            writerQueueCapacity
+ * @param failedScores        accepted scores that could not be recorded
+ */
+public record IngestionMetricsResponse(boolean async, int writers, long queueDepth, long maxWriterQueueDepth,
+        long writerQueueCapacity, long acceptedScores, long rejectedScores, long failedScores) {
+}
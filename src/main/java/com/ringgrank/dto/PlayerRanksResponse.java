@@ -0,0 +1,9 @@
+package com.ringgrank.dto;
+
+import java.util.List;
+
+/**
+ * @param gamesNotFound requested games that do not exist
+ */
+public record PlayerRanksResponse(long userId, List<GameRanksResponse> games, List<Long> gamesNotFound) {
+}
@@ -0,0 +1,14 @@
+package com.ringgrank.dto;
+
+import java.util.List;
+
+import jakarta.validation.constraints.Min;
+import jakarta.validation.constraints.NotEmpty;
+import jakarta.validation.constraints.NotNull;
+import jakarta.validation.constraints.Size;
+
+public record UserRanksRequest(
+        @NotEmpty(message = "At least one user ID is required.")
+        @Size(max = 500, message = "At most 500 user IDs can be looked up at once.")
+        List<@NotNull @Min(value = 1, message = "User IDs must be positive numbers.") Long> userIds) {
+}
@@ -0,0 +1,10 @@
+package com.ringgrank.dto;
+
+import java.util.List;
+
+/**
+ * @param ranks    ranks of the users that have a score, in rank order
+ * @param notFound requested users without a score in the leaderboard
+ */
+public record UserRanksResponse(List<UserRankResponse> ranks, List<Long> notFound) {
+}
@@ -0,0 +1,7 @@
+package com.ringgrank.dto;
+
+/**
+ * @param window the window, e.g. "24h"; null for the all-time leaderboard
+ */
+public record WindowRankResponse(String window, int rank, long score, double percentile, long timestamp) {
+}
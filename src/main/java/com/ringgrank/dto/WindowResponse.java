@@ -0,0 +1,8 @@
+package com.ringgrank.dto;
+
+/**
+ * @param status ACTIVE, or BACKFILLING while a window added at runtime is being
+ *               filled with existing scores
+ */
+public record WindowResponse(String window, long durationSeconds, String status, int totalPlayers) {
+}
@@ -0,0 +1,15 @@
+package com.ringgrank.exception;
+
+/**
+ * Exception thrown when a score cannot be queued for ingestion because the
+ * queue is full.
+ */
+public class IngestionQueueFullException extends RuntimeException {
+    public IngestionQueueFullException(String message) {
+        super(message);
+    }
+
+    public IngestionQueueFullException(String message, Throwable cause) {
+        super(message, cause);
+    }
+}
@@ -0,0 +1,15 @@
+package com.ringgrank.exception;
+
+/**
+ * Exception thrown when a window added at runtime is queried before its
+ * backfill has finished.
+ */
+public class WindowBackfillInProgressException extends RuntimeException {
+    public WindowBackfillInProgressException(String message) {
+        super(message);
+    }
+
+    public WindowBackfillInProgressException(String message, Throwable cause) {
+        super(message, cause);
+    }
+}
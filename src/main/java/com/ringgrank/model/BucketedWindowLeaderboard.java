@@ -0,0 +1,305 @@
+package com.ringgrank.model;
+
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.Iterator;
+import java.util.List;
+import java.util.Map;
+import java.util.NoSuchElementException;
+import java.util.PriorityQueue;
+import java.util.TreeMap;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ConcurrentSkipListMap;
+
+/**
+ * Sliding-window leaderboard that groups entries into time buckets by
+ * timestamp ({@link #BUCKETS_PER_WINDOW} per window, e.g. hourly buckets for
+ * "24h") instead of expiring every entry on its own. A user's current entry
+ * lives in the bucket of its timestamp. Once a bucket has aged out of the
+ * window it is dropped as a whole, so expiry costs O(1) per bucket instead of
+ * one scheduled removal per score.
+ * Queries merge the buckets: a rank is the number of entries ahead of the
+ * user summed over all buckets, and top-K is a k-way merge. A page further
+ * down first finds where its first rank falls in every bucket, by selection,
+ * and merges from there.
+ * The window is bucket-aligned: an entry stays visible for up to one bucket
+ * longer than the window duration.
+ */
+public class BucketedWindowLeaderboard extends Leaderboard {
+    private static final long serialVersionUID = 1L;
+
+    public static final int BUCKETS_PER_WINDOW = 24;
+
+    private final long windowMillis;
+    private final long bucketMillis;
+
+    // Key: bucket start time. Concurrent maps, so that user score lookups can
+    // scan the buckets without the leaderboard lock.
+    private transient ConcurrentSkipListMap<Long, Bucket> buckets;
+
+    private static final class Bucket {
+        private final IndexedSkipList<ScoreEntry> sortedScores = new IndexedSkipList<>(ScoreEntry::compareTo);
+        private final Map<Long, ScoreEntry> userScores = new ConcurrentHashMap<>();
+    }
+
+    public BucketedWindowLeaderboard(Duration window, boolean histogramEnabled) {
+        super(histogramEnabled);
+        this.windowMillis = window.toMillis();
+        this.bucketMillis = Math.max(1, windowMillis / BUCKETS_PER_WINDOW);
+        initializeStorage();
+    }
+
+    @Override
+    protected void initializeStorage() {
+        this.buckets = new ConcurrentSkipListMap<>();
+    }
+
+    @Override
+    protected ScoreEntry replaceEntry(ScoreEntry newEntry) {
+        long bucketStart = bucketStart(newEntry.timestamp());
+        Bucket bucket = buckets.computeIfAbsent(bucketStart, start -> new Bucket());
+        // The new entry is visible before the old one is removed, so lock-free
+        // lookups never miss the user
+        ScoreEntry oldEntry = bucket.userScores.put(newEntry.userId(), newEntry);
+        if (oldEntry != null) {
+            bucket.sortedScores.remove(oldEntry);
+        } else {
+            oldEntry = removeFromOtherBuckets(newEntry.userId(), bucketStart);
+        }
+        bucket.sortedScores.add(newEntry);
+        return oldEntry;
+    }
+
+    private ScoreEntry removeFromOtherBuckets(long userId, long bucketStart) {
+        for (Map.Entry<Long, Bucket> other : buckets.descendingMap().entrySet()) {
+            if (other.getKey() == bucketStart) {
+                continue;
+            }
+            ScoreEntry oldEntry = other.getValue().userScores.remove(userId);
+            if (oldEntry != null) {
+                other.getValue().sortedScores.remove(oldEntry);
+                return oldEntry;
+            }
+        }
+        return null;
+    }
+
+    @Override
+    protected boolean removeEntry(ScoreEntry entry) {
+        Bucket bucket = buckets.get(bucketStart(entry.timestamp()));
+        if (bucket != null && bucket.userScores.remove(entry.userId(), entry)) {
+            bucket.sortedScores.remove(entry);
+            return true;
+        }
+        return false;
+    }
+
+    @Override
+    protected int rankOf(long userId) {
+        ScoreEntry userEntry = entryOf(userId);
+        if (userEntry == null) {
+            return -1; // User not found
+        }
+        int rank = 1;
+        for (Bucket bucket : buckets.values()) {
+            rank += bucket.sortedScores.countBefore(userEntry);
+        }
+        return rank;
+    }
+
+    @Override
+    protected Iterator<ScoreEntry> iteratorFrom(int rank) {
+        List<IndexedSkipList<ScoreEntry>> lists = new ArrayList<>(buckets.size());
+        for (Bucket bucket : buckets.values()) {
+            lists.add(bucket.sortedScores);
+        }
+        int[] skipped = seek(lists, Math.max(rank, 1) - 1);
+        PriorityQueue<MergeCursor> cursors = new PriorityQueue<>();
+        for (int i = 0; i < lists.size(); i++) {
+            Iterator<ScoreEntry> iterator = lists.get(i).iteratorFrom(skipped[i] + 1);
+            if (iterator.hasNext()) {
+                cursors.add(new MergeCursor(iterator));
+            }
+        }
+        return new Iterator<>() {
+            @Override
+            public boolean hasNext() {
+                return !cursors.isEmpty();
+            }
+
+            @Override
+            public ScoreEntry next() {
+                MergeCursor cursor = cursors.poll();
+                if (cursor == null) {
+                    throw new NoSuchElementException();
+                }
+                ScoreEntry entry = cursor.current;
+                if (cursor.advance()) {
+                    cursors.add(cursor);
+                }
+                return entry;
+            }
+        };
+    }
+
+    /**
+     * Returns how many entries of each list are among the first skip entries of
+     * their merged order, in O(k^2 log^2 N) for k lists instead of the O(N) of
+     * merging them. Keeps a range per list that contains the answer. Each step
+     * takes the middle entry of the widest range as a pivot, counts the entries
+     * ahead of it in every list, and so learns whether everything up to the
+     * pivot is skipped or everything from it on is not; every range is cut
+     * accordingly.
+     */
+    private static int[] seek(List<IndexedSkipList<ScoreEntry>> lists, int skip) {
+        int listCount = lists.size();
+        int[] low = new int[listCount];
+        int[] high = new int[listCount];
+        int total = 0;
+        for (int i = 0; i < listCount; i++) {
+            high[i] = lists.get(i).size();
+            total += high[i];
+        }
+        if (skip <= 0) {
+            return low;
+        }
+        if (skip >= total) {
+            return high;
+        }
+        int[] before = new int[listCount];
+        while (true) {
+            int widest = -1;
+            int width = 0;
+            for (int i = 0; i < listCount; i++) {
+                if (high[i] - low[i] > width) {
+                    widest = i;
+                    width = high[i] - low[i];
+                }
+            }
+            if (widest < 0) {
+                return low;
+            }
+            int middle = (low[widest] + high[widest]) >>> 1;
+            ScoreEntry pivot = lists.get(widest).get(middle + 1);
+            int ahead = 0;
+            for (int i = 0; i < listCount; i++) {
+                before[i] = i == widest ? middle : lists.get(i).countBefore(pivot);
+                ahead += before[i];
+            }
+            if (ahead < skip) {
+                // The pivot and everything ahead of it are skipped
+                for (int i = 0; i < listCount; i++) {
+                    low[i] = Math.max(low[i], i == widest ? middle + 1 : before[i]);
+                }
+            } else {
+                for (int i = 0; i < listCount; i++) {
+                    high[i] = Math.min(high[i], before[i]);
+                }
+            }
+        }
+    }
+
+    @Override
+    protected int size() {
+        int size = 0;
+        for (Bucket bucket : buckets.values()) {
+            size += bucket.sortedScores.size();
+        }
+        return size;
+    }
+
+    @Override
+    protected void clearEntries() {
+        buckets.clear();
+    }
+
+    @Override
+    protected void loadSorted(ScoreEntry[] sortedEntries, int count) {
+        // Splitting by bucket keeps each bucket's entries in rank order
+        Map<Long, List<ScoreEntry>> entriesByBucket = new TreeMap<>();
+        for (int i = 0; i < count; i++) {
+            entriesByBucket.computeIfAbsent(bucketStart(sortedEntries[i].timestamp()), start -> new ArrayList<>())
+                    .add(sortedEntries[i]);
+        }
+        entriesByBucket.forEach((bucketStart, entries) -> {
+            Bucket bucket = new Bucket();
+            ScoreEntry[] bucketEntries = entries.toArray(new ScoreEntry[0]);
+            for (ScoreEntry entry : bucketEntries) {
+                bucket.userScores.put(entry.userId(), entry);
+            }
+            bucket.sortedScores.buildFromSorted(bucketEntries, bucketEntries.length);
+            buckets.put(bucketStart, bucket);
+        });
+    }
+
+    @Override
+    public ScoreEntry getUserScore(Long userId) {
+        return entryOf(userId);
+    }
+
+    @Override
+    protected ScoreEntry entryOf(long userId) {
+        for (Bucket bucket : buckets.descendingMap().values()) {
+            ScoreEntry entry = bucket.userScores.get(userId);
+            if (entry != null) {
+                return entry;
+            }
+        }
+        return null;
+    }
+
+    /**
+     * Drops every bucket that lies entirely before the window ending at the
+     * given time.
+     *
+     * @return number of buckets dropped
+     */
+    public int expireBuckets(long now) {
+        long windowStart = now - windowMillis;
+        Map.Entry<Long, Bucket> oldest = buckets.firstEntry();
+        if (oldest == null || oldest.getKey() + bucketMillis > windowStart) {
+            return 0; // Checked without the lock: nothing to drop most of the time
+        }
+
+        lock.writeLock().lock();
+        try {
+            int dropped = 0;
+            while ((oldest = buckets.firstEntry()) != null && oldest.getKey() + bucketMillis <= windowStart) {
+                buckets.remove(oldest.getKey());
+                entriesDropped(oldest.getValue().sortedScores);
+                dropped++;
+            }
+            return dropped;
+        } finally {
+            lock.writeLock().unlock();
+        }
+    }
+
+    private long bucketStart(long timestamp) {
+        return Math.floorDiv(timestamp, bucketMillis) * bucketMillis;
+    }
+
+    // Head of one bucket's iterator in the k-way merge
+    private static final class MergeCursor implements Comparable<MergeCursor> {
+        private final Iterator<ScoreEntry> iterator;
+        private ScoreEntry current;
+
+        private MergeCursor(Iterator<ScoreEntry> iterator) {
+            this.iterator = iterator;
+            this.current = iterator.next();
+        }
+
+        private boolean advance() {
+            if (!iterator.hasNext()) {
+                return false;
+            }
+            current = iterator.next();
+            return true;
+        }
+
+        @Override
+        public int compareTo(MergeCursor other) {
+            return current.compareTo(other.current);
+        }
+    }
+}
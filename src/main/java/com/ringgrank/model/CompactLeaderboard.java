@@ -0,0 +1,300 @@
+package com.ringgrank.model;
+
+import java.util.Arrays;
+import java.util.Iterator;
+import java.util.NoSuchElementException;
+
+/**
+ * Leaderboard storage that keeps scores in primitive columns instead of
+ * ScoreEntry objects.
+ * Each player occupies one slot across the userId/score/timestamp long arrays
+ * (24 bytes, up to 30 while the columns have room to grow into). Users are
+ * found through an open-addressing table of slot numbers that reads its keys
+ * back from the userId column (5.3 to 10.7 bytes between resizes), and ranks
+ * come from a {@link ChunkedRankIndex} of slot numbers (about 4.5 bytes).
+ * While players are added that averages about 39 bytes per player, between
+ * 34 and 44 depending on where the arrays are in their growth, and a snapshot
+ * load (exactly sized columns) always stays under 40; compared to about 200
+ * for {@link SkipListLeaderboard}. The columns grow by a quarter at a time to
+ * keep that budget.
+ * ScoreEntry objects are only created when a caller asks for one, so user
+ * score lookups take the read lock.
+ */
+public class CompactLeaderboard extends Leaderboard {
+    private static final long serialVersionUID = 1L;
+
+    private static final int INITIAL_CAPACITY = 16;
+    private static final int INITIAL_INDEX_SIZE = 32; // Must be a power of two
+    private static final float MAX_INDEX_LOAD = 0.75f;
+
+    // All entries of a leaderboard belong to the same game, so it is stored once
+    private final long gameId;
+
+    private transient long[] userIds;
+    private transient long[] scores;
+    private transient long[] timestamps;
+    // High-water mark of slots handed out; freed slots below it are reused first
+    private transient int usedSlots;
+    private transient int[] freeSlots;
+    private transient int freeSlotCount;
+
+    // Open-addressing (linear probing) table from userId to slot + 1, where 0
+    // marks an empty bucket
+    private transient int[] userIndex;
+    private transient int userCount;
+
+    private transient ChunkedRankIndex rankIndex;
+
+    public CompactLeaderboard(long gameId) {
+        this(gameId, false);
+    }
+
+    public CompactLeaderboard(long gameId, boolean histogramEnabled) {
+        super(histogramEnabled);
+        this.gameId = gameId;
+        initializeStorage();
+    }
+
+    @Override
+    protected void initializeStorage() {
+        allocateColumns(INITIAL_CAPACITY);
+    }
+
+    private void allocateColumns(int capacity) {
+        this.userIds = new long[capacity];
+        this.scores = new long[capacity];
+        this.timestamps = new long[capacity];
+        this.usedSlots = 0;
+        this.freeSlots = new int[INITIAL_CAPACITY];
+        this.freeSlotCount = 0;
+        this.userIndex = new int[indexSizeFor(capacity)];
+        this.userCount = 0;
+        this.rankIndex = new ChunkedRankIndex(this::compareSlots);
+    }
+
+    @Override
+    protected ScoreEntry replaceEntry(ScoreEntry newEntry) {
+        int slot = findSlot(newEntry.userId());
+        ScoreEntry oldEntry = null;
+        if (slot >= 0) {
+            oldEntry = toEntry(slot);
+            // Must leave the index before its sort key changes
+            rankIndex.remove(slot);
+        } else {
+            slot = allocateSlot();
+            userIds[slot] = newEntry.userId();
+            insertIntoUserIndex(slot);
+        }
+        scores[slot] = newEntry.score();
+        timestamps[slot] = newEntry.timestamp();
+        rankIndex.insert(slot);
+        return oldEntry;
+    }
+
+    @Override
+    protected boolean removeEntry(ScoreEntry entry) {
+        int slot = findSlot(entry.userId());
+        if (slot < 0 || entry.gameId() != gameId || scores[slot] != entry.score()
+                || timestamps[slot] != entry.timestamp()) {
+            return false;
+        }
+        rankIndex.remove(slot);
+        removeFromUserIndex(entry.userId());
+        releaseSlot(slot);
+        return true;
+    }
+
+    @Override
+    protected int rankOf(long userId) {
+        int slot = findSlot(userId);
+        if (slot < 0) {
+            return -1; // User not found
+        }
+        return rankIndex.rankOf(slot);
+    }
+
+    @Override
+    protected Iterator<ScoreEntry> iteratorFrom(int rank) {
+        ChunkedRankIndex.Cursor cursor = rankIndex.cursorAt(rank);
+        return new Iterator<>() {
+            @Override
+            public boolean hasNext() {
+                return cursor.hasNext();
+            }
+
+            @Override
+            public ScoreEntry next() {
+                if (!cursor.hasNext()) {
+                    throw new NoSuchElementException();
+                }
+                return toEntry(cursor.nextSlot());
+            }
+        };
+    }
+
+    @Override
+    protected int size() {
+        return rankIndex.size();
+    }
+
+    @Override
+    protected void clearEntries() {
+        // Start over with small arrays so a cleared leaderboard gives memory back
+        initializeStorage();
+    }
+
+    @Override
+    protected void loadSorted(ScoreEntry[] sortedEntries, int count) {
+        allocateColumns(Math.max(count, INITIAL_CAPACITY));
+        int[] sortedSlots = new int[count];
+        for (int slot = 0; slot < count; slot++) {
+            userIds[slot] = sortedEntries[slot].userId();
+            scores[slot] = sortedEntries[slot].score();
+            timestamps[slot] = sortedEntries[slot].timestamp();
+            insertIntoUserIndex(slot);
+            sortedSlots[slot] = slot;
+        }
+        usedSlots = count;
+        rankIndex.buildFromSorted(sortedSlots, count);
+    }
+
+    @Override
+    protected ScoreEntry entryOf(long userId) {
+        int slot = findSlot(userId);
+        return slot < 0 ? null : toEntry(slot);
+    }
+
+    @Override
+    public ScoreEntry getUserScore(Long userId) {
+        lock.readLock().lock();
+        try {
+            return entryOf(userId);
+        } finally {
+            lock.readLock().unlock();
+        }
+    }
+
+    // Bytes held by the storage's arrays, leaving out object headers
+    long footprintBytes() {
+        return 8L * (userIds.length + scores.length + timestamps.length)
+                + 4L * (freeSlots.length + userIndex.length) + rankIndex.footprintBytes();
+    }
+
+    private ScoreEntry toEntry(int slot) {
+        return new ScoreEntry(userIds[slot], gameId, scores[slot], timestamps[slot]);
+    }
+
+    // Same order as ScoreEntry.compareTo: score desc, timestamp asc, userId asc
+    private int compareSlots(int slotA, int slotB) {
+        int scoreCompare = Long.compare(scores[slotB], scores[slotA]);
+        if (scoreCompare != 0) {
+            return scoreCompare;
+        }
+        int timestampCompare = Long.compare(timestamps[slotA], timestamps[slotB]);
+        if (timestampCompare != 0) {
+            return timestampCompare;
+        }
+        return Long.compare(userIds[slotA], userIds[slotB]);
+    }
+
+    private int allocateSlot() {
+        if (freeSlotCount > 0) {
+            return freeSlots[--freeSlotCount];
+        }
+        if (usedSlots == userIds.length) {
+            int capacity = userIds.length + (userIds.length >> 2);
+            userIds = Arrays.copyOf(userIds, capacity);
+            scores = Arrays.copyOf(scores, capacity);
+            timestamps = Arrays.copyOf(timestamps, capacity);
+        }
+        return usedSlots++;
+    }
+
+    private void releaseSlot(int slot) {
+        if (freeSlotCount == freeSlots.length) {
+            freeSlots = Arrays.copyOf(freeSlots, freeSlots.length * 2);
+        }
+        freeSlots[freeSlotCount++] = slot;
+    }
+
+    private int findSlot(long userId) {
+        int mask = userIndex.length - 1;
+        for (int bucket = hash(userId) & mask;; bucket = (bucket + 1) & mask) {
+            int entry = userIndex[bucket];
+            if (entry == 0) {
+                return -1;
+            }
+            if (userIds[entry - 1] == userId) {
+                return entry - 1;
+            }
+        }
+    }
+
+    private void insertIntoUserIndex(int slot) {
+        if (userCount + 1 > userIndex.length * MAX_INDEX_LOAD) {
+            resizeUserIndex(userIndex.length * 2);
+        }
+        placeInUserIndex(userIndex, slot);
+        userCount++;
+    }
+
+    private void placeInUserIndex(int[] index, int slot) {
+        int mask = index.length - 1;
+        int bucket = hash(userIds[slot]) & mask;
+        while (index[bucket] != 0) {
+            bucket = (bucket + 1) & mask;
+        }
+        index[bucket] = slot + 1;
+    }
+
+    // Backward-shift deletion keeps probe sequences intact without tombstones
+    private void removeFromUserIndex(long userId) {
+        int mask = userIndex.length - 1;
+        int hole = hash(userId) & mask;
+        while (userIds[userIndex[hole] - 1] != userId) {
+            hole = (hole + 1) & mask;
+        }
+
+        int bucket = hole;
+        while (true) {
+            bucket = (bucket + 1) & mask;
+            int entry = userIndex[bucket];
+            if (entry == 0) {
+                break;
+            }
+            int home = hash(userIds[entry - 1]) & mask;
+            // The entry may move into the hole unless its home lies cyclically
+            // within (hole, bucket]
+            boolean canMove = bucket > hole ? (home <= hole || home > bucket) : (home <= hole && home > bucket);
+            if (canMove) {
+                userIndex[hole] = entry;
+                hole = bucket;
+            }
+        }
+        userIndex[hole] = 0;
+        userCount--;
+    }
+
+    private void resizeUserIndex(int newSize) {
+        int[] resized = new int[newSize];
+        for (int entry : userIndex) {
+            if (entry != 0) {
+                placeInUserIndex(resized, entry - 1);
+            }
+        }
+        userIndex = resized;
+    }
+
+    private static int indexSizeFor(int capacity) {
+        int size = INITIAL_INDEX_SIZE;
+        while (capacity > size * MAX_INDEX_LOAD) {
+            size <<= 1;
+        }
+        return size;
+    }
+
+    private static int hash(long userId) {
+        long h = userId * 0x9E3779B97F4A7C15L;
+        return (int) (h ^ (h >>> 32));
+    }
+}
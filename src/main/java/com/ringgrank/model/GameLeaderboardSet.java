@@ -1,11 +1,15 @@
 package com.ringgrank.model;
 
+import java.io.IOException;
+import java.io.ObjectInputStream;
 import java.io.Serializable;
 import java.time.Duration;
 import java.time.Instant;
+import java.util.ArrayList;
+import java.util.List;
 import java.util.Map;
+import java.util.Set;
 import java.util.concurrent.ConcurrentHashMap;
-import java.util.concurrent.DelayQueue;
 
 import com.ringgrank.service.GlobalLeaderboardManager;
 
@@ -15,9 +19,14 @@ import com.ringgrank.service.GlobalLeaderboardManager;
  */
 public class GameLeaderboardSet implements Serializable {
     private static final long serialVersionUID = 1L;
+    // Entries copied into a new window per write lock acquisition
+    private static final int BACKFILL_CHUNK_SIZE = 1024;
 
     private final long gameId;
-    private final Leaderboard allTimeLeaderboard = new Leaderboard();
+    private final LeaderboardStorage storage;
+    private final boolean histogramEnabled;
+    private final WindowEngine windowEngine;
+    private final Leaderboard allTimeLeaderboard;
 
     // Key: window identifier (e.g., "24h"), Value: Leaderboard for that window
     private final Map<String, Leaderboard> windowedLeaderboards = new ConcurrentHashMap<>();
@@ -25,18 +34,126 @@ public class GameLeaderboardSet implements Serializable {
     // Key: window identifier, Value: Duration of the window
     private final Map<String, Duration> windowDurations = new ConcurrentHashMap<>();
 
-    private transient DelayQueue<GlobalLeaderboardManager.ExpiringScore> expiringScoresQueueRef;
+    // Windows added at runtime that are not yet filled from the all-time
+    // leaderboard; they receive new scores but are not served
+    private transient Set<String> backfillingWindows = ConcurrentHashMap.newKeySet();
 
-    public GameLeaderboardSet(long gameId, DelayQueue<GlobalLeaderboardManager.ExpiringScore> expiringScoresQueueRef) {
+    // Bumped when a window is configured, and by the removed leaderboard's
+    // version plus one when a window is removed; part of getVersion()
+    private transient volatile long configVersion;
+
+    private transient TimingWheel<GlobalLeaderboardManager.ExpiringScore> expiryWheelRef;
+
+    public GameLeaderboardSet(long gameId, TimingWheel<GlobalLeaderboardManager.ExpiringScore> expiryWheelRef) {
+        this(gameId, expiryWheelRef, LeaderboardStorage.SKIP_LIST, false, WindowEngine.PER_ENTRY);
+    }
+
+    /**
+     * @param storage          storage implementation used for every leaderboard
+     *                         of this game
+     * @param histogramEnabled whether every leaderboard of this game keeps a score
+     *                         histogram for approximate rank queries
+     * @param windowEngine     how windowed leaderboards expire scores
+     */
+    public GameLeaderboardSet(long gameId, TimingWheel<GlobalLeaderboardManager.ExpiringScore> expiryWheelRef,
+            LeaderboardStorage storage, boolean histogramEnabled, WindowEngine windowEngine) {
         this.gameId = gameId;
-        // Configure default windows
-        configureWindow("24h", Duration.ofHours(24));
-        this.expiringScoresQueueRef = expiringScoresQueueRef;
+        this.storage = storage;
+        this.histogramEnabled = histogramEnabled;
+        this.windowEngine = windowEngine;
+        this.allTimeLeaderboard = storage.create(gameId, histogramEnabled);
+        this.expiryWheelRef = expiryWheelRef;
     }
 
+    /**
+     * Adds an empty window, for a game that has no scores yet or is being
+     * restored. See {@link #addWindow(String, Duration)} for a game in use.
+     */
     public void configureWindow(String windowKey, Duration duration) {
-        windowedLeaderboards.putIfAbsent(windowKey, new Leaderboard());
+        windowedLeaderboards.computeIfAbsent(windowKey,
+                key -> windowEngine.create(storage, gameId, histogramEnabled, duration));
+        windowDurations.put(windowKey, duration);
+        configVersion++;
+    }
+
+    /**
+     * Adds a window to a game in use. The window receives new scores right
+     * away, but is reported as backfilling and not served until
+     * {@link #backfillWindow(String)} has copied in the existing scores.
+     *
+     * @return false if the window already exists
+     */
+    public synchronized boolean addWindow(String windowKey, Duration duration) {
+        if (windowedLeaderboards.containsKey(windowKey)) {
+            return false;
+        }
+        // Marked and given a duration before it becomes visible to addScore, so
+        // that it is never served half-filled and no score skips it
+        backfillingWindows.add(windowKey);
         windowDurations.put(windowKey, duration);
+        windowedLeaderboards.put(windowKey, windowEngine.create(storage, gameId, histogramEnabled, duration));
+        configVersion++;
+        return true;
+    }
+
+    /**
+     * Fills a window added with {@link #addWindow(String, Duration)} from the
+     * all-time leaderboard, which holds every user's current score as restored
+     * from the snapshot and the WAL, and then makes it available to queries.
+     * Entries are copied in chunks under short write locks, so ingestion keeps
+     * going; a user that scored since the window was added already has a newer
+     * entry in it and is skipped.
+     */
+    public void backfillWindow(String windowKey) {
+        Leaderboard leaderboard = windowedLeaderboards.get(windowKey);
+        Duration duration = windowDurations.get(windowKey);
+        if (leaderboard == null || duration == null) {
+            backfillingWindows.remove(windowKey);
+            return; // Removed in the meantime
+        }
+        long windowStart = Instant.now().minus(duration).toEpochMilli();
+        List<ScoreEntry> chunk = new ArrayList<>(BACKFILL_CHUNK_SIZE);
+        for (ScoreEntry entry : allTimeLeaderboard.copyEntries()) {
+            if (entry.timestamp() > windowStart) {
+                chunk.add(entry);
+                if (chunk.size() == BACKFILL_CHUNK_SIZE) {
+                    backfillChunk(windowKey, duration, leaderboard, chunk);
+                    chunk.clear();
+                }
+            }
+        }
+        backfillChunk(windowKey, duration, leaderboard, chunk);
+        backfillingWindows.remove(windowKey);
+    }
+
+    private void backfillChunk(String windowKey, Duration duration, Leaderboard leaderboard, List<ScoreEntry> chunk) {
+        for (ScoreEntry added : leaderboard.addScoresIfAbsent(chunk)) {
+            if (expiresPerEntry()) {
+                scheduleExpiry(windowKey, duration, added);
+            }
+        }
+    }
+
+    /**
+     * @return false if the window does not exist
+     */
+    public synchronized boolean removeWindow(String windowKey) {
+        Leaderboard removed = windowedLeaderboards.remove(windowKey);
+        if (removed == null) {
+            return false;
+        }
+        // Scores still scheduled for expiry find no leaderboard and are skipped
+        windowDurations.remove(windowKey);
+        backfillingWindows.remove(windowKey);
+        // The removed leaderboard's version leaves getVersion(); carrying it
+        // over keeps the game's version from falling back to a value already
+        // recorded by a snapshot
+        configVersion += removed.getVersion() + 1;
+        return true;
+    }
+
+    public boolean isBackfilling(String windowKey) {
+        return windowKey != null && backfillingWindows.contains(windowKey);
     }
 
     public Leaderboard getLeaderboard(String windowKey) {
@@ -51,22 +168,147 @@ public class GameLeaderboardSet implements Serializable {
         allTimeLeaderboard.addOrUpdateScore(entry);
 
         // Update windowed leaderboards if the score is within the window
-        Instant scoreTime = Instant.ofEpochMilli(entry.timestamp());
+        windowedLeaderboards.forEach((windowKey, leaderboard) -> addToWindow(windowKey, leaderboard, entry));
+    }
+
+    /**
+     * Adds a batch of this game's scores, in order, taking each leaderboard's
+     * write lock once for the whole batch.
+     */
+    public void addScores(List<ScoreEntry> entries) {
+        allTimeLeaderboard.addOrUpdateScores(entries);
+
         windowedLeaderboards.forEach((windowKey, leaderboard) -> {
             Duration windowDuration = windowDurations.get(windowKey);
-            if (windowDuration != null) {
-                Instant windowStartTime = Instant.now().minus(windowDuration);
-                if (scoreTime.isAfter(windowStartTime)) {
-                    leaderboard.addOrUpdateScore(entry);
-                    expiringScoresQueueRef.add(new GlobalLeaderboardManager.ExpiringScore(entry, gameId, windowKey,
-                            scoreTime.plus(windowDuration).toEpochMilli()));
+            if (windowDuration == null) {
+                return;
+            }
+            long windowStartTime = Instant.now().minus(windowDuration).toEpochMilli();
+            List<ScoreEntry> inWindow = new ArrayList<>(entries.size());
+            for (ScoreEntry entry : entries) {
+                if (entry.timestamp() > windowStartTime) {
+                    inWindow.add(entry);
+                }
+            }
+            leaderboard.addOrUpdateScores(inWindow);
+            if (expiresPerEntry()) {
+                for (ScoreEntry entry : inWindow) {
+                    scheduleExpiry(windowKey, windowDuration, entry);
                 }
             }
         });
     }
 
-    public void setExpiringScoresQueueRef(DelayQueue<GlobalLeaderboardManager.ExpiringScore> expiringScoresQueueRef) {
-        this.expiringScoresQueueRef = expiringScoresQueueRef;
+    private void addToWindow(String windowKey, Leaderboard leaderboard, ScoreEntry entry) {
+        Duration windowDuration = windowDurations.get(windowKey);
+        if (windowDuration != null) {
+            Instant windowStartTime = Instant.now().minus(windowDuration);
+            if (Instant.ofEpochMilli(entry.timestamp()).isAfter(windowStartTime)) {
+                leaderboard.addOrUpdateScore(entry);
+                if (expiresPerEntry()) {
+                    scheduleExpiry(windowKey, windowDuration, entry);
+                }
+            }
+        }
+    }
+
+    // A replaced entry's expiry is not cancelled, which would take a handle per
+    // user and window; it is skipped lazily when due, since removal only takes
+    // out an entry that is still the user's current one
+    private void scheduleExpiry(String windowKey, Duration windowDuration, ScoreEntry entry) {
+        expiryWheelRef.add(new GlobalLeaderboardManager.ExpiringScore(entry, windowKey),
+                entry.timestamp() + windowDuration.toMillis());
+    }
+
+    /**
+     * Copies every leaderboard of this game. Each leaderboard is copied under its
+     * own read lock, one after another, so writers are never blocked for longer
+     * than one copy.
+     */
+    public GameSnapshot snapshot() {
+        List<GameSnapshot.Window> windows = new ArrayList<>(windowedLeaderboards.size());
+        windowedLeaderboards.forEach((windowKey, leaderboard) -> {
+            Duration duration = windowDurations.get(windowKey);
+            // A window still being backfilled is left out; it is added again and
+            // backfilled after a restart if it is configured
+            if (duration != null && !isBackfilling(windowKey)) {
+                windows.add(new GameSnapshot.Window(windowKey, duration, leaderboard.copyEntries()));
+            }
+        });
+        return new GameSnapshot(gameId, allTimeLeaderboard.copyEntries(), windows);
+    }
+
+    /**
+     * Loads the entries of a snapshot into this game, bulk-building each
+     * leaderboard in O(N). Windowed entries that have expired since the
+     * snapshot was taken are dropped, and the rest are scheduled for expiry
+     * again.
+     */
+    public void restore(GameSnapshot snapshot) {
+        allTimeLeaderboard.loadEntries(snapshot.allTimeEntries(), snapshot.allTimeEntries().length);
+        for (GameSnapshot.Window window : snapshot.windows()) {
+            configureWindow(window.windowKey(), window.duration());
+            long windowStart = Instant.now().minus(window.duration()).toEpochMilli();
+            ScoreEntry[] liveEntries = new ScoreEntry[window.entries().length];
+            int liveCount = 0;
+            // Filtering keeps rank order
+            for (ScoreEntry entry : window.entries()) {
+                if (entry.timestamp() > windowStart) {
+                    liveEntries[liveCount++] = entry;
+                }
+            }
+            windowedLeaderboards.get(window.windowKey()).loadEntries(liveEntries, liveCount);
+            if (expiresPerEntry()) {
+                for (int i = 0; i < liveCount; i++) {
+                    scheduleExpiry(window.windowKey(), window.duration(), liveEntries[i]);
+                }
+            }
+        }
+    }
+
+    /**
+     * Drops the time buckets that have aged out of bucketed windows.
+     */
+    public void expireBuckets(long now) {
+        for (Leaderboard leaderboard : windowedLeaderboards.values()) {
+            if (leaderboard instanceof BucketedWindowLeaderboard bucketed) {
+                bucketed.expireBuckets(now);
+            }
+        }
+    }
+
+    /**
+     * Prunes the entries that have left lazily expired windows.
+     */
+    public void compactWindows(long now) {
+        for (Leaderboard leaderboard : windowedLeaderboards.values()) {
+            if (leaderboard instanceof LazyWindowLeaderboard lazy) {
+                lazy.prune(now);
+            }
+        }
+    }
+
+    private boolean expiresPerEntry() {
+        return windowEngine == WindowEngine.PER_ENTRY;
+    }
+
+    private void readObject(ObjectInputStream in) throws IOException, ClassNotFoundException {
+        in.defaultReadObject();
+        backfillingWindows = ConcurrentHashMap.newKeySet();
+    }
+
+    /**
+     * @return a counter that grows whenever any leaderboard of this game or
+     *         its window configuration changes. Every leaderboard's version
+     *         only grows, and a removed window's version is carried over into
+     *         configVersion, so the sum never falls.
+     */
+    public long getVersion() {
+        long version = configVersion + allTimeLeaderboard.getVersion();
+        for (Leaderboard leaderboard : windowedLeaderboards.values()) {
+            version += leaderboard.getVersion();
+        }
+        return version;
     }
 
     public long getGameId() {
@@ -0,0 +1,14 @@
+package com.ringgrank.model;
+
+import java.time.Duration;
+import java.util.List;
+
+/**
+ * Point-in-time copy of a game's leaderboards, as written to and read from a
+ * snapshot. Entries are in rank order.
+ */
+public record GameSnapshot(long gameId, ScoreEntry[] allTimeEntries, List<Window> windows) {
+
+    public record Window(String windowKey, Duration duration, ScoreEntry[] entries) {
+    }
+}
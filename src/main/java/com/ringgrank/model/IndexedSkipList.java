@@ -0,0 +1,282 @@
+package com.ringgrank.model;
+
+import java.util.Comparator;
+import java.util.Iterator;
+import java.util.NoSuchElementException;
+import java.util.concurrent.ThreadLocalRandom;
+
+/**
+ * Skip list where every forward link also records its span (the number of
+ * level-0 steps it skips), which turns it into an order-statistic structure:
+ * insert, remove, rank-of and element-at-rank all run in O(log N) expected
+ * time.
+ * This class is NOT thread-safe; callers are expected to guard it (see
+ * {@link Leaderboard}).
+ *
+ * @param <E> element type, ordered by the supplied comparator
+ */
+public class IndexedSkipList<E> implements Iterable<E> {
+    private static final int MAX_LEVEL = 32;
+    // Probability of promoting a node one level up is 1/4, as in Redis' zset.
+    private static final int PROMOTION_BITS = 2;
+
+    private final Comparator<? super E> comparator;
+    private final Node<E> head = new Node<>(null, MAX_LEVEL);
+    private int level = 1;
+    private int size;
+
+    public IndexedSkipList(Comparator<? super E> comparator) {
+        this.comparator = comparator;
+    }
+
+    /**
+     * Inserts the value. The caller must ensure the value is not already present.
+     */
+    public void add(E value) {
+        @SuppressWarnings("unchecked")
+        Node<E>[] update = new Node[MAX_LEVEL];
+        int[] rankAt = new int[MAX_LEVEL];
+
+        Node<E> x = head;
+        for (int i = level - 1; i >= 0; i--) {
+            rankAt[i] = (i == level - 1) ? 0 : rankAt[i + 1];
+            while (x.next[i] != null && comparator.compare(x.next[i].value, value) < 0) {
+                rankAt[i] += x.span[i];
+                x = x.next[i];
+            }
+            update[i] = x;
+        }
+
+        int nodeLevel = randomLevel();
+        if (nodeLevel > level) {
+            for (int i = level; i < nodeLevel; i++) {
+                rankAt[i] = 0;
+                update[i] = head;
+                head.span[i] = size;
+            }
+            level = nodeLevel;
+        }
+
+        Node<E> node = new Node<>(value, nodeLevel);
+        for (int i = 0; i < nodeLevel; i++) {
+            node.next[i] = update[i].next[i];
+            update[i].next[i] = node;
+            node.span[i] = update[i].span[i] - (rankAt[0] - rankAt[i]);
+            update[i].span[i] = (rankAt[0] - rankAt[i]) + 1;
+        }
+        // Links above the new node now skip over one more element
+        for (int i = nodeLevel; i < level; i++) {
+            update[i].span[i]++;
+        }
+        size++;
+    }
+
+    /**
+     * Removes the value if present.
+     *
+     * @return true if the value was found and removed
+     */
+    public boolean remove(E value) {
+        @SuppressWarnings("unchecked")
+        Node<E>[] update = new Node[MAX_LEVEL];
+
+        Node<E> x = head;
+        for (int i = level - 1; i >= 0; i--) {
+            while (x.next[i] != null && comparator.compare(x.next[i].value, value) < 0) {
+                x = x.next[i];
+            }
+            update[i] = x;
+        }
+
+        x = x.next[0];
+        if (x == null || comparator.compare(x.value, value) != 0) {
+            return false;
+        }
+
+        for (int i = 0; i < level; i++) {
+            if (update[i].next[i] == x) {
+                update[i].span[i] += x.span[i] - 1;
+                update[i].next[i] = x.next[i];
+            } else {
+                update[i].span[i]--;
+            }
+        }
+        while (level > 1 && head.next[level - 1] == null) {
+            level--;
+        }
+        size--;
+        return true;
+    }
+
+    /**
+     * Returns the 1-based rank of the value, or -1 if it is not present.
+     */
+    public int rankOf(E value) {
+        Node<E> x = head;
+        int rank = 0;
+        for (int i = level - 1; i >= 0; i--) {
+            while (x.next[i] != null && comparator.compare(x.next[i].value, value) <= 0) {
+                rank += x.span[i];
+                x = x.next[i];
+            }
+        }
+        if (x != head && comparator.compare(x.value, value) == 0) {
+            return rank;
+        }
+        return -1;
+    }
+
+    /**
+     * Returns the number of elements ordered before the value, which need not
+     * be present.
+     */
+    public int countBefore(E value) {
+        Node<E> x = head;
+        int count = 0;
+        for (int i = level - 1; i >= 0; i--) {
+            while (x.next[i] != null && comparator.compare(x.next[i].value, value) < 0) {
+                count += x.span[i];
+                x = x.next[i];
+            }
+        }
+        return count;
+    }
+
+    /**
+     * Returns the element at the given 1-based rank.
+     *
+     * @throws IndexOutOfBoundsException if rank is not within [1, size]
+     */
+    public E get(int rank) {
+        Node<E> node = nodeAt(rank);
+        if (node == null) {
+            throw new IndexOutOfBoundsException("Rank " + rank + " out of range [1, " + size + "]");
+        }
+        return node.value;
+    }
+
+    /**
+     * Returns an iterator positioned at the given 1-based rank. Seeking costs
+     * O(log N); every subsequent step is O(1).
+     */
+    public Iterator<E> iteratorFrom(int rank) {
+        return new NodeIterator<>(rank > size ? null : nodeAt(Math.max(rank, 1)));
+    }
+
+    @Override
+    public Iterator<E> iterator() {
+        return new NodeIterator<>(head.next[0]);
+    }
+
+    public int size() {
+        return size;
+    }
+
+    public void clear() {
+        for (int i = 0; i < MAX_LEVEL; i++) {
+            head.next[i] = null;
+            head.span[i] = 0;
+        }
+        level = 1;
+        size = 0;
+    }
+
+    /**
+     * Replaces the contents with the given values, which must already be sorted
+     * by this list's comparator and free of duplicates. Runs in O(N), avoiding
+     * the N log N cost of inserting one element at a time.
+     */
+    public void buildFromSorted(E[] sortedValues, int count) {
+        clear();
+        @SuppressWarnings("unchecked")
+        Node<E>[] last = new Node[MAX_LEVEL];
+        int[] lastPosition = new int[MAX_LEVEL];
+        for (int i = 0; i < MAX_LEVEL; i++) {
+            last[i] = head;
+        }
+
+        for (int position = 1; position <= count; position++) {
+            int nodeLevel = randomLevel();
+            Node<E> node = new Node<>(sortedValues[position - 1], nodeLevel);
+            for (int i = 0; i < nodeLevel; i++) {
+                last[i].next[i] = node;
+                last[i].span[i] = position - lastPosition[i];
+                last[i] = node;
+                lastPosition[i] = position;
+            }
+            level = Math.max(level, nodeLevel);
+        }
+        // Trailing links point past the end and span the remaining elements
+        for (int i = 0; i < level; i++) {
+            last[i].span[i] = count - lastPosition[i];
+        }
+        size = count;
+    }
+
+    private Node<E> nodeAt(int rank) {
+        if (rank < 1 || rank > size) {
+            return null;
+        }
+        Node<E> x = head;
+        int traversed = 0;
+        for (int i = level - 1; i >= 0; i--) {
+            while (x.next[i] != null && traversed + x.span[i] <= rank) {
+                traversed += x.span[i];
+                x = x.next[i];
+            }
+            if (traversed == rank) {
+                return x;
+            }
+        }
+        return null;
+    }
+
+    private static int randomLevel() {
+        int bits = ThreadLocalRandom.current().nextInt();
+        int nodeLevel = 1;
+        while (nodeLevel < MAX_LEVEL && (bits & ((1 << PROMOTION_BITS) - 1)) == 0) {
+            nodeLevel++;
+            bits >>>= PROMOTION_BITS;
+            if (bits == 0) {
+                break;
+            }
+        }
+        return nodeLevel;
+    }
+
+    private static final class Node<E> {
+        final E value;
+        final Node<E>[] next;
+        final int[] span;
+
+        @SuppressWarnings("unchecked")
+        Node(E value, int level) {
+            this.value = value;
+            this.next = new Node[level];
+            this.span = new int[level];
+        }
+    }
+
+    private static final class NodeIterator<E> implements Iterator<E> {
+        private Node<E> current;
+
+        NodeIterator(Node<E> start) {
+            this.current = start;
+        }
+
+        @Override
+        public boolean hasNext() {
+            return current != null;
+        }
+
+        @Override
+        public E next() {
+            if (current == null) {
+                throw new NoSuchElementException();
+            }
+            E value = current.value;
+            current = current.next[0];
+            return value;
+        }
+    }
+}
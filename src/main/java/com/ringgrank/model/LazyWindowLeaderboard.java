@@ -0,0 +1,292 @@
+package com.ringgrank.model;
+
+import java.time.Duration;
+import java.util.ArrayDeque;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Collection;
+import java.util.Comparator;
+import java.util.Iterator;
+import java.util.List;
+import java.util.NoSuchElementException;
+
+/**
+ * Sliding-window leaderboard that expires entries lazily instead of
+ * scheduling a removal per score. Writes only append the entry to an arrival
+ * queue. Entries that have left the window are pruned from the head of that
+ * queue by the first query that finds one, or by the periodic background
+ * compaction ({@link #prune(long)}), and are skipped by top-K queries until
+ * then.
+ * Entries are kept in another leaderboard's storage; its primitives are used
+ * directly under this leaderboard's lock, never its own locked methods.
+ * An entry that is replaced or removed leaves a stale arrival behind, which
+ * pruning skips. Once stale arrivals outnumber the live entries the queue is
+ * rebuilt from the storage, so it stays within twice the player count plus
+ * {@link #MIN_COMPACTION_STALE}.
+ * Queries prune under the write lock before they take the read lock, so
+ * counts and ranks only include entries that expired while the query ran,
+ * apart from the out-of-order case below.
+ * Pruning follows arrival order, so a score submitted with an older
+ * timestamp than the ones before it is pruned once those expire. Until then
+ * it is left out of top-K and user lookups, but may still be counted in
+ * other users' ranks.
+ */
+public class LazyWindowLeaderboard extends Leaderboard {
+    private static final long serialVersionUID = 1L;
+
+    // Stale arrivals tolerated before the queue is rebuilt, so small windows
+    // are not rebuilt on every other write
+    private static final int MIN_COMPACTION_STALE = 1024;
+
+    private final long windowMillis;
+    private final Leaderboard storage;
+
+    // Entries in the order they were added, including ones that have since been
+    // replaced or removed; guarded by the lock
+    private transient ArrayDeque<ScoreEntry> arrivals;
+    // Arrivals that are no longer a user's current entry; guarded by the lock
+    private transient int staleArrivals;
+    // Timestamp of the head of arrivals, readable without the lock
+    private transient volatile long oldestArrival;
+
+    /**
+     * @param storage empty leaderboard holding the entries; created without a
+     *                histogram, which this leaderboard keeps itself
+     */
+    public LazyWindowLeaderboard(Leaderboard storage, Duration window, boolean histogramEnabled) {
+        super(histogramEnabled);
+        this.windowMillis = window.toMillis();
+        this.storage = storage;
+        initializeStorage();
+    }
+
+    @Override
+    protected void initializeStorage() {
+        this.arrivals = new ArrayDeque<>();
+        this.staleArrivals = 0;
+        this.oldestArrival = Long.MAX_VALUE;
+    }
+
+    @Override
+    protected ScoreEntry replaceEntry(ScoreEntry newEntry) {
+        if (arrivals.isEmpty()) {
+            oldestArrival = newEntry.timestamp();
+        }
+        arrivals.addLast(newEntry);
+        ScoreEntry oldEntry = storage.replaceEntry(newEntry);
+        if (oldEntry != null) {
+            arrivalReplaced();
+        }
+        return oldEntry;
+    }
+
+    @Override
+    protected boolean removeEntry(ScoreEntry entry) {
+        // Its arrival stays queued; removing it again when pruned is a no-op
+        if (!storage.removeEntry(entry)) {
+            return false;
+        }
+        arrivalReplaced();
+        return true;
+    }
+
+    private void arrivalReplaced() {
+        staleArrivals++;
+        if (staleArrivals >= MIN_COMPACTION_STALE && staleArrivals > storage.size()) {
+            compactArrivals();
+        }
+    }
+
+    // Rebuilds the queue from the current entries, oldest first. Runs after at
+    // least as many replacements as there are players, so its O(N log N) cost
+    // is amortized over them.
+    private void compactArrivals() {
+        ScoreEntry[] current = new ScoreEntry[storage.size()];
+        Iterator<ScoreEntry> iterator = storage.iteratorFrom(1);
+        for (int i = 0; i < current.length; i++) {
+            current[i] = iterator.next();
+        }
+        Arrays.sort(current, Comparator.comparingLong(ScoreEntry::timestamp));
+        arrivals = new ArrayDeque<>(Arrays.asList(current));
+        staleArrivals = 0;
+        oldestArrival = current.length == 0 ? Long.MAX_VALUE : current[0].timestamp();
+    }
+
+    @Override
+    protected int rankOf(long userId) {
+        return entryOf(userId) == null ? -1 : storage.rankOf(userId);
+    }
+
+    @Override
+    protected Iterator<ScoreEntry> iteratorFrom(int rank) {
+        // Seeks in the storage: ranks count every stored entry (see rankOf), so a
+        // page starts where its rank says and only skips expired entries after
+        // that
+        long windowStart = System.currentTimeMillis() - windowMillis;
+        Iterator<ScoreEntry> entries = storage.iteratorFrom(rank);
+        return new Iterator<>() {
+            private ScoreEntry next = advance();
+
+            private ScoreEntry advance() {
+                while (entries.hasNext()) {
+                    ScoreEntry entry = entries.next();
+                    if (entry.timestamp() > windowStart) {
+                        return entry;
+                    }
+                }
+                return null;
+            }
+
+            @Override
+            public boolean hasNext() {
+                return next != null;
+            }
+
+            @Override
+            public ScoreEntry next() {
+                if (next == null) {
+                    throw new NoSuchElementException();
+                }
+                ScoreEntry entry = next;
+                next = advance();
+                return entry;
+            }
+        };
+    }
+
+    @Override
+    protected int size() {
+        return storage.size();
+    }
+
+    @Override
+    protected void clearEntries() {
+        storage.clearEntries();
+        arrivals.clear();
+        staleArrivals = 0;
+        oldestArrival = Long.MAX_VALUE;
+    }
+
+    @Override
+    protected void loadSorted(ScoreEntry[] sortedEntries, int count) {
+        storage.loadSorted(sortedEntries, count);
+        ScoreEntry[] byTimestamp = Arrays.copyOf(sortedEntries, count);
+        Arrays.sort(byTimestamp, Comparator.comparingLong(ScoreEntry::timestamp));
+        arrivals.addAll(Arrays.asList(byTimestamp));
+        oldestArrival = arrivals.isEmpty() ? Long.MAX_VALUE : arrivals.peekFirst().timestamp();
+    }
+
+    @Override
+    protected ScoreEntry entryOf(long userId) {
+        ScoreEntry entry = storage.entryOf(userId);
+        if (entry == null || entry.timestamp() <= System.currentTimeMillis() - windowMillis) {
+            return null;
+        }
+        return entry;
+    }
+
+    @Override
+    public ScoreEntry getUserScore(Long userId) {
+        lock.readLock().lock();
+        try {
+            return entryOf(userId);
+        } finally {
+            lock.readLock().unlock();
+        }
+    }
+
+    @Override
+    public List<ScoreEntry> getTopK(int k) {
+        // Answered from getTopKView() for k up to TOP_VIEW_SIZE, which prunes
+        // first
+        if (k > TOP_VIEW_SIZE) {
+            pruneIfDue();
+        }
+        return super.getTopK(k);
+    }
+
+    @Override
+    public TopKView getTopKView() {
+        pruneIfDue();
+        return super.getTopKView();
+    }
+
+    // Entries age out of the window without a write; a view holding one is
+    // rebuilt without it
+    @Override
+    protected boolean isTopViewCurrent(TopKView view) {
+        return view.oldestTimestamp() > System.currentTimeMillis() - windowMillis;
+    }
+
+    @Override
+    public List<ScoreEntry> getRange(int fromRank, int count) {
+        pruneIfDue();
+        return super.getRange(fromRank, count);
+    }
+
+    @Override
+    public RankRange getNeighbors(long userId, int radius) {
+        pruneIfDue();
+        return super.getNeighbors(userId, radius);
+    }
+
+    @Override
+    public RankLookup getUserRanks(Collection<Long> userIds) {
+        pruneIfDue();
+        return super.getUserRanks(userIds);
+    }
+
+    @Override
+    public int getUserRank(Long userId) {
+        pruneIfDue();
+        return super.getUserRank(userId);
+    }
+
+    @Override
+    public int getTotalPlayers() {
+        pruneIfDue();
+        return super.getTotalPlayers();
+    }
+
+    /**
+     * Removes the entries that have left the window ending at the given time.
+     *
+     * @return number of entries removed
+     */
+    public int prune(long now) {
+        if (oldestArrival > now - windowMillis) {
+            return 0; // Checked without the lock: nothing to prune
+        }
+        lock.writeLock().lock();
+        try {
+            return pruneLocked(now);
+        } finally {
+            lock.writeLock().unlock();
+        }
+    }
+
+    // Prunes on the query path before the query takes the read lock. Only
+    // entries that expire in between are counted by it.
+    private void pruneIfDue() {
+        prune(System.currentTimeMillis());
+    }
+
+    private int pruneLocked(long now) {
+        long windowStart = now - windowMillis;
+        List<ScoreEntry> removed = new ArrayList<>();
+        ScoreEntry oldest;
+        while ((oldest = arrivals.peekFirst()) != null && oldest.timestamp() <= windowStart) {
+            arrivals.pollFirst();
+            if (storage.removeEntry(oldest)) {
+                removed.add(oldest);
+            } else {
+                staleArrivals--;
+            }
+        }
+        oldestArrival = oldest == null ? Long.MAX_VALUE : oldest.timestamp();
+        if (!removed.isEmpty()) {
+            entriesDropped(removed);
+        }
+        return removed.size();
+    }
+}
@@ -1,42 +1,160 @@
 package com.ringgrank.model;
 
+import java.io.IOException;
+import java.io.ObjectInputStream;
+import java.io.ObjectOutputStream;
 import java.io.Serializable;
 import java.util.ArrayList;
+import java.util.Collection;
 import java.util.Collections;
+import java.util.Iterator;
 import java.util.List;
-import java.util.Map;
-import java.util.NavigableSet;
-import java.util.concurrent.ConcurrentHashMap;
-import java.util.concurrent.ConcurrentSkipListSet;
+import java.util.concurrent.locks.ReadWriteLock;
+import java.util.concurrent.locks.ReentrantReadWriteLock;
 
 /**
  * Manages a single leaderboard instance (either all-time or a specific window).
- * Contains the sorted set of scores and a map for quick user score lookup.
+ * Subclasses provide the sorted storage (see {@link LeaderboardStorage}); this
+ * class owns the locking, the optional score histogram and serialization, so
+ * every storage behaves the same way.
  * This class is thread-safe and serializable for snapshot support.
  */
-public class Leaderboard implements Serializable {
+public abstract class Leaderboard implements Serializable {
+    // Unchanged from the first version; its snapshots are not deserialized into
+    // this class but migrated by LegacySnapshotReader
     private static final long serialVersionUID = 1L;
 
-    // Stores all score entries, sorted by score (desc) and then timestamp (asc)
-    private final NavigableSet<ScoreEntry> sortedScores;
+    // Entries kept in the precomputed top view; top-K queries up to this size
+    // are answered from it
+    public static final int TOP_VIEW_SIZE = 1000;
 
-    // Maps userId to their current ScoreEntry for O(1) lookup
-    private final Map<Long, ScoreEntry> userScores;
+    // Guards the sorted storage and keeps the remove/add pair of an update atomic
+    protected transient ReadWriteLock lock;
 
-    public Leaderboard() {
-        this.sortedScores = new ConcurrentSkipListSet<>();
-        this.userScores = new ConcurrentHashMap<>();
+    // Optional score histogram for approximate rank queries; null when disabled
+    private final boolean histogramEnabled;
+    private transient ScoreHistogram histogram;
+
+    // Bumped on every change, under the write lock; lets snapshots skip
+    // leaderboards that have not changed
+    private transient volatile long version;
+
+    // First TOP_VIEW_SIZE entries; dropped (set to null) by any write that
+    // lands inside it and rebuilt by the next read
+    private transient volatile TopKView topView;
+
+    /**
+     * Subclasses must call {@link #initializeStorage()} from their own
+     * constructor; it is not called here because subclass fields are not yet
+     * initialized at this point.
+     */
+    protected Leaderboard(boolean histogramEnabled) {
+        this.histogramEnabled = histogramEnabled;
+        initialize();
     }
 
+    private void initialize() {
+        this.lock = new ReentrantReadWriteLock();
+        this.histogram = histogramEnabled ? new ScoreHistogram() : null;
+    }
+
+    // Storage primitives. Mutators are called with the write lock held, queries
+    // with at least the read lock held.
+
+    /**
+     * Creates empty storage. Also called on deserialization, before
+     * {@link #loadSorted(ScoreEntry[], int)}.
+     */
+    protected abstract void initializeStorage();
+
+    /**
+     * Stores the entry as the user's current score.
+     *
+     * @return the entry it replaced, or null if the user had none
+     */
+    protected abstract ScoreEntry replaceEntry(ScoreEntry newEntry);
+
+    /**
+     * Removes the entry only if it is still the user's current score.
+     *
+     * @return true if the entry was removed
+     */
+    protected abstract boolean removeEntry(ScoreEntry entry);
+
+    /**
+     * @return the user's 1-based rank, or -1 if the user has no score
+     */
+    protected abstract int rankOf(long userId);
+
+    /**
+     * @return an iterator over entries in rank order, starting at the given
+     *         1-based rank. Only valid while the lock is held.
+     */
+    protected abstract Iterator<ScoreEntry> iteratorFrom(int rank);
+
+    protected abstract int size();
+
+    protected abstract void clearEntries();
+
+    /**
+     * Fills empty storage with entries that are already in rank order.
+     */
+    protected abstract void loadSorted(ScoreEntry[] sortedEntries, int count);
+
+    /**
+     * @return the user's current entry, or null if the user has no score
+     */
+    protected abstract ScoreEntry entryOf(long userId);
+
+    public abstract ScoreEntry getUserScore(Long userId);
+
     public void addOrUpdateScore(ScoreEntry newEntry) {
-        ScoreEntry oldEntry = userScores.get(newEntry.userId());
+        lock.writeLock().lock();
+        try {
+            ScoreEntry oldEntry = replaceEntry(newEntry);
+            version++;
+            if (oldEntry != null) {
+                touchTopView(oldEntry);
+            }
+            touchTopView(newEntry);
+            if (histogram != null) {
+                if (oldEntry != null) {
+                    histogram.remove(oldEntry.score());
+                }
+                histogram.add(newEntry.score());
+            }
+        } finally {
+            lock.writeLock().unlock();
+        }
+    }
 
-        if (oldEntry != null) {
-            sortedScores.remove(oldEntry);
+    /**
+     * Adds or updates a batch of entries, in order, under a single write lock.
+     */
+    public void addOrUpdateScores(List<ScoreEntry> newEntries) {
+        if (newEntries.isEmpty()) {
+            return;
         }
 
-        sortedScores.add(newEntry);
-        userScores.put(newEntry.userId(), newEntry);
+        lock.writeLock().lock();
+        try {
+            for (ScoreEntry newEntry : newEntries) {
+                ScoreEntry oldEntry = replaceEntry(newEntry);
+                if (oldEntry != null) {
+                    touchTopView(oldEntry);
+                }
+                touchTopView(newEntry);
+                if (histogram != null) {
+                    if (oldEntry != null) {
+                        histogram.remove(oldEntry.score());
+                    }
+                    histogram.add(newEntry.score());
+                }
+            }
+            version++;
+        } finally {
+            lock.writeLock().unlock();
+        }
     }
 
     public void removeScore(ScoreEntry entryToRemove) {
@@ -44,54 +162,398 @@ public class Leaderboard implements Serializable {
             return;
         }
 
-        sortedScores.remove(entryToRemove);
-        userScores.computeIfPresent(entryToRemove.userId(),
-                (userId, currentEntry) -> currentEntry.equals(entryToRemove) ? null : currentEntry);
+        lock.writeLock().lock();
+        try {
+            // Only remove the entry if it is still the user's current score; a newer
+            // score may have replaced it since the removal was scheduled.
+            if (removeEntry(entryToRemove)) {
+                version++;
+                touchTopView(entryToRemove);
+                if (histogram != null) {
+                    histogram.remove(entryToRemove.score());
+                }
+            }
+        } finally {
+            lock.writeLock().unlock();
+        }
     }
 
-    public ScoreEntry getUserScore(Long userId) {
-        return userScores.get(userId);
+    /**
+     * Removes a batch of entries under a single write lock. Like
+     * {@link #removeScore(ScoreEntry)}, an entry is only removed if it is still
+     * the user's current score.
+     */
+    public void removeScores(List<ScoreEntry> entriesToRemove) {
+        if (entriesToRemove.isEmpty()) {
+            return;
+        }
+
+        lock.writeLock().lock();
+        try {
+            for (ScoreEntry entryToRemove : entriesToRemove) {
+                if (removeEntry(entryToRemove)) {
+                    version++;
+                    touchTopView(entryToRemove);
+                    if (histogram != null) {
+                        histogram.remove(entryToRemove.score());
+                    }
+                }
+            }
+        } finally {
+            lock.writeLock().unlock();
+        }
+    }
+
+    /**
+     * Adds a batch of entries under a single write lock, skipping users that
+     * already have a score, which is then newer than the batch.
+     *
+     * @return the entries that were added
+     */
+    public List<ScoreEntry> addScoresIfAbsent(List<ScoreEntry> newEntries) {
+        List<ScoreEntry> added = new ArrayList<>(newEntries.size());
+        lock.writeLock().lock();
+        try {
+            for (ScoreEntry newEntry : newEntries) {
+                if (entryOf(newEntry.userId()) == null) {
+                    // A window may still hold an entry that has left it but not
+                    // been pruned yet; it is replaced like any other
+                    ScoreEntry oldEntry = replaceEntry(newEntry);
+                    if (oldEntry != null) {
+                        touchTopView(oldEntry);
+                    }
+                    touchTopView(newEntry);
+                    added.add(newEntry);
+                    if (histogram != null) {
+                        if (oldEntry != null) {
+                            histogram.remove(oldEntry.score());
+                        }
+                        histogram.add(newEntry.score());
+                    }
+                }
+            }
+            if (!added.isEmpty()) {
+                version++;
+            }
+            return added;
+        } finally {
+            lock.writeLock().unlock();
+        }
+    }
+
+    /**
+     * Accounts for entries a subclass has dropped in bulk, without going through
+     * {@link #removeEntry(ScoreEntry)}. Called with the write lock held.
+     */
+    protected void entriesDropped(Iterable<ScoreEntry> droppedEntries) {
+        version++;
+        for (ScoreEntry entry : droppedEntries) {
+            if (topView == null) {
+                break;
+            }
+            touchTopView(entry);
+        }
+        if (histogram != null) {
+            for (ScoreEntry entry : droppedEntries) {
+                histogram.remove(entry.score());
+            }
+        }
+    }
+
+    // Drops the top view if adding or removing the entry changes it: the view
+    // holds every entry, or the entry ranks at or above its last one. Called
+    // with the write lock held.
+    private void touchTopView(ScoreEntry entry) {
+        TopKView view = topView;
+        if (view == null) {
+            return;
+        }
+        List<ScoreEntry> viewEntries = view.entries();
+        if (viewEntries.size() < TOP_VIEW_SIZE || entry.compareTo(viewEntries.get(viewEntries.size() - 1)) <= 0) {
+            topView = null;
+        }
+    }
+
+    /**
+     * Returns the first {@link #TOP_VIEW_SIZE} entries as an immutable view.
+     * The view is only rebuilt, under the read lock, when a write has landed
+     * inside it since it was taken; otherwise this reads one volatile field.
+     */
+    public TopKView getTopKView() {
+        TopKView view = topView;
+        if (view != null && isTopViewCurrent(view)) {
+            return view;
+        }
+        lock.readLock().lock();
+        try {
+            view = topView;
+            if (view == null || !isTopViewCurrent(view)) {
+                List<ScoreEntry> entries = new ArrayList<>(Math.min(TOP_VIEW_SIZE, size()));
+                Iterator<ScoreEntry> iterator = iteratorFrom(1);
+                while (entries.size() < TOP_VIEW_SIZE && iterator.hasNext()) {
+                    entries.add(iterator.next());
+                }
+                // Writers are held off, so concurrent readers build the same view
+                view = new TopKView(entries, version);
+                topView = view;
+            }
+            return view;
+        } finally {
+            lock.readLock().unlock();
+        }
+    }
+
+    /**
+     * Whether a view no write has touched still matches the entries. Subclasses
+     * whose entries can leave without a write override this.
+     */
+    protected boolean isTopViewCurrent(TopKView view) {
+        return true;
     }
 
     public List<ScoreEntry> getTopK(int k) {
         if (k <= 0) {
             return Collections.emptyList();
         }
+        if (k <= TOP_VIEW_SIZE) {
+            return getTopKView().top(k);
+        }
 
-        List<ScoreEntry> topK = new ArrayList<>(k);
-        int count = 0;
-        for (ScoreEntry entry : sortedScores) {
-            if (count >= k) {
-                break;
+        lock.readLock().lock();
+        try {
+            List<ScoreEntry> topK = new ArrayList<>(Math.min(k, size()));
+            Iterator<ScoreEntry> iterator = iteratorFrom(1);
+            while (topK.size() < k && iterator.hasNext()) {
+                topK.add(iterator.next());
+            }
+            return topK;
+        } finally {
+            lock.readLock().unlock();
+        }
+    }
+
+    /**
+     * Returns up to count entries starting at the given 1-based rank. Ranges
+     * inside the top view are sliced from it; others seek to the rank in the
+     * sorted storage and walk from there: O(log N) for the skip-list, compact
+     * and lazy-window storages, O(k^2 log^2 N) over the k buckets of a
+     * bucketed window.
+     */
+    public List<ScoreEntry> getRange(int fromRank, int count) {
+        if (fromRank < 1 || count <= 0) {
+            return Collections.emptyList();
+        }
+        if ((long) fromRank - 1 + count <= TOP_VIEW_SIZE) {
+            return getTopKView().slice(fromRank - 1, count);
+        }
+
+        lock.readLock().lock();
+        try {
+            List<ScoreEntry> range = new ArrayList<>(Math.min(count, Math.max(0, size() - fromRank + 1)));
+            Iterator<ScoreEntry> iterator = iteratorFrom(fromRank);
+            while (range.size() < count && iterator.hasNext()) {
+                range.add(iterator.next());
             }
-            topK.add(entry);
-            count++;
+            return range;
+        } finally {
+            lock.readLock().unlock();
+        }
+    }
+
+    /**
+     * Returns the user's entry with up to radius entries ranked directly above
+     * and below it, read under one read lock.
+     *
+     * @return null if the user has no entry
+     */
+    public RankRange getNeighbors(long userId, int radius) {
+        lock.readLock().lock();
+        try {
+            int rank = rankOf(userId);
+            if (rank < 1) {
+                return null;
+            }
+            int firstRank = Math.max(1, rank - radius);
+            int count = rank - firstRank + radius + 1;
+            List<ScoreEntry> entries = new ArrayList<>(count);
+            Iterator<ScoreEntry> iterator = iteratorFrom(firstRank);
+            while (entries.size() < count && iterator.hasNext()) {
+                entries.add(iterator.next());
+            }
+            return new RankRange(firstRank, entries);
+        } finally {
+            lock.readLock().unlock();
+        }
+    }
+
+    /**
+     * Looks up several users' ranks under one read lock, so they agree with
+     * each other and with the player count. The entries are looked up in rank
+     * order, so successive searches of the sorted storage follow nearby paths.
+     */
+    public RankLookup getUserRanks(Collection<Long> userIds) {
+        lock.readLock().lock();
+        try {
+            List<ScoreEntry> entries = new ArrayList<>(userIds.size());
+            for (Long userId : userIds) {
+                ScoreEntry entry = entryOf(userId);
+                if (entry != null) {
+                    entries.add(entry);
+                }
+            }
+            entries.sort(null);
+            int[] ranks = new int[entries.size()];
+            for (int i = 0; i < ranks.length; i++) {
+                ranks[i] = rankOf(entries.get(i).userId());
+            }
+            return new RankLookup(entries, ranks, size());
+        } finally {
+            lock.readLock().unlock();
         }
-        return topK;
     }
 
     public int getUserRank(Long userId) {
-        ScoreEntry userEntry = userScores.get(userId);
+        lock.readLock().lock();
+        try {
+            return rankOf(userId);
+        } finally {
+            lock.readLock().unlock();
+        }
+    }
+
+    /**
+     * Estimates the user's rank from the score histogram instead of the sorted
+     * storage: only the players within 0.1% of the user's score can be
+     * misplaced (see {@link ScoreHistogram}). The user's score is still read
+     * through {@link #getUserScore(Long)}, which takes the read lock for the
+     * compact storage and lazy windows; the histogram itself is read without
+     * it. Falls back to the exact rank when the histogram is disabled.
+     */
+    public int getApproximateUserRank(Long userId) {
+        if (histogram == null) {
+            return getUserRank(userId);
+        }
+        ScoreEntry userEntry = getUserScore(userId);
         if (userEntry == null) {
             return -1; // User not found
         }
+        return histogram.estimateRank(userEntry.score());
+    }
 
-        int rank = 1;
-        for (ScoreEntry entry : sortedScores) {
-            if (entry.equals(userEntry)) {
-                return rank;
+    /**
+     * Player count as seen by the score histogram, readable without locking.
+     * Falls back to the exact count when the histogram is disabled.
+     */
+    public int getApproximateTotalPlayers() {
+        if (histogram == null) {
+            return getTotalPlayers();
+        }
+        return histogram.getTotalCount();
+    }
+
+    /**
+     * @return a counter that changes whenever the entries change
+     */
+    public long getVersion() {
+        return version;
+    }
+
+    public boolean isHistogramEnabled() {
+        return histogramEnabled;
+    }
+
+    /**
+     * Copies the current entries in rank order. Writers are held off only for
+     * the duration of the copy.
+     */
+    public ScoreEntry[] copyEntries() {
+        lock.readLock().lock();
+        try {
+            ScoreEntry[] entries = new ScoreEntry[size()];
+            Iterator<ScoreEntry> iterator = iteratorFrom(1);
+            for (int i = 0; i < entries.length; i++) {
+                entries[i] = iterator.next();
             }
-            rank++;
+            return entries;
+        } finally {
+            lock.readLock().unlock();
+        }
+    }
+
+    /**
+     * Replaces the contents with entries that are already in rank order, with
+     * one entry per user. Builds the sorted storage in O(N) instead of N
+     * inserts.
+     */
+    public void loadEntries(ScoreEntry[] sortedEntries, int count) {
+        lock.writeLock().lock();
+        try {
+            clearEntries();
+            version++;
+            topView = null;
+            if (histogram != null) {
+                histogram.clear();
+                for (int i = 0; i < count; i++) {
+                    histogram.add(sortedEntries[i].score());
+                }
+            }
+            loadSorted(sortedEntries, count);
+        } finally {
+            lock.writeLock().unlock();
         }
-        return -1; // Should not happen if userEntry was found in userBestScores
     }
 
     public int getTotalPlayers() {
-        return sortedScores.size();
+        lock.readLock().lock();
+        try {
+            return size();
+        } finally {
+            lock.readLock().unlock();
+        }
     }
 
     public void clear() {
-        sortedScores.clear();
-        userScores.clear();
+        lock.writeLock().lock();
+        try {
+            clearEntries();
+            version++;
+            topView = null;
+            if (histogram != null) {
+                histogram.clear();
+            }
+        } finally {
+            lock.writeLock().unlock();
+        }
+    }
+
+    // The sorted storage is not serializable itself; entries are written in rank
+    // order and the storage is rebuilt in O(N) on load.
+    private void writeObject(ObjectOutputStream out) throws IOException {
+        out.defaultWriteObject();
+        lock.readLock().lock();
+        try {
+            out.writeInt(size());
+            Iterator<ScoreEntry> iterator = iteratorFrom(1);
+            while (iterator.hasNext()) {
+                out.writeObject(iterator.next());
+            }
+        } finally {
+            lock.readLock().unlock();
+        }
+    }
+
+    private void readObject(ObjectInputStream in) throws IOException, ClassNotFoundException {
+        in.defaultReadObject();
+        initialize();
+        initializeStorage();
+        int size = in.readInt();
+        ScoreEntry[] entries = new ScoreEntry[size];
+        for (int i = 0; i < size; i++) {
+            entries[i] = (ScoreEntry) in.readObject();
+            if (histogram != null) {
+                histogram.add(entries[i].score());
+            }
+        }
+        loadSorted(entries, size);
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,25 @@
+package com.ringgrank.model;
+
+/**
+ * Storage implementations available for a {@link Leaderboard}, selected with
+ * the leaderboard.storage property.
+ */
+public enum LeaderboardStorage {
+    /**
+     * ScoreEntry objects in an indexed skip list. Lock-free user score lookups,
+     * roughly 200 bytes per player.
+     */
+    SKIP_LIST,
+
+    /**
+     * Primitive columns with a chunked rank index. About 39 bytes per player.
+     */
+    COMPACT;
+
+    public Leaderboard create(long gameId, boolean histogramEnabled) {
+        return switch (this) {
+            case SKIP_LIST -> new SkipListLeaderboard(histogramEnabled);
+            case COMPACT -> new CompactLeaderboard(gameId, histogramEnabled);
+        };
+    }
+}
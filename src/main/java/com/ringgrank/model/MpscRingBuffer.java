@@ -0,0 +1,87 @@
+package com.ringgrank.model;
+
+import java.util.Collection;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.concurrent.atomic.AtomicReferenceArray;
+
+/**
+ * Bounded, lock-free ring buffer for many producers and a single consumer.
+ * A producer claims a slot with one CAS on the tail and publishes its element
+ * with a release store; the consumer takes elements in claim order and frees
+ * their slots. {@link #offer(Object)} fails instead of blocking when the
+ * buffer is full, so callers can push back.
+ *
+ * @param <E> element type; elements must not be null
+ */
+public class MpscRingBuffer<E> {
+    private final AtomicReferenceArray<E> slots;
+    private final int mask;
+    // Next sequence to claim; advanced by producers
+    private final AtomicLong tail = new AtomicLong();
+    // Next sequence to consume; only advanced by the consumer
+    private final AtomicLong head = new AtomicLong();
+
+    /**
+     * @param capacity rounded up to a power of two
+     */
+    public MpscRingBuffer(int capacity) {
+        int size = capacity <= 2 ? 2 : 1 << (32 - Integer.numberOfLeadingZeros(capacity - 1));
+        this.slots = new AtomicReferenceArray<>(size);
+        this.mask = size - 1;
+    }
+
+    /**
+     * @return false if the buffer is full
+     */
+    public boolean offer(E element) {
+        long claimed;
+        do {
+            claimed = tail.get();
+            if (claimed - head.get() >= slots.length()) {
+                return false;
+            }
+        } while (!tail.compareAndSet(claimed, claimed + 1));
+        slots.setRelease((int) claimed & mask, element);
+        return true;
+    }
+
+    /**
+     * Moves up to maxElements elements to the target, in claim order. Must only
+     * be called by the consumer. A slot that has been claimed but not yet
+     * published ends the drain; its element is taken by the next one.
+     *
+     * @return number of elements moved
+     */
+    public int drainTo(Collection<? super E> target, int maxElements) {
+        long next = head.get();
+        int drained = 0;
+        while (drained < maxElements) {
+            int index = (int) next & mask;
+            E element = slots.getAcquire(index);
+            if (element == null) {
+                break;
+            }
+            slots.setPlain(index, null);
+            target.add(element);
+            next++;
+            drained++;
+        }
+        if (drained > 0) {
+            // Publishes the freed slots to producers
+            head.setRelease(next);
+        }
+        return drained;
+    }
+
+    /**
+     * @return number of claimed slots not yet consumed; approximate while
+     *         producers or the consumer are active
+     */
+    public int size() {
+        return (int) Math.max(0, tail.get() - head.get());
+    }
+
+    public int capacity() {
+        return slots.length();
+    }
+}
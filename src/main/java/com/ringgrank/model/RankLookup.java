@@ -0,0 +1,14 @@
+package com.ringgrank.model;
+
+import java.util.List;
+
+/**
+ * Ranks of several users, read together.
+ *
+ * @param entries      the users' entries in rank order; users without one are
+ *                     left out
+ * @param ranks        1-based rank of each entry
+ * @param totalPlayers player count at the time of the lookup
+ */
+public record RankLookup(List<ScoreEntry> entries, int[] ranks, int totalPlayers) {
+}
@@ -0,0 +1,11 @@
+package com.ringgrank.model;
+
+import java.util.List;
+
+/**
+ * Consecutive entries of a leaderboard.
+ *
+ * @param firstRank 1-based rank of the first entry
+ */
+public record RankRange(int firstRank, List<ScoreEntry> entries) {
+}
@@ -7,7 +7,7 @@ import java.util.Objects;
  * Represents a single score entry in the leaderboard.
  * Uses numeric IDs for userId and gameId.
  * Implements Comparable for sorting (highest score first, then earliest
- * timestamp).
+ * timestamp, then lowest userId).
  */
 public record ScoreEntry(
         long userId,
@@ -20,6 +20,8 @@ public record ScoreEntry(
      * Primary sort: by score in descending order (higher score is better).
      * Secondary sort: by timestamp in ascending order (earlier submission is better
      * for ties).
+     * Tertiary sort: by userId in ascending order, so that two players with the
+     * same score and timestamp remain distinct entries in the sorted index.
      *
      * @param other The other ScoreEntry to compare against.
      * @return a negative integer, zero, or a positive integer as this object
@@ -33,7 +35,11 @@ public record ScoreEntry(
             return scoreCompare;
         }
         // If scores are tied, compare timestamps (ascending - earlier is better)
-        return Long.compare(this.timestamp, other.timestamp);
+        int timestampCompare = Long.compare(this.timestamp, other.timestamp);
+        if (timestampCompare != 0) {
+            return timestampCompare;
+        }
+        return Long.compare(this.userId, other.userId);
     }
 
     // Override equals and hashCode to ensure correct behavior in Sets/Maps if
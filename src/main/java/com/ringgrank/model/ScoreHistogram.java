@@ -0,0 +1,112 @@
+package com.ringgrank.model;
+
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicIntegerArray;
+
+/**
+ * Log-linear histogram of scores used to answer approximate rank queries at a
+ * cost that does not depend on the number of players.
+ * Scores below 2^SUB_BUCKET_BITS get one bucket each; larger scores share
+ * buckets whose width is between 1/2^SUB_BUCKET_BITS and 1/2^(SUB_BUCKET_BITS
+ * - 1) of the scores in them (0.05% to 0.1%). Bucket counts are kept in a
+ * Fenwick tree (about 216KB), so the number of scores above a value is a
+ * prefix sum over a fixed number of buckets.
+ * Scores in other buckets are counted exactly, so an estimated rank is only
+ * off by the players whose scores are within 0.1% of the estimated score:
+ * the share of its bucket is interpolated as if scores were spread evenly.
+ * Updates must be serialized by the caller; reads are lock-free.
+ */
+public class ScoreHistogram {
+    private static final int SUB_BUCKET_BITS = 11;
+    private static final int SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS;
+    private static final int HALF_SUB_BUCKET_COUNT = SUB_BUCKET_COUNT >> 1;
+    private static final int BUCKET_COUNT = SUB_BUCKET_COUNT + (63 - SUB_BUCKET_BITS) * HALF_SUB_BUCKET_COUNT;
+
+    // 1-based Fenwick tree over bucket counts
+    private final AtomicIntegerArray tree = new AtomicIntegerArray(BUCKET_COUNT + 1);
+    private final AtomicInteger totalCount = new AtomicInteger();
+
+    public void add(long score) {
+        update(bucketIndex(score), 1);
+        totalCount.incrementAndGet();
+    }
+
+    public void remove(long score) {
+        update(bucketIndex(score), -1);
+        totalCount.decrementAndGet();
+    }
+
+    public int getTotalCount() {
+        return totalCount.get();
+    }
+
+    /**
+     * Estimates the 1-based rank of a score: the number of scores in higher
+     * buckets, plus the share of its own bucket that lies above it assuming
+     * scores are spread evenly within the bucket.
+     */
+    public int estimateRank(long score) {
+        int bucket = bucketIndex(score);
+        int total = totalCount.get();
+        int atOrBelow = prefixSum(bucket);
+        int inBucket = atOrBelow - prefixSum(bucket - 1);
+        int above = total - atOrBelow;
+
+        long lowest = bucketLowerBound(bucket);
+        long width = bucketUpperBound(bucket) - lowest + 1;
+        long clampedScore = Math.max(score, lowest);
+        long aboveInBucket = (long) Math.floor(inBucket * (double) (width - 1 - (clampedScore - lowest)) / width);
+
+        long rank = above + aboveInBucket + 1;
+        return (int) Math.max(1, Math.min(rank, Math.max(total, 1)));
+    }
+
+    public void clear() {
+        for (int i = 0; i < tree.length(); i++) {
+            tree.set(i, 0);
+        }
+        totalCount.set(0);
+    }
+
+    private void update(int bucket, int delta) {
+        for (int i = bucket + 1; i <= BUCKET_COUNT; i += i & -i) {
+            tree.addAndGet(i, delta);
+        }
+    }
+
+    // Number of scores in buckets [0, bucket]
+    private int prefixSum(int bucket) {
+        int sum = 0;
+        for (int i = bucket + 1; i > 0; i -= i & -i) {
+            sum += tree.get(i);
+        }
+        return sum;
+    }
+
+    static int bucketIndex(long score) {
+        if (score < SUB_BUCKET_COUNT) {
+            return (int) Math.max(score, 0);
+        }
+        int magnitude = 63 - Long.numberOfLeadingZeros(score) - SUB_BUCKET_BITS;
+        int subBucket = (int) (score >>> (magnitude + 1)) - HALF_SUB_BUCKET_COUNT;
+        return SUB_BUCKET_COUNT + magnitude * HALF_SUB_BUCKET_COUNT + subBucket;
+    }
+
+    static long bucketLowerBound(int bucket) {
+        if (bucket < SUB_BUCKET_COUNT) {
+            return bucket;
+        }
+        int offset = bucket - SUB_BUCKET_COUNT;
+        int magnitude = offset / HALF_SUB_BUCKET_COUNT;
+        int subBucket = offset % HALF_SUB_BUCKET_COUNT;
+        return (long) (HALF_SUB_BUCKET_COUNT + subBucket) << (magnitude + 1);
+    }
+
+    static long bucketUpperBound(int bucket) {
+        if (bucket < SUB_BUCKET_COUNT) {
+            return bucket;
+        }
+        int magnitude = (bucket - SUB_BUCKET_COUNT) / HALF_SUB_BUCKET_COUNT;
+        return bucketLowerBound(bucket) + (1L << (magnitude + 1)) - 1;
+    }
+}
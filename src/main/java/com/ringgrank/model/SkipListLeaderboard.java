@@ -0,0 +1,100 @@
+package com.ringgrank.model;
+
+import java.util.Iterator;
+import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
+
+/**
+ * Leaderboard storage backed by an {@link IndexedSkipList} of ScoreEntry
+ * objects and a map for quick user score lookup.
+ * Costs roughly 200 bytes per player, but user score lookups never take the
+ * leaderboard lock.
+ */
+public class SkipListLeaderboard extends Leaderboard {
+    private static final long serialVersionUID = 1L;
+
+    // Stores all score entries, sorted by score (desc) and then timestamp (asc).
+    // Every link carries its span, so rank lookups are O(log N) instead of a walk
+    // from the head.
+    private transient IndexedSkipList<ScoreEntry> sortedScores;
+
+    // Maps userId to their current ScoreEntry for O(1) lookup
+    private transient Map<Long, ScoreEntry> userScores;
+
+    public SkipListLeaderboard() {
+        this(false);
+    }
+
+    public SkipListLeaderboard(boolean histogramEnabled) {
+        super(histogramEnabled);
+        initializeStorage();
+    }
+
+    @Override
+    protected void initializeStorage() {
+        this.sortedScores = new IndexedSkipList<>(ScoreEntry::compareTo);
+        this.userScores = new ConcurrentHashMap<>();
+    }
+
+    @Override
+    protected ScoreEntry replaceEntry(ScoreEntry newEntry) {
+        ScoreEntry oldEntry = userScores.put(newEntry.userId(), newEntry);
+        if (oldEntry != null) {
+            sortedScores.remove(oldEntry);
+        }
+        sortedScores.add(newEntry);
+        return oldEntry;
+    }
+
+    @Override
+    protected boolean removeEntry(ScoreEntry entry) {
+        if (userScores.remove(entry.userId(), entry)) {
+            sortedScores.remove(entry);
+            return true;
+        }
+        return false;
+    }
+
+    @Override
+    protected int rankOf(long userId) {
+        ScoreEntry userEntry = userScores.get(userId);
+        if (userEntry == null) {
+            return -1; // User not found
+        }
+        return sortedScores.rankOf(userEntry);
+    }
+
+    @Override
+    protected Iterator<ScoreEntry> iteratorFrom(int rank) {
+        return sortedScores.iteratorFrom(rank);
+    }
+
+    @Override
+    protected int size() {
+        return sortedScores.size();
+    }
+
+    @Override
+    protected void clearEntries() {
+        sortedScores.clear();
+        userScores.clear();
+    }
+
+    @Override
+    protected void loadSorted(ScoreEntry[] sortedEntries, int count) {
+        for (int i = 0; i < count; i++) {
+            userScores.put(sortedEntries[i].userId(), sortedEntries[i]);
+        }
+        sortedScores.buildFromSorted(sortedEntries, count);
+    }
+
+    @Override
+    protected ScoreEntry entryOf(long userId) {
+        return userScores.get(userId);
+    }
+
+    @Override
+    public ScoreEntry getUserScore(Long userId) {
+        return entryOf(userId);
+    }
+}
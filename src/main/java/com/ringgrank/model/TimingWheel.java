@@ -0,0 +1,150 @@
+package com.ringgrank.model;
+
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Queue;
+import java.util.concurrent.ConcurrentLinkedQueue;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.concurrent.locks.ReadWriteLock;
+import java.util.concurrent.locks.ReentrantReadWriteLock;
+
+/**
+ * Hierarchical timing wheel for scheduling items to expire at a given time.
+ * Time is divided into ticks of tickMs. Level 0 has one slot per tick, and
+ * every higher level has slots WHEEL_SIZE times wider than the level below, so
+ * LEVELS levels of WHEEL_SIZE slots cover WHEEL_SIZE^LEVELS ticks (with 1
+ * second ticks: about a minute, an hour, three days and half a year). An item
+ * goes into the lowest level whose range covers it. When time reaches a
+ * higher-level slot, its items move down a level; when it reaches a level 0
+ * slot, its items are due.
+ * Adding an item is O(1): a lock-free append to one slot, done under a shared
+ * lock that only {@link #advance(long)} takes exclusively, once per tick.
+ * Items are never due before their expiration time, and at most one tick
+ * after it.
+ */
+public class TimingWheel<T> {
+    private static final int WHEEL_BITS = 6;
+    private static final int WHEEL_SIZE = 1 << WHEEL_BITS;
+    private static final int WHEEL_MASK = WHEEL_SIZE - 1;
+    private static final int LEVELS = 4;
+
+    private final long tickMs;
+    // [level][slot]
+    private final Queue<Scheduled<T>>[][] slots;
+    // Items whose tick had already been reached when they were added
+    private final Queue<Scheduled<T>> due = new ConcurrentLinkedQueue<>();
+    private final AtomicLong size = new AtomicLong();
+    // Held shared by add(), exclusively while a tick is processed
+    private final ReadWriteLock tickLock = new ReentrantReadWriteLock();
+    // Last processed tick; written with tickLock held exclusively
+    private volatile long currentTick;
+
+    private record Scheduled<T>(T item, long expirationTick) {
+    }
+
+    @SuppressWarnings("unchecked")
+    public TimingWheel(long tickMs, long startTime) {
+        this.tickMs = tickMs;
+        this.slots = new Queue[LEVELS][WHEEL_SIZE];
+        for (int level = 0; level < LEVELS; level++) {
+            for (int slot = 0; slot < WHEEL_SIZE; slot++) {
+                slots[level][slot] = new ConcurrentLinkedQueue<>();
+            }
+        }
+        this.currentTick = startTime / tickMs;
+    }
+
+    public void add(T item, long expirationTime) {
+        // Round up, so that an item never becomes due early
+        long expirationTick = Math.ceilDiv(expirationTime, tickMs);
+        tickLock.readLock().lock();
+        try {
+            place(new Scheduled<>(item, expirationTick));
+        } finally {
+            tickLock.readLock().unlock();
+        }
+        size.incrementAndGet();
+    }
+
+    /**
+     * Moves time forward to the given time and returns every item that has
+     * become due, in no particular order.
+     */
+    public List<T> advance(long now) {
+        List<T> expired = new ArrayList<>();
+        long targetTick = now / tickMs;
+        while (true) {
+            tickLock.writeLock().lock();
+            try {
+                if (currentTick >= targetTick) {
+                    break;
+                }
+                currentTick++;
+                // Cascade from the top, so items landing in level 0 for this very
+                // tick are collected below
+                for (int level = LEVELS - 1; level > 0; level--) {
+                    if ((currentTick & ((1L << (level * WHEEL_BITS)) - 1)) == 0) {
+                        Queue<Scheduled<T>> slot = slots[level][slotIndex(currentTick, level)];
+                        Scheduled<T> scheduled;
+                        while ((scheduled = slot.poll()) != null) {
+                            place(scheduled);
+                        }
+                    }
+                }
+                drainTo(slots[0][slotIndex(currentTick, 0)], expired);
+            } finally {
+                tickLock.writeLock().unlock();
+            }
+        }
+        drainTo(due, expired);
+        size.addAndGet(-expired.size());
+        return expired;
+    }
+
+    /**
+     * @return the time up to which due items have been returned by
+     *         {@link #advance(long)}
+     */
+    public long currentTime() {
+        return currentTick * tickMs;
+    }
+
+    /**
+     * @return number of items not yet returned by {@link #advance(long)}
+     */
+    public long size() {
+        return size.get();
+    }
+
+    // Called with tickLock held, shared or exclusive
+    private void place(Scheduled<T> scheduled) {
+        long expirationTick = scheduled.expirationTick();
+        if (expirationTick <= currentTick) {
+            due.add(scheduled);
+            return;
+        }
+        for (int level = 0; level < LEVELS; level++) {
+            int shift = level * WHEEL_BITS;
+            if ((expirationTick >> shift) - (currentTick >> shift) < WHEEL_SIZE) {
+                slots[level][slotIndex(expirationTick, level)].add(scheduled);
+                return;
+            }
+        }
+        // Beyond the wheel's range: park it in the furthest top-level slot, from
+        // which it is placed again when time gets there
+        int topLevel = LEVELS - 1;
+        long furthestTick = ((currentTick >> (topLevel * WHEEL_BITS)) + WHEEL_MASK) << (topLevel * WHEEL_BITS);
+        slots[topLevel][slotIndex(furthestTick, topLevel)].add(scheduled);
+    }
+
+    private static int slotIndex(long tick, int level) {
+        return (int) ((tick >> (level * WHEEL_BITS)) & WHEEL_MASK);
+    }
+
+    private static <T> void drainTo(Queue<Scheduled<T>> queue, List<T> expired) {
+        Scheduled<T> scheduled;
+        while ((scheduled = queue.poll()) != null) {
+            expired.add(scheduled.item());
+        }
+    }
+}
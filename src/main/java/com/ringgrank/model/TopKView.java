@@ -0,0 +1,77 @@
+package com.ringgrank.model;
+
+import java.util.List;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.function.Function;
+
+/**
+ * Immutable copy of the first {@link Leaderboard#TOP_VIEW_SIZE} entries of a
+ * leaderboard, in rank order. A leaderboard keeps one and replaces it only
+ * after a write lands inside it, so top-K reads take a slice without walking
+ * the sorted storage or taking its lock. Values derived from the view (such as
+ * its encoded JSON) can be cached with it and are shared by every read of the
+ * same view.
+ */
+public final class TopKView {
+    private final List<ScoreEntry> entries;
+    private final long version;
+    private final long oldestTimestamp;
+    private final ConcurrentHashMap<Object, Object> derived = new ConcurrentHashMap<>();
+
+    TopKView(List<ScoreEntry> entries, long version) {
+        this.entries = List.copyOf(entries);
+        this.version = version;
+        long oldest = Long.MAX_VALUE;
+        for (ScoreEntry entry : this.entries) {
+            oldest = Math.min(oldest, entry.timestamp());
+        }
+        this.oldestTimestamp = oldest;
+    }
+
+    /**
+     * @return the entries in rank order; unmodifiable
+     */
+    public List<ScoreEntry> entries() {
+        return entries;
+    }
+
+    /**
+     * @return the first k entries; unmodifiable
+     */
+    public List<ScoreEntry> top(int k) {
+        return entries.subList(0, Math.max(0, Math.min(k, entries.size())));
+    }
+
+    /**
+     * @return up to count entries starting at the given 0-based position;
+     *         unmodifiable
+     */
+    public List<ScoreEntry> slice(int from, int count) {
+        int start = Math.min(Math.max(0, from), entries.size());
+        return entries.subList(start, Math.max(start, Math.min(start + count, entries.size())));
+    }
+
+    /**
+     * @return the leaderboard's version when the view was taken
+     */
+    public long version() {
+        return version;
+    }
+
+    /**
+     * @return the oldest timestamp among the entries, or Long.MAX_VALUE if
+     *         there are none
+     */
+    public long oldestTimestamp() {
+        return oldestTimestamp;
+    }
+
+    /**
+     * Returns the value derived from this view under the given key, computing
+     * it on first use.
+     */
+    @SuppressWarnings("unchecked")
+    public <T> T derive(Object key, Function<TopKView, T> derivation) {
+        return (T) derived.computeIfAbsent(key, k -> derivation.apply(this));
+    }
+}
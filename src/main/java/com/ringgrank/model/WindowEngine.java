@@ -0,0 +1,39 @@
+package com.ringgrank.model;
+
+import java.time.Duration;
+
+/**
+ * How windowed leaderboards expire scores, selected with the
+ * leaderboard.window.engine property.
+ */
+public enum WindowEngine {
+    /**
+     * Every score in a window is scheduled for removal on its own, so windows
+     * are exact to an expiry tick. Uses the configured
+     * {@link LeaderboardStorage}.
+     */
+    PER_ENTRY,
+
+    /**
+     * Scores are grouped in time buckets that are dropped as a whole (see
+     * {@link BucketedWindowLeaderboard}). Expiry work depends on the number of
+     * buckets instead of the number of scores, which makes long windows cheap.
+     */
+    BUCKETED,
+
+    /**
+     * Scores are not scheduled for removal at all: queries skip the ones that
+     * have left the window and prune them, and a low-priority background task
+     * compacts the rest (see {@link LazyWindowLeaderboard}). Suits games that
+     * are read rarely. Uses the configured {@link LeaderboardStorage}.
+     */
+    LAZY;
+
+    public Leaderboard create(LeaderboardStorage storage, long gameId, boolean histogramEnabled, Duration window) {
+        return switch (this) {
+            case PER_ENTRY -> storage.create(gameId, histogramEnabled);
+            case BUCKETED -> new BucketedWindowLeaderboard(window, histogramEnabled);
+            case LAZY -> new LazyWindowLeaderboard(storage.create(gameId, false), window, histogramEnabled);
+        };
+    }
+}
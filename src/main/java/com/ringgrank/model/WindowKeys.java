@@ -0,0 +1,41 @@
+package com.ringgrank.model;
+
+import java.time.Duration;
+import java.util.regex.Matcher;
+import java.util.regex.Pattern;
+
+import com.ringgrank.exception.InvalidWindowException;
+
+/**
+ * Parses window keys such as "24h", "7d" or "30m" into durations. Units are
+ * s or S (seconds), m (minutes), h (hours), d (days) and M (months of 30 days).
+ */
+public final class WindowKeys {
+    private static final Pattern WINDOW_KEY = Pattern.compile("^([1-9][0-9]*)([hmMdsS])$");
+
+    private WindowKeys() {
+    }
+
+    /**
+     * @throws InvalidWindowException if the key is malformed or too large
+     */
+    public static Duration parse(String windowKey) {
+        Matcher matcher = windowKey == null ? null : WINDOW_KEY.matcher(windowKey);
+        if (matcher == null || !matcher.matches()) {
+            throw new InvalidWindowException("Window format is invalid: '" + windowKey
+                    + "'. Examples: '24h', '7d', '30m'.");
+        }
+        try {
+            long amount = Long.parseLong(matcher.group(1));
+            return switch (matcher.group(2).charAt(0)) {
+                case 's', 'S' -> Duration.ofSeconds(amount);
+                case 'm' -> Duration.ofMinutes(amount);
+                case 'h' -> Duration.ofHours(amount);
+                case 'd' -> Duration.ofDays(amount);
+                default -> Duration.ofDays(Math.multiplyExact(amount, 30L)); // 'M'
+            };
+        } catch (ArithmeticException | NumberFormatException e) {
+            throw new InvalidWindowException("Window is too large: '" + windowKey + "'", e);
+        }
+    }
+}
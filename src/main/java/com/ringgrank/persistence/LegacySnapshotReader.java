@@ -0,0 +1,142 @@
+package com.ringgrank.persistence;
+
+import java.io.BufferedInputStream;
+import java.io.EOFException;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.ObjectInputStream;
+import java.io.ObjectStreamClass;
+import java.io.ObjectStreamField;
+import java.io.Serializable;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+import java.util.Map;
+import java.util.NavigableSet;
+import java.util.function.Consumer;
+
+import com.ringgrank.model.GameSnapshot;
+import com.ringgrank.model.ScoreEntry;
+
+/**
+ * Reads a snapshot written by the first version of the service, which
+ * Java-serialized each game as {@code gameId, GameLeaderboardSet} pairs. The
+ * model classes have changed shape since, so the old object graph is read
+ * into private classes with the old fields and handed to a consumer as
+ * {@link GameSnapshot}s, to be restored like any other snapshot.
+ */
+public final class LegacySnapshotReader {
+    private static final String LEGACY_GAME_SET = "com.ringgrank.model.GameLeaderboardSet";
+    private static final String LEGACY_LEADERBOARD = "com.ringgrank.model.Leaderboard";
+
+    private LegacySnapshotReader() {
+    }
+
+    /**
+     * @return number of games read
+     * @throws IOException if the file cannot be read or is not a legacy
+     *                     snapshot
+     */
+    public static int read(Path path, Consumer<GameSnapshot> consumer) throws IOException {
+        int games = 0;
+        try (LegacyObjectInputStream in = new LegacyObjectInputStream(
+                new BufferedInputStream(Files.newInputStream(path)))) {
+            while (true) {
+                long gameId;
+                try {
+                    gameId = in.readLong();
+                } catch (EOFException e) {
+                    return games;
+                }
+                if (!(in.readObject() instanceof LegacyGameSet gameSet)) {
+                    throw new IOException("Unexpected object for game " + gameId + " in legacy snapshot " + path);
+                }
+                consumer.accept(toSnapshot(gameId, gameSet));
+                games++;
+            }
+        } catch (ClassNotFoundException e) {
+            throw new IOException("Failed to read legacy snapshot " + path, e);
+        }
+    }
+
+    private static GameSnapshot toSnapshot(long gameId, LegacyGameSet gameSet) {
+        List<GameSnapshot.Window> windows = new ArrayList<>();
+        if (gameSet.windowedLeaderboards != null && gameSet.windowDurations != null) {
+            gameSet.windowedLeaderboards.forEach((windowKey, leaderboard) -> {
+                Duration duration = gameSet.windowDurations.get(windowKey);
+                if (duration != null) {
+                    windows.add(new GameSnapshot.Window(windowKey, duration, entries(leaderboard)));
+                }
+            });
+        }
+        return new GameSnapshot(gameId, entries(gameSet.allTimeLeaderboard), windows);
+    }
+
+    // Taken from the user map, which holds exactly one entry per user, and put
+    // in rank order
+    private static ScoreEntry[] entries(LegacyLeaderboard leaderboard) {
+        if (leaderboard == null || leaderboard.userScores == null) {
+            return new ScoreEntry[0];
+        }
+        ScoreEntry[] entries = leaderboard.userScores.values().toArray(new ScoreEntry[0]);
+        Arrays.sort(entries);
+        return entries;
+    }
+
+    /**
+     * Reads the legacy model classes as their private counterparts below. Their
+     * fields have the same names and order as the legacy classes, so the
+     * counterpart's descriptor describes the stream's data exactly.
+     */
+    private static final class LegacyObjectInputStream extends ObjectInputStream {
+        private LegacyObjectInputStream(InputStream in) throws IOException {
+            super(in);
+        }
+
+        @Override
+        protected ObjectStreamClass readClassDescriptor() throws IOException, ClassNotFoundException {
+            ObjectStreamClass descriptor = super.readClassDescriptor();
+            return switch (descriptor.getName()) {
+                case LEGACY_GAME_SET -> legacyDescriptor(descriptor, LegacyGameSet.class);
+                case LEGACY_LEADERBOARD -> legacyDescriptor(descriptor, LegacyLeaderboard.class);
+                default -> descriptor;
+            };
+        }
+
+        private static ObjectStreamClass legacyDescriptor(ObjectStreamClass descriptor, Class<?> legacyClass)
+                throws IOException {
+            ObjectStreamClass legacy = ObjectStreamClass.lookup(legacyClass);
+            boolean matches = descriptor.getSerialVersionUID() == legacy.getSerialVersionUID()
+                    && descriptor.getFields().length == legacy.getFields().length;
+            for (ObjectStreamField field : legacy.getFields()) {
+                ObjectStreamField streamField = descriptor.getField(field.getName());
+                matches &= streamField != null && streamField.getTypeCode() == field.getTypeCode();
+            }
+            if (!matches) {
+                throw new IOException("Unsupported version of " + descriptor.getName() + " in legacy snapshot");
+            }
+            return legacy;
+        }
+    }
+
+    // Fields of the legacy GameLeaderboardSet; its DelayQueue was transient
+    private static final class LegacyGameSet implements Serializable {
+        private static final long serialVersionUID = 1L;
+
+        private long gameId;
+        private LegacyLeaderboard allTimeLeaderboard;
+        private Map<String, LegacyLeaderboard> windowedLeaderboards;
+        private Map<String, Duration> windowDurations;
+    }
+
+    // Fields of the legacy Leaderboard
+    private static final class LegacyLeaderboard implements Serializable {
+        private static final long serialVersionUID = 1L;
+
+        private NavigableSet<ScoreEntry> sortedScores;
+        private Map<Long, ScoreEntry> userScores;
+    }
+}
@@ -0,0 +1,159 @@
+package com.ringgrank.persistence;
+
+import java.io.IOException;
+import java.util.concurrent.ArrayBlockingQueue;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicReference;
+
+/**
+ * Fans replayed WAL records out to worker threads, partitioned by gameId.
+ * Every record of a game goes to the same worker, in log order, so per-game
+ * ordering is preserved while different games are applied in parallel. The
+ * reader thread only decodes and batches records; the delegate runs on the
+ * workers and must be safe to call concurrently for different games.
+ * Closing the dispatcher flushes the remaining records and waits for the
+ * workers to finish.
+ */
+public class PartitionedReplayDispatcher implements WalReader.RecordConsumer, AutoCloseable {
+    private static final int FIELDS_PER_RECORD = 4;
+    private static final int BATCH_RECORDS = 1024;
+    // Bounds the records buffered per worker to keep memory flat on huge logs
+    private static final int LANE_QUEUE_CAPACITY = 16;
+    // How often the reader checks that a worker it is waiting on is still alive
+    private static final long PUT_CHECK_INTERVAL_MS = 100;
+    private static final Batch END_OF_STREAM = new Batch(new long[0], 0);
+
+    private final WalReader.RecordConsumer delegate;
+    private final Lane[] lanes;
+    private final AtomicReference<Throwable> failure = new AtomicReference<>();
+
+    /**
+     * @param threads  number of worker threads; 1 or less applies records on the
+     *                 calling thread
+     * @param delegate receives the records on the worker threads
+     */
+    public PartitionedReplayDispatcher(int threads, WalReader.RecordConsumer delegate) {
+        this.delegate = delegate;
+        this.lanes = new Lane[threads > 1 ? threads : 0];
+        for (int i = 0; i < lanes.length; i++) {
+            lanes[i] = new Lane("WalReplay-" + i);
+        }
+    }
+
+    @Override
+    public void accept(long timestamp, long gameId, long userId, long score) {
+        if (lanes.length == 0) {
+            delegate.accept(timestamp, gameId, userId, score);
+            return;
+        }
+        lanes[Math.floorMod(Long.hashCode(gameId), lanes.length)].add(timestamp, gameId, userId, score);
+    }
+
+    /**
+     * Applies all buffered records and stops the workers.
+     *
+     * @throws IOException if a worker failed to apply a record
+     */
+    @Override
+    public void close() throws IOException {
+        for (Lane lane : lanes) {
+            lane.flush();
+            lane.put(END_OF_STREAM);
+        }
+        for (Lane lane : lanes) {
+            try {
+                lane.thread.join();
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                throw new IOException("Interrupted while waiting for WAL replay", e);
+            }
+        }
+        Throwable cause = failure.get();
+        if (cause != null) {
+            throw new IOException("Failed to apply replayed WAL records", cause);
+        }
+    }
+
+    private record Batch(long[] records, int count) {
+    }
+
+    private final class Lane {
+        private final BlockingQueue<Batch> batches = new ArrayBlockingQueue<>(LANE_QUEUE_CAPACITY);
+        private final Thread thread;
+        // Only touched by the reader thread
+        private long[] current = new long[BATCH_RECORDS * FIELDS_PER_RECORD];
+        private int count;
+
+        Lane(String name) {
+            thread = new Thread(this::run, name);
+            thread.setDaemon(true);
+            thread.start();
+        }
+
+        void add(long timestamp, long gameId, long userId, long score) {
+            int index = count * FIELDS_PER_RECORD;
+            current[index] = timestamp;
+            current[index + 1] = gameId;
+            current[index + 2] = userId;
+            current[index + 3] = score;
+            if (++count == BATCH_RECORDS) {
+                flush();
+            }
+        }
+
+        void flush() {
+            if (count == 0) {
+                return;
+            }
+            put(new Batch(current, count));
+            current = new long[BATCH_RECORDS * FIELDS_PER_RECORD];
+            count = 0;
+        }
+
+        // Gives up on a worker that has died, so the reader never waits on a queue
+        // that nobody drains; the failure is reported by close()
+        void put(Batch batch) {
+            try {
+                while (!batches.offer(batch, PUT_CHECK_INTERVAL_MS, TimeUnit.MILLISECONDS)) {
+                    if (!thread.isAlive()) {
+                        failure.compareAndSet(null, new IllegalStateException(thread.getName() + " stopped"));
+                        return;
+                    }
+                }
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                throw new IllegalStateException("Interrupted while dispatching WAL records", e);
+            }
+        }
+
+        private void run() {
+            while (true) {
+                Batch batch;
+                try {
+                    batch = batches.take();
+                } catch (InterruptedException e) {
+                    failure.compareAndSet(null, e);
+                    continue;
+                }
+                if (batch == END_OF_STREAM) {
+                    return;
+                }
+                // After a failure, an interrupt included, keep taking batches until
+                // the end of the stream without applying them, so the reader never
+                // blocks on a full queue
+                if (failure.get() != null) {
+                    continue;
+                }
+                try {
+                    long[] records = batch.records();
+                    for (int index = 0; index < batch.count() * FIELDS_PER_RECORD; index += FIELDS_PER_RECORD) {
+                        delegate.accept(records[index], records[index + 1], records[index + 2], records[index + 3]);
+                    }
+                } catch (RuntimeException e) {
+                    failure.compareAndSet(null, e);
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,41 @@
+package com.ringgrank.persistence;
+
+/**
+ * Layout of the snapshot file.
+ *
+ * <pre>
+ * file     := header body
+ * header (32 bytes) := magic:int "RGSN" | version:int | flags:int | reserved:int |
+ *                      walSequence:long | createdAt:long
+ * body     := game* endOfGames:byte checksum:int
+ * game     := gameFollows:byte | gameId:long | columns | windowCount:int | window{windowCount}
+ * window   := windowKey:utf | durationMillis:long | refCount:int | allTimeIndex:int{refCount} | columns
+ * columns  := entryCount:int | userId:long{entryCount} | score:long{entryCount} |
+ *             timestamp:long{entryCount}
+ * </pre>
+ *
+ * Values are big-endian. Each leaderboard is stored column by column in rank
+ * order, so it can be bulk-loaded without sorting. A windowed leaderboard
+ * mostly holds the same entries as the all-time one; those are stored as
+ * 0-based indexes into the all-time columns (in ascending order), and only the
+ * entries that differ are stored as columns of their own. The two lists are
+ * merged back by rank on load.
+ *
+ * If {@link #FLAG_DEFLATE} is set, the body is deflate-compressed. The checksum
+ * is the CRC32C of the header and the uncompressed body before it.
+ * walSequence is the first WAL segment not covered by the snapshot: replay
+ * starts there.
+ */
+public final class SnapshotFormat {
+    public static final int MAGIC = 0x5247534E; // "RGSN"
+    public static final int VERSION = 2;
+    public static final int HEADER_SIZE = 32;
+
+    public static final int FLAG_DEFLATE = 1;
+
+    public static final byte GAME_FOLLOWS = 1;
+    public static final byte END_OF_GAMES = 0;
+
+    private SnapshotFormat() {
+    }
+}
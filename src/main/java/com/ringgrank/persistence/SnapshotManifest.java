@@ -0,0 +1,116 @@
+package com.ringgrank.persistence;
+
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.DataOutputStream;
+import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.nio.channels.FileChannel;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.nio.file.StandardCopyOption;
+import java.nio.file.StandardOpenOption;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.zip.CRC32C;
+
+/**
+ * Ties the per-game snapshot files of an incremental snapshot to the WAL
+ * position they cover. Each game file holds one game in
+ * {@link SnapshotFormat}; a game that has not changed since the previous
+ * snapshot keeps its file, so a snapshot only rewrites the games that changed.
+ *
+ * <pre>
+ * manifest := magic:int "RGSM" | version:int | generation:long | walSequence:long |
+ *             gameCount:int | game{gameCount} | checksum:int
+ * game     := gameId:long | gameVersion:long | fileName:utf
+ * </pre>
+ *
+ * The checksum is the CRC32C of every byte before it. The manifest is replaced
+ * atomically, so a snapshot takes effect all at once.
+ *
+ * @param generation  incremented by every snapshot; part of new game file names
+ * @param walSequence first WAL segment not covered by the snapshot
+ * @param games       the game files making up the snapshot
+ */
+public record SnapshotManifest(long generation, long walSequence, List<GameFile> games) {
+    private static final int MAGIC = 0x5247534D; // "RGSM"
+    private static final int VERSION = 1;
+
+    /**
+     * @param gameVersion value of the game's version counter when it was copied
+     * @param fileName    name of the game file, next to the manifest
+     */
+    public record GameFile(long gameId, long gameVersion, String fileName) {
+    }
+
+    /**
+     * @return the manifest stored at the given path, or null if there is none
+     * @throws IOException if the manifest is damaged
+     */
+    public static SnapshotManifest read(Path manifestPath) throws IOException {
+        if (!Files.exists(manifestPath)) {
+            return null;
+        }
+        byte[] bytes = Files.readAllBytes(manifestPath);
+        if (bytes.length < Integer.BYTES) {
+            throw new IOException("Truncated snapshot manifest: " + manifestPath);
+        }
+        CRC32C crc = new CRC32C();
+        crc.update(bytes, 0, bytes.length - Integer.BYTES);
+        if ((int) crc.getValue() != ByteBuffer.wrap(bytes, bytes.length - Integer.BYTES, Integer.BYTES).getInt()) {
+            throw new IOException("Snapshot manifest checksum mismatch in " + manifestPath);
+        }
+
+        DataInputStream in = new DataInputStream(new ByteArrayInputStream(bytes));
+        if (in.readInt() != MAGIC) {
+            throw new IOException("Not a snapshot manifest: " + manifestPath);
+        }
+        int version = in.readInt();
+        if (version != VERSION) {
+            throw new IOException("Unsupported snapshot manifest version " + version + " in " + manifestPath);
+        }
+        long generation = in.readLong();
+        long walSequence = in.readLong();
+        int gameCount = in.readInt();
+        List<GameFile> games = new ArrayList<>(gameCount);
+        for (int i = 0; i < gameCount; i++) {
+            games.add(new GameFile(in.readLong(), in.readLong(), in.readUTF()));
+        }
+        return new SnapshotManifest(generation, walSequence, games);
+    }
+
+    /**
+     * Writes the manifest durably and atomically, replacing any previous one.
+     */
+    public void write(Path manifestPath) throws IOException {
+        ByteArrayOutputStream bytes = new ByteArrayOutputStream();
+        DataOutputStream out = new DataOutputStream(bytes);
+        out.writeInt(MAGIC);
+        out.writeInt(VERSION);
+        out.writeLong(generation);
+        out.writeLong(walSequence);
+        out.writeInt(games.size());
+        for (GameFile game : games) {
+            out.writeLong(game.gameId());
+            out.writeLong(game.gameVersion());
+            out.writeUTF(game.fileName());
+        }
+        CRC32C crc = new CRC32C();
+        crc.update(bytes.toByteArray());
+        out.writeInt((int) crc.getValue());
+
+        Path tempPath = Paths.get(manifestPath + ".tmp");
+        try (FileChannel channel = FileChannel.open(tempPath, StandardOpenOption.CREATE,
+                StandardOpenOption.TRUNCATE_EXISTING, StandardOpenOption.WRITE)) {
+            ByteBuffer buffer = ByteBuffer.wrap(bytes.toByteArray());
+            while (buffer.hasRemaining()) {
+                channel.write(buffer);
+            }
+            channel.force(true);
+        }
+        Files.move(tempPath, manifestPath, StandardCopyOption.ATOMIC_MOVE, StandardCopyOption.REPLACE_EXISTING);
+    }
+}
@@ -0,0 +1,184 @@
+package com.ringgrank.persistence;
+
+import java.io.BufferedInputStream;
+import java.io.DataInputStream;
+import java.io.EOFException;
+import java.io.IOException;
+import java.io.InputStream;
+import java.nio.ByteBuffer;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.function.Consumer;
+import java.util.zip.CRC32C;
+import java.util.zip.CheckedInputStream;
+import java.util.zip.Inflater;
+import java.util.zip.InflaterInputStream;
+
+import com.ringgrank.model.GameSnapshot;
+import com.ringgrank.model.ScoreEntry;
+
+/**
+ * Reads a snapshot file written by {@link SnapshotWriter}, handing games to a
+ * consumer as they are decoded. Columns are read in large chunks through a
+ * reused scratch buffer, and window entries shared with the all-time
+ * leaderboard reuse its ScoreEntry objects.
+ */
+public final class SnapshotReader {
+    private static final int BUFFER_SIZE = 1024 * 1024;
+    private static final int SCRATCH_SIZE = 64 * 1024;
+
+    /**
+     * @param walSequence first WAL segment not covered by the snapshot
+     * @param createdAt   when the snapshot was started, in epoch millis
+     * @param games       number of games read
+     */
+    public record SnapshotInfo(long walSequence, long createdAt, int games) {
+    }
+
+    private final DataInputStream in;
+    private final ByteBuffer scratch = ByteBuffer.allocate(SCRATCH_SIZE);
+
+    private SnapshotReader(DataInputStream in) {
+        this.in = in;
+    }
+
+    /**
+     * @return true if the file starts with the snapshot magic
+     */
+    public static boolean isSnapshot(Path path) throws IOException {
+        try (DataInputStream in = new DataInputStream(Files.newInputStream(path))) {
+            return in.readInt() == SnapshotFormat.MAGIC;
+        } catch (EOFException e) {
+            return false;
+        }
+    }
+
+    /**
+     * @throws IOException if the file is not a snapshot, is truncated or fails
+     *                     its checksum
+     */
+    public static SnapshotInfo read(Path path, Consumer<GameSnapshot> consumer) throws IOException {
+        CRC32C crc = new CRC32C();
+        Inflater inflater = null;
+        try (InputStream buffered = new BufferedInputStream(Files.newInputStream(path), BUFFER_SIZE)) {
+            byte[] headerBytes = buffered.readNBytes(SnapshotFormat.HEADER_SIZE);
+            if (headerBytes.length < SnapshotFormat.HEADER_SIZE) {
+                throw new IOException("Truncated snapshot file: " + path);
+            }
+            ByteBuffer header = ByteBuffer.wrap(headerBytes);
+            if (header.getInt() != SnapshotFormat.MAGIC) {
+                throw new IOException("Not a snapshot file: " + path);
+            }
+            int version = header.getInt();
+            if (version != SnapshotFormat.VERSION) {
+                throw new IOException("Unsupported snapshot version " + version + " in " + path);
+            }
+            int flags = header.getInt();
+            header.getInt(); // reserved
+            long walSequence = header.getLong();
+            long createdAt = header.getLong();
+            crc.update(headerBytes);
+
+            InputStream body = buffered;
+            if ((flags & SnapshotFormat.FLAG_DEFLATE) != 0) {
+                inflater = new Inflater();
+                body = new InflaterInputStream(buffered, inflater, BUFFER_SIZE);
+            }
+            SnapshotReader reader = new SnapshotReader(new DataInputStream(new CheckedInputStream(body, crc)));
+            int games = reader.readGames(consumer);
+
+            int expectedCrc = (int) crc.getValue();
+            // The checksum itself bypasses the checked stream
+            if (new DataInputStream(body).readInt() != expectedCrc) {
+                throw new IOException("Snapshot checksum mismatch in " + path);
+            }
+            return new SnapshotInfo(walSequence, createdAt, games);
+        } finally {
+            if (inflater != null) {
+                inflater.end();
+            }
+        }
+    }
+
+    private int readGames(Consumer<GameSnapshot> consumer) throws IOException {
+        int games = 0;
+        while (in.readByte() == SnapshotFormat.GAME_FOLLOWS) {
+            long gameId = in.readLong();
+            ScoreEntry[] allTimeEntries = readColumns(gameId);
+            int windowCount = in.readInt();
+            List<GameSnapshot.Window> windows = new ArrayList<>(windowCount);
+            for (int i = 0; i < windowCount; i++) {
+                String windowKey = in.readUTF();
+                Duration duration = Duration.ofMillis(in.readLong());
+                windows.add(new GameSnapshot.Window(windowKey, duration, readWindowEntries(gameId, allTimeEntries)));
+            }
+            consumer.accept(new GameSnapshot(gameId, allTimeEntries, windows));
+            games++;
+        }
+        return games;
+    }
+
+    // Merges the entries shared with the all-time leaderboard and the window's
+    // own entries back into rank order
+    private ScoreEntry[] readWindowEntries(long gameId, ScoreEntry[] allTimeEntries) throws IOException {
+        int[] refs = new int[in.readInt()];
+        int read = 0;
+        while (read < refs.length) {
+            int values = fill(refs.length - read, Integer.BYTES);
+            for (int i = 0; i < values; i++) {
+                refs[read++] = scratch.getInt();
+            }
+        }
+        ScoreEntry[] explicit = readColumns(gameId);
+
+        ScoreEntry[] entries = new ScoreEntry[refs.length + explicit.length];
+        int refIndex = 0;
+        int explicitIndex = 0;
+        for (int i = 0; i < entries.length; i++) {
+            if (explicitIndex == explicit.length || (refIndex < refs.length
+                    && allTimeEntries[refs[refIndex]].compareTo(explicit[explicitIndex]) < 0)) {
+                entries[i] = allTimeEntries[refs[refIndex++]];
+            } else {
+                entries[i] = explicit[explicitIndex++];
+            }
+        }
+        return entries;
+    }
+
+    private ScoreEntry[] readColumns(long gameId) throws IOException {
+        int count = in.readInt();
+        long[] userIds = readColumn(count);
+        long[] scores = readColumn(count);
+        long[] timestamps = readColumn(count);
+        ScoreEntry[] entries = new ScoreEntry[count];
+        for (int i = 0; i < count; i++) {
+            entries[i] = new ScoreEntry(userIds[i], gameId, scores[i], timestamps[i]);
+        }
+        return entries;
+    }
+
+    private long[] readColumn(int count) throws IOException {
+        long[] column = new long[count];
+        int read = 0;
+        while (read < count) {
+            int values = fill(count - read, Long.BYTES);
+            for (int i = 0; i < values; i++) {
+                column[read++] = scratch.getLong();
+            }
+        }
+        return column;
+    }
+
+    // Reads up to remainingValues values of the given width into the scratch
+    // buffer, ready to be decoded; returns the number of values read
+    private int fill(int remainingValues, int width) throws IOException {
+        int values = Math.min(remainingValues, SCRATCH_SIZE / width);
+        scratch.clear();
+        in.readFully(scratch.array(), 0, values * width);
+        scratch.limit(values * width);
+        return values;
+    }
+}
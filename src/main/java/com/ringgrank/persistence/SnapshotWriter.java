@@ -0,0 +1,161 @@
+package com.ringgrank.persistence;
+
+import java.io.BufferedOutputStream;
+import java.io.Closeable;
+import java.io.DataOutputStream;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.nio.ByteBuffer;
+import java.nio.channels.Channels;
+import java.nio.channels.FileChannel;
+import java.nio.file.Path;
+import java.nio.file.StandardOpenOption;
+import java.util.function.ToLongFunction;
+import java.util.zip.CRC32C;
+import java.util.zip.CheckedOutputStream;
+import java.util.zip.Deflater;
+import java.util.zip.DeflaterOutputStream;
+
+import com.ringgrank.model.GameSnapshot;
+import com.ringgrank.model.ScoreEntry;
+
+/**
+ * Streams games to a snapshot file (see {@link SnapshotFormat}) one at a time,
+ * so only one game's copy needs to be held in memory while writing.
+ * Columns are encoded through a reused scratch buffer and written in large
+ * chunks. The file is only complete once {@link #commit()} returns.
+ */
+public class SnapshotWriter implements Closeable {
+    private static final int BUFFER_SIZE = 1024 * 1024;
+    private static final int SCRATCH_SIZE = 64 * 1024;
+
+    private final FileChannel channel;
+    private final BufferedOutputStream buffered;
+    private final Deflater deflater;
+    // Stream below the checksum: the deflater, or the file buffer
+    private final OutputStream body;
+    private final CRC32C crc = new CRC32C();
+    private final DataOutputStream out;
+    private final ByteBuffer scratch = ByteBuffer.allocate(SCRATCH_SIZE);
+    private int games;
+
+    /**
+     * @param walSequence first WAL segment not covered by the snapshot
+     * @param compress    whether to deflate the body
+     */
+    public SnapshotWriter(Path path, long walSequence, boolean compress) throws IOException {
+        this.channel = FileChannel.open(path, StandardOpenOption.CREATE, StandardOpenOption.TRUNCATE_EXISTING,
+                StandardOpenOption.WRITE);
+        this.buffered = new BufferedOutputStream(Channels.newOutputStream(channel), BUFFER_SIZE);
+
+        ByteBuffer header = ByteBuffer.allocate(SnapshotFormat.HEADER_SIZE);
+        header.putInt(SnapshotFormat.MAGIC);
+        header.putInt(SnapshotFormat.VERSION);
+        header.putInt(compress ? SnapshotFormat.FLAG_DEFLATE : 0);
+        header.putInt(0);
+        header.putLong(walSequence);
+        header.putLong(System.currentTimeMillis());
+        buffered.write(header.array());
+        crc.update(header.array());
+
+        // Favour speed: the columns are mostly small, sorted numbers that compress
+        // well even at the fastest level
+        this.deflater = compress ? new Deflater(Deflater.BEST_SPEED) : null;
+        this.body = compress ? new DeflaterOutputStream(buffered, deflater, BUFFER_SIZE) : buffered;
+        this.out = new DataOutputStream(new CheckedOutputStream(body, crc));
+    }
+
+    public void writeGame(GameSnapshot game) throws IOException {
+        ScoreEntry[] allTimeEntries = game.allTimeEntries();
+        out.writeByte(SnapshotFormat.GAME_FOLLOWS);
+        out.writeLong(game.gameId());
+        writeColumns(allTimeEntries, allTimeEntries.length);
+        out.writeInt(game.windows().size());
+        for (GameSnapshot.Window window : game.windows()) {
+            out.writeUTF(window.windowKey());
+            out.writeLong(window.duration().toMillis());
+            writeWindowEntries(allTimeEntries, window.entries());
+        }
+        games++;
+    }
+
+    /**
+     * Writes the trailer and forces the file to disk.
+     *
+     * @return number of games written
+     */
+    public int commit() throws IOException {
+        out.writeByte(SnapshotFormat.END_OF_GAMES);
+        out.flush();
+        // The checksum itself bypasses the checked stream
+        new DataOutputStream(body).writeInt((int) crc.getValue());
+        if (body instanceof DeflaterOutputStream deflaterStream) {
+            deflaterStream.finish();
+        }
+        buffered.flush();
+        channel.force(true);
+        return games;
+    }
+
+    @Override
+    public void close() throws IOException {
+        if (deflater != null) {
+            deflater.end();
+        }
+        channel.close();
+    }
+
+    // Both arrays are in rank order, so the window entries that also appear in
+    // the all-time leaderboard are found with a single merge pass
+    private void writeWindowEntries(ScoreEntry[] allTimeEntries, ScoreEntry[] windowEntries) throws IOException {
+        int[] refs = new int[windowEntries.length];
+        int refCount = 0;
+        ScoreEntry[] explicit = new ScoreEntry[windowEntries.length];
+        int explicitCount = 0;
+        int allTimeIndex = 0;
+        for (ScoreEntry entry : windowEntries) {
+            while (allTimeIndex < allTimeEntries.length && allTimeEntries[allTimeIndex].compareTo(entry) < 0) {
+                allTimeIndex++;
+            }
+            if (allTimeIndex < allTimeEntries.length && allTimeEntries[allTimeIndex].equals(entry)) {
+                refs[refCount++] = allTimeIndex;
+            } else {
+                explicit[explicitCount++] = entry;
+            }
+        }
+
+        out.writeInt(refCount);
+        scratch.clear();
+        for (int i = 0; i < refCount; i++) {
+            if (scratch.remaining() < Integer.BYTES) {
+                flushScratch();
+            }
+            scratch.putInt(refs[i]);
+        }
+        flushScratch();
+        writeColumns(explicit, explicitCount);
+    }
+
+    private void writeColumns(ScoreEntry[] entries, int count) throws IOException {
+        out.writeInt(count);
+        writeColumn(entries, count, ScoreEntry::userId);
+        writeColumn(entries, count, ScoreEntry::score);
+        writeColumn(entries, count, ScoreEntry::timestamp);
+    }
+
+    private void writeColumn(ScoreEntry[] entries, int count, ToLongFunction<ScoreEntry> field) throws IOException {
+        scratch.clear();
+        for (int i = 0; i < count; i++) {
+            if (scratch.remaining() < Long.BYTES) {
+                flushScratch();
+            }
+            scratch.putLong(field.applyAsLong(entries[i]));
+        }
+        flushScratch();
+    }
+
+    private void flushScratch() throws IOException {
+        out.write(scratch.array(), 0, scratch.position());
+        scratch.clear();
+    }
+}
@@ -0,0 +1,104 @@
+package com.ringgrank.persistence;
+
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+import java.util.zip.CRC32C;
+
+import com.ringgrank.model.ScoreEntry;
+
+/**
+ * Layout of the binary write-ahead log.
+ *
+ * <pre>
+ * file   := fileHeader block*
+ * fileHeader (16 bytes) := magic:int "RGWL" | version:int | reserved:long
+ * block  := blockHeader record{recordCount}
+ * blockHeader (16 bytes) := magic:int | recordCount:int | crc32c:int | reserved:int
+ * record (32 bytes) := timestamp:long | gameId:long | userId:long | score:long
+ * </pre>
+ *
+ * All values are little-endian. The CRC32C covers the records of a block; a
+ * block is exactly one group-commit batch, so a torn write can only damage the
+ * last block, and replay detects it and stops there.
+ */
+public final class WalFormat {
+    public static final ByteOrder BYTE_ORDER = ByteOrder.LITTLE_ENDIAN;
+
+    public static final int FILE_MAGIC = 0x4C574752; // "RGWL" read little-endian
+    public static final int VERSION = 1;
+    public static final int FILE_HEADER_SIZE = 16;
+
+    public static final int BLOCK_MAGIC = 0x4B4C4257; // "WBLK" read little-endian
+    public static final int BLOCK_HEADER_SIZE = 16;
+    public static final int RECORD_SIZE = 32;
+    // Largest record count whose block size fits in an int
+    public static final int MAX_BLOCK_RECORDS = (Integer.MAX_VALUE - BLOCK_HEADER_SIZE) / RECORD_SIZE;
+
+    private WalFormat() {
+    }
+
+    public static int blockSize(int recordCount) {
+        return BLOCK_HEADER_SIZE + recordCount * RECORD_SIZE;
+    }
+
+    /**
+     * Writes the file header at the buffer's position.
+     */
+    public static void putFileHeader(ByteBuffer buffer) {
+        buffer.putInt(FILE_MAGIC);
+        buffer.putInt(VERSION);
+        buffer.putLong(0L);
+    }
+
+    /**
+     * Prepares the buffer for a new block: records are appended with
+     * {@link #putRecord(ByteBuffer, ScoreEntry)} after this call.
+     */
+    public static void beginBlock(ByteBuffer buffer) {
+        buffer.clear();
+        buffer.position(BLOCK_HEADER_SIZE);
+    }
+
+    public static void putRecord(ByteBuffer buffer, ScoreEntry entry) {
+        putRecord(buffer, entry.timestamp(), entry.gameId(), entry.userId(), entry.score());
+    }
+
+    public static void putRecord(ByteBuffer buffer, long timestamp, long gameId, long userId, long score) {
+        buffer.putLong(timestamp);
+        buffer.putLong(gameId);
+        buffer.putLong(userId);
+        buffer.putLong(score);
+    }
+
+    /**
+     * Fills in the header of a block started with {@link #beginBlock(ByteBuffer)}
+     * and flips the buffer so the whole block can be written out.
+     */
+    public static void sealBlock(ByteBuffer buffer, int recordCount, CRC32C crc) {
+        buffer.flip();
+        buffer.position(BLOCK_HEADER_SIZE);
+        crc.reset();
+        crc.update(buffer);
+        buffer.putInt(0, BLOCK_MAGIC);
+        buffer.putInt(4, recordCount);
+        buffer.putInt(8, (int) crc.getValue());
+        buffer.putInt(12, 0);
+        buffer.position(0);
+    }
+
+    /**
+     * Computes the CRC32C of length bytes starting at index, leaving the buffer's
+     * position and limit unchanged.
+     */
+    public static int checksum(ByteBuffer buffer, int index, int length, CRC32C crc) {
+        int position = buffer.position();
+        int limit = buffer.limit();
+        buffer.limit(index + length);
+        buffer.position(index);
+        crc.reset();
+        crc.update(buffer);
+        buffer.limit(limit);
+        buffer.position(position);
+        return (int) crc.getValue();
+    }
+}
@@ -0,0 +1,123 @@
+package com.ringgrank.persistence;
+
+import java.io.BufferedReader;
+import java.io.IOException;
+import java.io.InputStream;
+import java.nio.ByteBuffer;
+import java.nio.channels.FileChannel;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.nio.file.StandardCopyOption;
+import java.nio.file.StandardOpenOption;
+import java.util.zip.CRC32C;
+
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+
+/**
+ * Migrates WAL files from the legacy CSV format
+ * ({@code timestamp,gameId,userId,score} per line) to the binary
+ * {@link WalFormat}.
+ */
+public final class WalFormatConverter {
+    private static final Logger logger = LoggerFactory.getLogger(WalFormatConverter.class);
+    private static final int RECORDS_PER_BLOCK = 4096;
+
+    private WalFormatConverter() {
+    }
+
+    /**
+     * @return true if the file exists, is not empty and does not start with the
+     *         binary WAL header
+     */
+    public static boolean isLegacyCsv(Path path) throws IOException {
+        if (!Files.exists(path) || Files.size(path) == 0) {
+            return false;
+        }
+        byte[] magic = new byte[4];
+        try (InputStream in = Files.newInputStream(path)) {
+            if (in.readNBytes(magic, 0, magic.length) < magic.length) {
+                return true;
+            }
+        }
+        return ByteBuffer.wrap(magic).order(WalFormat.BYTE_ORDER).getInt() != WalFormat.FILE_MAGIC;
+    }
+
+    /**
+     * Converts the CSV WAL at the given path to the binary format in place. The
+     * original file is kept next to it with a ".csv.bak" suffix.
+     */
+    public static void migrateInPlace(Path walPath) throws IOException {
+        Path convertedPath = Paths.get(walPath + ".migrating");
+        Path backupPath = Paths.get(walPath + ".csv.bak");
+        long records = convertCsvToBinary(walPath, convertedPath);
+        Files.move(walPath, backupPath, StandardCopyOption.REPLACE_EXISTING);
+        Files.move(convertedPath, walPath, StandardCopyOption.ATOMIC_MOVE);
+        logger.info("Migrated {} CSV WAL records in {} to the binary format; original kept at {}", records, walPath,
+                backupPath);
+    }
+
+    /**
+     * Writes every well-formed line of the CSV WAL to a new binary WAL file.
+     * Malformed lines (such as a torn final line) are skipped.
+     *
+     * @return number of records written
+     */
+    public static long convertCsvToBinary(Path csvPath, Path binaryPath) throws IOException {
+        ByteBuffer buffer = ByteBuffer.allocateDirect(WalFormat.blockSize(RECORDS_PER_BLOCK))
+                .order(WalFormat.BYTE_ORDER);
+        CRC32C crc = new CRC32C();
+        long records = 0;
+
+        try (BufferedReader reader = Files.newBufferedReader(csvPath);
+                FileChannel out = FileChannel.open(binaryPath, StandardOpenOption.CREATE,
+                        StandardOpenOption.TRUNCATE_EXISTING, StandardOpenOption.WRITE)) {
+            buffer.clear();
+            WalFormat.putFileHeader(buffer);
+            buffer.flip();
+            writeFully(out, buffer);
+
+            WalFormat.beginBlock(buffer);
+            int blockRecords = 0;
+            String line;
+            while ((line = reader.readLine()) != null) {
+                String[] parts = line.split(",");
+                if (parts.length != 4) {
+                    logger.warn("Skipping malformed WAL line: {}", line);
+                    continue;
+                }
+                try {
+                    WalFormat.putRecord(buffer,
+                            Long.parseLong(parts[0].trim()), // timestamp
+                            Long.parseLong(parts[1].trim()), // gameId
+                            Long.parseLong(parts[2].trim()), // userId
+                            Long.parseLong(parts[3].trim())); // score
+                } catch (NumberFormatException e) {
+                    logger.warn("Skipping malformed WAL line: {}", line);
+                    continue;
+                }
+                blockRecords++;
+                records++;
+                if (blockRecords == RECORDS_PER_BLOCK) {
+                    WalFormat.sealBlock(buffer, blockRecords, crc);
+                    writeFully(out, buffer);
+                    WalFormat.beginBlock(buffer);
+                    blockRecords = 0;
+                }
+            }
+            if (blockRecords > 0) {
+                WalFormat.sealBlock(buffer, blockRecords, crc);
+                writeFully(out, buffer);
+            }
+            out.force(true);
+        }
+        return records;
+    }
+
+    private static void writeFully(FileChannel channel, ByteBuffer buffer) throws IOException {
+        while (buffer.hasRemaining()) {
+            channel.write(buffer);
+        }
+    }
+}
@@ -0,0 +1,204 @@
+package com.ringgrank.persistence;
+
+import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.nio.channels.FileChannel;
+import java.nio.file.Path;
+import java.nio.file.StandardOpenOption;
+import java.util.zip.CRC32C;
+
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+
+/**
+ * Replays a binary WAL file (see {@link WalFormat}).
+ * A sealed segment is memory-mapped in large windows and records are decoded
+ * straight from the mapping and handed to the consumer as primitives, so
+ * replay neither copies file data through the heap nor allocates per record;
+ * recovery time is bounded by disk bandwidth. A sealed segment was complete
+ * when the writer moved on, so a block in it that is incomplete or fails its
+ * checksum fails the replay instead of cutting off the records after it.
+ * Only the active tail segment can end in a torn block. It is read with
+ * positional reads into a reused direct buffer instead of a mapping, since a
+ * file that is still mapped cannot be truncated on every platform; replay
+ * stops at its first bad block and truncates the file there.
+ */
+public class WalReader {
+    private static final Logger logger = LoggerFactory.getLogger(WalReader.class);
+    // Mapped windows are moved forward as replay progresses; a block crossing the
+    // end of a window is re-mapped from its start
+    private static final int MAP_WINDOW_SIZE = 256 * 1024 * 1024;
+    // Initial size of the buffer the tail segment is read into; grown for larger
+    // blocks
+    private static final int READ_WINDOW_SIZE = 4 * 1024 * 1024;
+
+    /**
+     * Receives replayed records in log order.
+     */
+    @FunctionalInterface
+    public interface RecordConsumer {
+        void accept(long timestamp, long gameId, long userId, long score);
+    }
+
+    /**
+     * @param records      number of records replayed
+     * @param validBytes   length of the intact prefix of the file
+     * @param truncated    whether a torn or corrupt tail was cut off
+     * @param elapsedNanos time spent replaying, including the consumer
+     * @param minTimestamp smallest record timestamp, Long.MAX_VALUE if empty
+     * @param maxTimestamp largest record timestamp, Long.MIN_VALUE if empty
+     */
+    public record ReplayResult(long records, long validBytes, boolean truncated, long elapsedNanos,
+            long minTimestamp, long maxTimestamp) {
+
+        public double recordsPerSecond() {
+            return elapsedNanos == 0 ? 0 : records * 1_000_000_000.0 / elapsedNanos;
+        }
+
+        public double megabytesPerSecond() {
+            return elapsedNanos == 0 ? 0 : validBytes * 1_000_000_000.0 / elapsedNanos / (1024 * 1024);
+        }
+    }
+
+    private final FileChannel channel;
+    private final boolean activeTail;
+    private final CRC32C crc = new CRC32C();
+    private final long startNanos = System.nanoTime();
+    private long minTimestamp = Long.MAX_VALUE;
+    private long maxTimestamp = Long.MIN_VALUE;
+    // A mapping for sealed segments, a reused direct buffer for the tail
+    private ByteBuffer buffer;
+    // File offset of buffer index 0, and number of valid bytes
+    private long bufferStart;
+    private int bufferLength;
+
+    private WalReader(FileChannel channel, boolean activeTail) {
+        this.channel = channel;
+        this.activeTail = activeTail;
+    }
+
+    /**
+     * @param activeTail whether this is the segment the writer last appended to,
+     *                   the only one whose torn tail is truncated
+     * @throws IOException if the file cannot be read, or a sealed segment has an
+     *                     incomplete or corrupt block
+     */
+    public static ReplayResult replay(Path path, boolean activeTail, RecordConsumer consumer) throws IOException {
+        try (FileChannel channel = activeTail
+                ? FileChannel.open(path, StandardOpenOption.READ, StandardOpenOption.WRITE)
+                : FileChannel.open(path, StandardOpenOption.READ)) {
+            return new WalReader(channel, activeTail).replay(path, consumer);
+        }
+    }
+
+    private ReplayResult replay(Path path, RecordConsumer consumer) throws IOException {
+        long fileSize = channel.size();
+        if (fileSize == 0) {
+            return result(0, 0, false);
+        }
+        if (!load(0, WalFormat.FILE_HEADER_SIZE)) {
+            return truncate(path, 0, 0);
+        }
+        // The magic and version live in the first window, which load() just read
+        if (buffer.getInt(0) != WalFormat.FILE_MAGIC) {
+            throw new IOException("Not a binary WAL file: " + path);
+        }
+        int version = buffer.getInt(4);
+        if (version != WalFormat.VERSION) {
+            throw new IOException("Unsupported WAL version " + version + " in " + path);
+        }
+
+        long offset = WalFormat.FILE_HEADER_SIZE;
+        long records = 0;
+        while (offset < fileSize) {
+            if (!load(offset, WalFormat.BLOCK_HEADER_SIZE)) {
+                return truncate(path, offset, records);
+            }
+            int headerIndex = (int) (offset - bufferStart);
+            int magic = buffer.getInt(headerIndex);
+            int recordCount = buffer.getInt(headerIndex + 4);
+            int expectedCrc = buffer.getInt(headerIndex + 8);
+            // A count that cannot fit in the rest of the file is a corrupt header,
+            // checked before it is used in size arithmetic that could overflow
+            if (magic != WalFormat.BLOCK_MAGIC || recordCount < 0 || recordCount > WalFormat.MAX_BLOCK_RECORDS
+                    || (long) recordCount * WalFormat.RECORD_SIZE > fileSize - offset - WalFormat.BLOCK_HEADER_SIZE) {
+                return truncate(path, offset, records);
+            }
+
+            int blockSize = WalFormat.blockSize(recordCount);
+            if (!load(offset, blockSize)) {
+                return truncate(path, offset, records);
+            }
+            int recordsIndex = (int) (offset - bufferStart) + WalFormat.BLOCK_HEADER_SIZE;
+            int recordsLength = recordCount * WalFormat.RECORD_SIZE;
+            if (WalFormat.checksum(buffer, recordsIndex, recordsLength, crc) != expectedCrc) {
+                return truncate(path, offset, records);
+            }
+
+            for (int index = recordsIndex; index < recordsIndex + recordsLength; index += WalFormat.RECORD_SIZE) {
+                long timestamp = buffer.getLong(index);
+                minTimestamp = Math.min(minTimestamp, timestamp);
+                maxTimestamp = Math.max(maxTimestamp, timestamp);
+                consumer.accept(
+                        timestamp,
+                        buffer.getLong(index + 8),
+                        buffer.getLong(index + 16),
+                        buffer.getLong(index + 24));
+            }
+            records += recordCount;
+            offset += blockSize;
+        }
+        return result(records, offset, false);
+    }
+
+    // Makes bytes [offset, offset + length) available in the buffer. Returns false
+    // if the file ends first.
+    private boolean load(long offset, int length) throws IOException {
+        if (buffer != null && offset >= bufferStart && offset + length <= bufferStart + bufferLength) {
+            return true;
+        }
+        long available = channel.size() - offset;
+        if (available < length) {
+            return false;
+        }
+        if (activeTail) {
+            readWindow(offset, (int) Math.min(available, Math.max(READ_WINDOW_SIZE, length)));
+        } else {
+            int windowSize = (int) Math.min(available, Math.max(MAP_WINDOW_SIZE, length));
+            buffer = channel.map(FileChannel.MapMode.READ_ONLY, offset, windowSize).order(WalFormat.BYTE_ORDER);
+            bufferLength = windowSize;
+        }
+        bufferStart = offset;
+        return true;
+    }
+
+    private void readWindow(long offset, int windowSize) throws IOException {
+        if (buffer == null || buffer.capacity() < windowSize) {
+            buffer = ByteBuffer.allocateDirect(windowSize).order(WalFormat.BYTE_ORDER);
+        }
+        buffer.clear().limit(windowSize);
+        while (buffer.hasRemaining()) {
+            if (channel.read(buffer, offset + buffer.position()) < 0) {
+                throw new IOException("WAL file shrank while it was replayed");
+            }
+        }
+        bufferLength = windowSize;
+    }
+
+    private ReplayResult truncate(Path path, long validBytes, long records) throws IOException {
+        if (!activeTail) {
+            throw new IOException("Sealed WAL segment " + path + " has an incomplete or corrupt block at offset "
+                    + validBytes + " of " + channel.size() + "; it is not truncated because it was complete when "
+                    + "sealed");
+        }
+        logger.warn("WAL {} has a torn or corrupt tail at offset {} of {}; truncating", path, validBytes,
+                channel.size());
+        channel.truncate(validBytes);
+        return result(records, validBytes, true);
+    }
+
+    private ReplayResult result(long records, long validBytes, boolean truncated) {
+        return new ReplayResult(records, validBytes, truncated, System.nanoTime() - startNanos, minTimestamp,
+                maxTimestamp);
+    }
+}
@@ -0,0 +1,78 @@
+package com.ringgrank.persistence;
+
+import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.nio.file.Files;
+import java.nio.file.NoSuchFileException;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.nio.file.StandardCopyOption;
+import java.util.zip.CRC32C;
+
+/**
+ * Sidecar summary of a sealed WAL segment, letting replay skip segments that a
+ * snapshot already covers without reading them.
+ *
+ * <pre>
+ * index (48 bytes) := magic:int "WIDX" | version:int | recordCount:long |
+ *                     minTimestamp:long | maxTimestamp:long | byteLength:long |
+ *                     crc32c:int | reserved:int
+ * </pre>
+ *
+ * The CRC32C covers the first 40 bytes. byteLength is the size of the segment
+ * the index describes; an index whose segment has a different size is stale.
+ */
+public record WalSegmentIndex(long recordCount, long minTimestamp, long maxTimestamp, long byteLength) {
+    private static final int MAGIC = 0x58444957; // "WIDX" read little-endian
+    private static final int VERSION = 1;
+    private static final int CHECKED_SIZE = 40;
+    private static final int SIZE = 48;
+
+    /**
+     * @return the index stored at the given path, or null if it is missing or
+     *         damaged
+     */
+    public static WalSegmentIndex read(Path indexPath) throws IOException {
+        byte[] bytes;
+        try {
+            bytes = Files.readAllBytes(indexPath);
+        } catch (NoSuchFileException e) {
+            return null;
+        }
+        if (bytes.length != SIZE) {
+            return null;
+        }
+        ByteBuffer buffer = ByteBuffer.wrap(bytes).order(WalFormat.BYTE_ORDER);
+        if (buffer.getInt(0) != MAGIC || buffer.getInt(4) != VERSION
+                || WalFormat.checksum(buffer, 0, CHECKED_SIZE, new CRC32C()) != buffer.getInt(CHECKED_SIZE)) {
+            return null;
+        }
+        return new WalSegmentIndex(buffer.getLong(8), buffer.getLong(16), buffer.getLong(24), buffer.getLong(32));
+    }
+
+    /**
+     * Writes the index atomically, replacing any previous one.
+     */
+    public void write(Path indexPath) throws IOException {
+        ByteBuffer buffer = ByteBuffer.allocate(SIZE).order(WalFormat.BYTE_ORDER);
+        buffer.putInt(MAGIC);
+        buffer.putInt(VERSION);
+        buffer.putLong(recordCount);
+        buffer.putLong(minTimestamp);
+        buffer.putLong(maxTimestamp);
+        buffer.putLong(byteLength);
+        buffer.putInt(WalFormat.checksum(buffer, 0, CHECKED_SIZE, new CRC32C()));
+        buffer.putInt(0);
+
+        Path tempPath = Paths.get(indexPath + ".tmp");
+        Files.write(tempPath, buffer.array());
+        Files.move(tempPath, indexPath, StandardCopyOption.ATOMIC_MOVE, StandardCopyOption.REPLACE_EXISTING);
+    }
+
+    /**
+     * @return true if this index still describes the segment at the given path
+     */
+    public boolean isCurrentFor(Path segmentPath) throws IOException {
+        return Files.exists(segmentPath) && Files.size(segmentPath) == byteLength;
+    }
+}
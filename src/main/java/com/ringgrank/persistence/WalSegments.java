@@ -0,0 +1,59 @@
+package com.ringgrank.persistence;
+
+import java.io.IOException;
+import java.nio.file.DirectoryStream;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.util.ArrayList;
+import java.util.Comparator;
+import java.util.List;
+
+/**
+ * Naming and discovery of WAL segments.
+ * The WAL configured at a base path such as {@code ./data/wal/scores} is a
+ * series of segment files next to it, {@code scores-<sequence>.wal}, each with
+ * a {@link WalSegmentIndex} sidecar {@code scores-<sequence>.idx} once it has
+ * been sealed. Sequences increase monotonically, so replaying segments in
+ * sequence order replays the log in order.
+ */
+public final class WalSegments {
+    private static final String SEGMENT_SUFFIX = ".wal";
+    private static final String INDEX_SUFFIX = ".idx";
+
+    private WalSegments() {
+    }
+
+    public record Segment(long sequence, Path path, Path indexPath) {
+    }
+
+    public static Segment segment(Path basePath, long sequence) {
+        String name = String.format("%s-%020d", basePath.getFileName(), sequence);
+        return new Segment(sequence, basePath.resolveSibling(name + SEGMENT_SUFFIX),
+                basePath.resolveSibling(name + INDEX_SUFFIX));
+    }
+
+    /**
+     * @return all segments of the WAL at the given base path, in sequence order
+     */
+    public static List<Segment> list(Path basePath) throws IOException {
+        Path directory = basePath.toAbsolutePath().getParent();
+        String prefix = basePath.getFileName() + "-";
+        List<Segment> segments = new ArrayList<>();
+        if (!Files.isDirectory(directory)) {
+            return segments;
+        }
+        try (DirectoryStream<Path> stream = Files.newDirectoryStream(directory, prefix + "*" + SEGMENT_SUFFIX)) {
+            for (Path path : stream) {
+                String name = path.getFileName().toString();
+                String sequence = name.substring(prefix.length(), name.length() - SEGMENT_SUFFIX.length());
+                try {
+                    segments.add(segment(basePath, Long.parseLong(sequence)));
+                } catch (NumberFormatException e) {
+                    // Not one of ours
+                }
+            }
+        }
+        segments.sort(Comparator.comparingLong(Segment::sequence));
+        return segments;
+    }
+}
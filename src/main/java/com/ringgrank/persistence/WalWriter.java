@@ -0,0 +1,377 @@
+package com.ringgrank.persistence;
+
+import java.io.Closeable;
+import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.nio.channels.FileChannel;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.StandardOpenOption;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.CompletionException;
+import java.util.concurrent.LinkedBlockingQueue;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.locks.Lock;
+import java.util.concurrent.locks.ReadWriteLock;
+import java.util.concurrent.locks.ReentrantLock;
+import java.util.concurrent.locks.ReentrantReadWriteLock;
+import java.util.zip.CRC32C;
+
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+
+import com.ringgrank.model.ScoreEntry;
+
+/**
+ * Long-lived, group-committing writer for the write-ahead log.
+ * Callers hand their entries to a dedicated appender thread and block until
+ * the entry is written. The appender drains everything that queued up while the
+ * previous batch was being written (up to batchSize, optionally lingering for
+ * more), writes the batch with a single write call and, if fsync is enabled,
+ * forces it to disk once. Durability no longer costs one file open and one
+ * force per score.
+ * Each batch becomes one checksummed {@link WalFormat} block, encoded into a
+ * reused direct buffer without allocating.
+ * The log is written as a series of segments (see {@link WalSegments}). A
+ * segment is sealed once it reaches a size or age limit, or when
+ * {@link #roll()} is called; sealing writes its {@link WalSegmentIndex} so that
+ * replay can skip it as a whole. Every writer starts a new segment.
+ */
+public class WalWriter implements Closeable {
+    private static final Logger logger = LoggerFactory.getLogger(WalWriter.class);
+    private static final long POLL_INTERVAL_MS = 100;
+
+    private final Path basePath;
+    private final int batchSize;
+    private final long lingerNanos;
+    private final boolean fsync;
+    private final long segmentMaxBytes;
+    private final long segmentMaxAgeNanos;
+
+    private final BlockingQueue<PendingWrite> pendingWrites = new LinkedBlockingQueue<>();
+    // Callers queue entries under the read lock and close() stops the writer
+    // under the write lock, so nothing is queued once the appender may have seen
+    // the queue empty for the last time
+    private final ReadWriteLock stateLock = new ReentrantReadWriteLock();
+    // Held while the current segment is written, sealed or replaced
+    private final Lock channelLock = new ReentrantLock();
+    private final Thread appenderThread;
+    // Only touched by the appender thread
+    private final ByteBuffer blockBuffer;
+    private final CRC32C crc = new CRC32C();
+    // Current segment; guarded by channelLock
+    private WalSegments.Segment segment;
+    private FileChannel channel;
+    private long segmentBytes;
+    private long segmentRecords;
+    private long segmentMinTimestamp;
+    private long segmentMaxTimestamp;
+    private long segmentOpenedNanos;
+    // Set when a failed write could not be rolled back, or the appender hit an
+    // unexpected error; every later write fails
+    private volatile IOException failure;
+    private volatile boolean running = true;
+
+    /**
+     * @param basePath        base path of the WAL; segments are created next to
+     *                        it
+     * @param batchSize       maximum number of entries written per batch
+     * @param lingerMs        how long the appender waits for more entries before
+     *                        writing a batch that is not full; 0 writes whatever
+     *                        has queued up immediately
+     * @param fsync           whether to force each batch to disk before
+     *                        acknowledging it
+     * @param segmentMaxBytes size after which a segment is sealed
+     * @param segmentMaxAgeMs age after which a segment is sealed on the next
+     *                        write; 0 disables the age limit
+     */
+    public WalWriter(Path basePath, int batchSize, long lingerMs, boolean fsync, long segmentMaxBytes,
+            long segmentMaxAgeMs) throws IOException {
+        this.basePath = basePath;
+        this.batchSize = Math.max(1, batchSize);
+        this.lingerNanos = TimeUnit.MILLISECONDS.toNanos(Math.max(0, lingerMs));
+        this.fsync = fsync;
+        this.segmentMaxBytes = Math.max(WalFormat.FILE_HEADER_SIZE + WalFormat.blockSize(1), segmentMaxBytes);
+        this.segmentMaxAgeNanos = segmentMaxAgeMs > 0 ? TimeUnit.MILLISECONDS.toNanos(segmentMaxAgeMs) : 0;
+        this.blockBuffer = ByteBuffer.allocateDirect(WalFormat.blockSize(this.batchSize))
+                .order(WalFormat.BYTE_ORDER);
+        List<WalSegments.Segment> existing = WalSegments.list(basePath);
+        openSegment(existing.isEmpty() ? 1 : existing.get(existing.size() - 1).sequence() + 1);
+        this.appenderThread = new Thread(this::runAppender, "WalAppender");
+        this.appenderThread.setDaemon(true);
+        this.appenderThread.start();
+    }
+
+    /**
+     * Appends the entry and blocks until its batch has been written (and forced,
+     * if fsync is enabled).
+     *
+     * @throws RuntimeException if the batch could not be written
+     */
+    public void append(ScoreEntry entry) {
+        PendingWrite pendingWrite = new PendingWrite(entry, new CompletableFuture<>());
+        stateLock.readLock().lock();
+        try {
+            checkWritable();
+            pendingWrites.add(pendingWrite);
+        } finally {
+            stateLock.readLock().unlock();
+        }
+        try {
+            pendingWrite.completion().join();
+        } catch (CompletionException e) {
+            throw new RuntimeException("Failed to write to WAL", e.getCause());
+        }
+    }
+
+    /**
+     * Appends the entries and blocks until all of them have been written. They
+     * are queued together, so they share as few batches as the batch size
+     * allows.
+     *
+     * @throws RuntimeException if a batch could not be written
+     */
+    public void appendAll(List<ScoreEntry> entries) {
+        List<PendingWrite> writes = new ArrayList<>(entries.size());
+        for (ScoreEntry entry : entries) {
+            writes.add(new PendingWrite(entry, new CompletableFuture<>()));
+        }
+        stateLock.readLock().lock();
+        try {
+            checkWritable();
+            pendingWrites.addAll(writes);
+        } finally {
+            stateLock.readLock().unlock();
+        }
+        try {
+            for (PendingWrite write : writes) {
+                write.completion().join();
+            }
+        } catch (CompletionException e) {
+            throw new RuntimeException("Failed to write to WAL", e.getCause());
+        }
+    }
+
+    private void checkWritable() {
+        if (!running) {
+            throw new IllegalStateException("WAL writer is closed");
+        }
+        if (failure != null) {
+            throw new IllegalStateException("WAL writer failed", failure);
+        }
+    }
+
+    /**
+     * Seals the current segment, if it holds any records, and continues in a new
+     * one. Batches are never split across segments.
+     *
+     * @return sequence of the segment written next; every earlier segment is
+     *         sealed
+     */
+    public long roll() throws IOException {
+        channelLock.lock();
+        try {
+            if (segmentRecords > 0) {
+                sealSegment();
+                openSegment(segment.sequence() + 1);
+            }
+            return segment.sequence();
+        } finally {
+            channelLock.unlock();
+        }
+    }
+
+    /**
+     * Stops accepting entries, writes everything already queued and closes the
+     * file.
+     */
+    @Override
+    public void close() throws IOException {
+        stateLock.writeLock().lock();
+        try {
+            running = false;
+        } finally {
+            stateLock.writeLock().unlock();
+        }
+        // The appender drains the queue before it exits, and nothing can be
+        // queued any more
+        try {
+            appenderThread.join();
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+        }
+        // Only left behind if the appender was interrupted
+        PendingWrite leftover;
+        while ((leftover = pendingWrites.poll()) != null) {
+            leftover.completion().completeExceptionally(new IllegalStateException("WAL writer is closed"));
+        }
+        channelLock.lock();
+        try {
+            sealSegment();
+        } finally {
+            channelLock.unlock();
+        }
+    }
+
+    private void runAppender() {
+        List<PendingWrite> batch = new ArrayList<>(batchSize);
+        while (running || !pendingWrites.isEmpty()) {
+            try {
+                PendingWrite first = pendingWrites.poll(POLL_INTERVAL_MS, TimeUnit.MILLISECONDS);
+                if (first == null) {
+                    continue;
+                }
+                batch.add(first);
+                collectBatch(batch);
+                writeBatch(batch);
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                break;
+            } catch (RuntimeException e) {
+                // Keep running, so that every queued entry is still answered, but
+                // fail it: the block may be partly written
+                logger.error("WAL appender failed on a batch of {} entries; the WAL writer accepts no more writes",
+                        batch.size(), e);
+                failure = new IOException("WAL appender failed", e);
+                for (PendingWrite pendingWrite : batch) {
+                    pendingWrite.completion().completeExceptionally(failure);
+                }
+            } finally {
+                batch.clear();
+            }
+        }
+    }
+
+    private void collectBatch(List<PendingWrite> batch) throws InterruptedException {
+        long deadline = System.nanoTime() + lingerNanos;
+        while (batch.size() < batchSize) {
+            pendingWrites.drainTo(batch, batchSize - batch.size());
+            long remaining = deadline - System.nanoTime();
+            if (batch.size() >= batchSize || remaining <= 0) {
+                return;
+            }
+            PendingWrite next = pendingWrites.poll(remaining, TimeUnit.NANOSECONDS);
+            if (next == null) {
+                return;
+            }
+            batch.add(next);
+        }
+    }
+
+    private void writeBatch(List<PendingWrite> batch) {
+        IOException writerFailure = failure;
+        if (writerFailure != null) {
+            for (PendingWrite pendingWrite : batch) {
+                pendingWrite.completion().completeExceptionally(writerFailure);
+            }
+            return;
+        }
+        WalFormat.beginBlock(blockBuffer);
+        for (PendingWrite pendingWrite : batch) {
+            WalFormat.putRecord(blockBuffer, pendingWrite.entry());
+        }
+        WalFormat.sealBlock(blockBuffer, batch.size(), crc);
+        int blockBytes = blockBuffer.remaining();
+
+        channelLock.lock();
+        try {
+            if (segmentRecords > 0 && (segmentBytes + blockBytes > segmentMaxBytes
+                    || (segmentMaxAgeNanos > 0 && System.nanoTime() - segmentOpenedNanos >= segmentMaxAgeNanos))) {
+                sealSegment();
+                openSegment(segment.sequence() + 1);
+            }
+            while (blockBuffer.hasRemaining()) {
+                channel.write(blockBuffer);
+            }
+            if (fsync) {
+                channel.force(false);
+            }
+            segmentBytes += blockBytes;
+            segmentRecords += batch.size();
+            for (PendingWrite pendingWrite : batch) {
+                long timestamp = pendingWrite.entry().timestamp();
+                segmentMinTimestamp = Math.min(segmentMinTimestamp, timestamp);
+                segmentMaxTimestamp = Math.max(segmentMaxTimestamp, timestamp);
+            }
+        } catch (IOException e) {
+            logger.error("Failed to write WAL batch of {} entries", batch.size(), e);
+            discardFailedBlock(e);
+            for (PendingWrite pendingWrite : batch) {
+                pendingWrite.completion().completeExceptionally(e);
+            }
+            return;
+        } finally {
+            channelLock.unlock();
+        }
+        for (PendingWrite pendingWrite : batch) {
+            pendingWrite.completion().complete(null);
+        }
+    }
+
+    // Cuts off whatever part of a failed block reached the file, so that later
+    // blocks follow the last acknowledged one; replay stops at the first bad
+    // block and would drop them otherwise. If that fails too, the writer stops
+    // accepting writes. Callers hold channelLock.
+    private void discardFailedBlock(IOException writeFailure) {
+        try {
+            if (channel.size() > segmentBytes) {
+                // The channel appends, so the next block is written at the new end
+                channel.truncate(segmentBytes);
+                if (fsync) {
+                    channel.force(false);
+                }
+            }
+        } catch (IOException e) {
+            writeFailure.addSuppressed(e);
+            failure = writeFailure;
+            logger.error("Failed to roll back a failed WAL write in {}; the WAL writer accepts no more writes",
+                    segment.path(), e);
+        }
+    }
+
+    // Callers hold channelLock (or are the constructor)
+    private void openSegment(long sequence) throws IOException {
+        segment = WalSegments.segment(basePath, sequence);
+        channel = openChannel(segment.path());
+        segmentBytes = channel.size();
+        segmentRecords = 0;
+        segmentMinTimestamp = Long.MAX_VALUE;
+        segmentMaxTimestamp = Long.MIN_VALUE;
+        segmentOpenedNanos = System.nanoTime();
+    }
+
+    // Closes the current segment and writes its index; an empty segment is
+    // deleted instead. Callers hold channelLock.
+    private void sealSegment() throws IOException {
+        channel.force(true);
+        channel.close();
+        if (segmentRecords == 0) {
+            Files.deleteIfExists(segment.path());
+            return;
+        }
+        new WalSegmentIndex(segmentRecords, segmentMinTimestamp, segmentMaxTimestamp, Files.size(segment.path()))
+                .write(segment.indexPath());
+        logger.info("Sealed WAL segment {} with {} records", segment.path(), segmentRecords);
+    }
+
+    // Opens the file for appending, writing the file header if it is new
+    private static FileChannel openChannel(Path path) throws IOException {
+        FileChannel fileChannel = FileChannel.open(path, StandardOpenOption.CREATE, StandardOpenOption.WRITE,
+                StandardOpenOption.APPEND);
+        if (fileChannel.size() == 0) {
+            ByteBuffer header = ByteBuffer.allocate(WalFormat.FILE_HEADER_SIZE).order(WalFormat.BYTE_ORDER);
+            WalFormat.putFileHeader(header);
+            header.flip();
+            while (header.hasRemaining()) {
+                fileChannel.write(header);
+            }
+        }
+        return fileChannel;
+    }
+
+    private record PendingWrite(ScoreEntry entry, CompletableFuture<Void> completion) {
+    }
+}
@@ -0,0 +1,162 @@
+package com.ringgrank.service;
+
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.LinkedBlockingQueue;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.function.Function;
+
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+
+import com.ringgrank.model.Leaderboard;
+import com.ringgrank.model.ScoreEntry;
+
+/**
+ * Removes expired windowed scores on a pool of workers. Due scores are
+ * sharded by gameId, so one game's removals are applied in order by a single
+ * worker and workers never contend for the same leaderboard lock. Each
+ * leaderboard's share of a batch is removed in chunks, one write lock per
+ * chunk, so queries are never held off for long even after a traffic spike.
+ */
+public class ExpiryWorkerPool implements AutoCloseable {
+    // Scores removed per write lock acquisition
+    private static final int REMOVAL_CHUNK_SIZE = 1024;
+
+    private final Logger logger = LoggerFactory.getLogger(ExpiryWorkerPool.class);
+    private final Function<GlobalLeaderboardManager.ExpiringScore, Leaderboard> leaderboardResolver;
+    private final Worker[] workers;
+    private final AtomicLong pendingScores = new AtomicLong();
+
+    /**
+     * @param dueAt time at which the scores became due, in epoch millis
+     */
+    private record Batch(long dueAt, List<GlobalLeaderboardManager.ExpiringScore> scores) {
+    }
+
+    /**
+     * @param leaderboardResolver finds the leaderboard a score expires from, or
+     *                            null if the game or window no longer exists
+     */
+    public ExpiryWorkerPool(int workerCount,
+            Function<GlobalLeaderboardManager.ExpiringScore, Leaderboard> leaderboardResolver) {
+        this.leaderboardResolver = leaderboardResolver;
+        this.workers = new Worker[workerCount];
+        for (int i = 0; i < workerCount; i++) {
+            workers[i] = new Worker();
+            Thread thread = new Thread(workers[i], "ScoreExpiryWorker-" + (i + 1));
+            thread.setDaemon(true);
+            workers[i].thread = thread;
+            thread.start();
+        }
+    }
+
+    /**
+     * Hands scores that became due at the given time to the workers of their
+     * games.
+     */
+    public void submit(List<GlobalLeaderboardManager.ExpiringScore> dueScores, long dueAt) {
+        if (dueScores.isEmpty()) {
+            return;
+        }
+        List<List<GlobalLeaderboardManager.ExpiringScore>> shards = new ArrayList<>(workers.length);
+        for (int i = 0; i < workers.length; i++) {
+            shards.add(new ArrayList<>());
+        }
+        for (GlobalLeaderboardManager.ExpiringScore dueScore : dueScores) {
+            shards.get(shardOf(dueScore.scoreEntry().gameId())).add(dueScore);
+        }
+        pendingScores.addAndGet(dueScores.size());
+        for (int i = 0; i < workers.length; i++) {
+            if (!shards.get(i).isEmpty()) {
+                workers[i].queue.add(new Batch(dueAt, shards.get(i)));
+            }
+        }
+    }
+
+    /**
+     * @return due time of the oldest score not yet removed, or Long.MAX_VALUE if
+     *         every due score has been removed
+     */
+    public long oldestPendingDueAt() {
+        long oldest = Long.MAX_VALUE;
+        for (Worker worker : workers) {
+            oldest = Math.min(oldest, worker.oldestPendingDueAt());
+        }
+        return oldest;
+    }
+
+    /**
+     * @return number of due scores not yet removed
+     */
+    public long pendingScores() {
+        return pendingScores.get();
+    }
+
+    public int workerCount() {
+        return workers.length;
+    }
+
+    @Override
+    public void close() {
+        for (Worker worker : workers) {
+            worker.thread.interrupt();
+        }
+    }
+
+    private int shardOf(long gameId) {
+        return Math.floorMod(Long.hashCode(gameId), workers.length);
+    }
+
+    private void remove(List<GlobalLeaderboardManager.ExpiringScore> dueScores) {
+        Map<Leaderboard, List<ScoreEntry>> byLeaderboard = new HashMap<>();
+        for (GlobalLeaderboardManager.ExpiringScore dueScore : dueScores) {
+            Leaderboard leaderboard = leaderboardResolver.apply(dueScore);
+            if (leaderboard != null) {
+                byLeaderboard.computeIfAbsent(leaderboard, lb -> new ArrayList<>()).add(dueScore.scoreEntry());
+            }
+        }
+        byLeaderboard.forEach((leaderboard, entries) -> {
+            for (int from = 0; from < entries.size(); from += REMOVAL_CHUNK_SIZE) {
+                leaderboard.removeScores(entries.subList(from, Math.min(from + REMOVAL_CHUNK_SIZE, entries.size())));
+            }
+        });
+    }
+
+    private final class Worker implements Runnable {
+        private final BlockingQueue<Batch> queue = new LinkedBlockingQueue<>();
+        // Due time of the batch being removed; Long.MAX_VALUE when idle
+        private volatile long inProgressDueAt = Long.MAX_VALUE;
+        private Thread thread;
+
+        @Override
+        public void run() {
+            try {
+                while (true) {
+                    Batch batch = queue.take();
+                    inProgressDueAt = batch.dueAt();
+                    try {
+                        remove(batch.scores());
+                    } catch (RuntimeException e) {
+                        logger.error("Failed to remove expired scores", e);
+                    } finally {
+                        inProgressDueAt = Long.MAX_VALUE;
+                        pendingScores.addAndGet(-batch.scores().size());
+                    }
+                }
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+            }
+        }
+
+        // Between take() and recording the batch it may be briefly missed; a
+        // lag metric can afford that
+        private long oldestPendingDueAt() {
+            Batch head = queue.peek();
+            return Math.min(inProgressDueAt, head == null ? Long.MAX_VALUE : head.dueAt());
+        }
+    }
+}
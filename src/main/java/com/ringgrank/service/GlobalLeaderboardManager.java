@@ -1,38 +1,56 @@
 package com.ringgrank.service;
 
-import java.io.BufferedReader;
-import java.io.BufferedWriter;
-import java.io.EOFException;
-import java.io.FileOutputStream;
 import java.io.IOException;
-import java.io.ObjectInputStream;
-import java.io.ObjectOutputStream;
-import java.io.OutputStreamWriter;
-import java.nio.channels.FileChannel;
-import java.nio.charset.StandardCharsets;
+import java.nio.file.DirectoryStream;
 import java.nio.file.Files;
 import java.nio.file.Path;
 import java.nio.file.Paths;
 import java.nio.file.StandardCopyOption;
-import java.nio.file.StandardOpenOption;
-import java.nio.file.attribute.FileTime;
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.HashSet;
+import java.util.LinkedHashMap;
+import java.util.List;
 import java.util.Map;
+import java.util.Set;
 import java.util.concurrent.ConcurrentHashMap;
-import java.util.concurrent.DelayQueue;
-import java.util.concurrent.Delayed;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.concurrent.ScheduledExecutorService;
 import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicInteger;
 import java.util.concurrent.locks.Lock;
+import java.util.concurrent.locks.ReadWriteLock;
 import java.util.concurrent.locks.ReentrantLock;
+import java.util.concurrent.locks.ReentrantReadWriteLock;
 
 import org.slf4j.Logger;
 import org.slf4j.LoggerFactory;
+import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.beans.factory.annotation.Value;
 import org.springframework.scheduling.annotation.Scheduled;
 import org.springframework.stereotype.Component;
 
 import com.ringgrank.model.GameLeaderboardSet;
+import com.ringgrank.model.GameSnapshot;
 import com.ringgrank.model.Leaderboard;
+import com.ringgrank.model.LeaderboardStorage;
 import com.ringgrank.model.ScoreEntry;
+import com.ringgrank.model.TimingWheel;
+import com.ringgrank.model.WindowEngine;
+import com.ringgrank.persistence.LegacySnapshotReader;
+import com.ringgrank.persistence.PartitionedReplayDispatcher;
+import com.ringgrank.persistence.SnapshotManifest;
+import com.ringgrank.persistence.SnapshotReader;
+import com.ringgrank.persistence.SnapshotWriter;
+import com.ringgrank.persistence.WalFormatConverter;
+import com.ringgrank.persistence.WalReader;
+import com.ringgrank.persistence.WalSegmentIndex;
+import com.ringgrank.persistence.WalSegments;
+import com.ringgrank.persistence.WalWriter;
 
 import jakarta.annotation.PostConstruct;
 import jakarta.annotation.PreDestroy;
@@ -43,34 +61,147 @@ import jakarta.annotation.PreDestroy;
  */
 @Component
 public class GlobalLeaderboardManager {
+    private static final String SNAPSHOT_GAME_FILE_SUFFIX = ".snap";
     private final Logger logger = LoggerFactory.getLogger(GlobalLeaderboardManager.class);
     private final ConcurrentHashMap<Long, GameLeaderboardSet> gameLeaderboards = new ConcurrentHashMap<>();
     private final Map<Long, Lock> gameCreationLocks = new ConcurrentHashMap<>();
+    private final WindowConfiguration windowConfiguration;
 
     @Value("${leaderboard.wal.path:./data/wal/scores}")
     private String walFilePathString;
     private Path walFilePath;
-    private Path archivedWalFilePath;
+
+    /*
+     * A trade-off has to be made between durability and performance.
+     *
+     * With leaderboard.wal.fsync=true every batch is forced to disk before the
+     * scores in it are acknowledged. Otherwise the OS decides when to flush the
+     * file and a crash can lose the most recent writes.
+     *
+     * Concurrent writers are group-committed: one write (and at most one force)
+     * per batch of up to leaderboard.wal.batch-size entries, optionally waiting
+     * leaderboard.wal.linger-ms for a batch to fill up.
+     */
+    @Value("${leaderboard.wal.fsync:false}")
+    private boolean walFsync;
+
+    @Value("${leaderboard.wal.batch-size:512}")
+    private int walBatchSize;
+
+    @Value("${leaderboard.wal.linger-ms:0}")
+    private long walLingerMs;
+
+    // The WAL is split into segments sealed at this size or age, so that replay
+    // can skip whole segments already covered by the snapshot
+    @Value("${leaderboard.wal.segment-max-bytes:67108864}") // Default: 64 MB
+    private long walSegmentMaxBytes;
+
+    @Value("${leaderboard.wal.segment-max-age-ms:600000}") // Default: 10 minutes
+    private long walSegmentMaxAgeMs;
+
+    // Threads applying WAL records on startup, partitioned by game; 0 uses one
+    // per available processor
+    @Value("${leaderboard.wal.replay-threads:0}")
+    private int walReplayThreads;
+
+    private WalWriter walWriter;
 
     @Value("${leaderboard.snapshot.path:./data/snapshot/leaderboard}")
     private String snapshotFilePathString;
     private Path snapshotFilePath;
-    private Path tempSnapshotFilePath;
+    private Path snapshotManifestPath;
 
-    @Value("${leaderboard.snapshot.interval:3600000}") // Default: 1 hour
+    // Snapshots are incremental, so they can be taken often
+    @Value("${leaderboard.snapshot.interval:300000}") // Default: 5 minutes
     private long snapshotInterval;
 
-    private final DelayQueue<ExpiringScore> expiringScores = new DelayQueue<>();
+    // Threads loading snapshot game files on startup; 0 uses one per available
+    // processor
+    @Value("${leaderboard.snapshot.load-threads:0}")
+    private int snapshotLoadThreads;
+
+    // Deflate the snapshot body: smaller files for some extra CPU on write and load
+    @Value("${leaderboard.snapshot.compress:false}")
+    private boolean snapshotCompress;
+
+    /*
+     * Snapshots are taken while ingestion continues. The WAL is rolled to a new
+     * segment (the fence) and every game is then copied and streamed to disk one
+     * at a time. recordScore holds the gate's read lock from the WAL append until
+     * the score is applied, and the roll takes the write lock. So every score in
+     * a segment before the fence is already in memory when the games are copied.
+     * Copies may also contain later scores; replaying from the fence re-applies
+     * them in order, which leaves the same state because updates are
+     * last-write-wins. Ingestion waits only for the roll, never for the copy or
+     * the disk writes.
+     */
+    private final ReadWriteLock snapshotGate = new ReentrantReadWriteLock();
+    // Serializes scheduled snapshots and the one taken on shutdown
+    private final Lock snapshotLock = new ReentrantLock();
+    // Game files of the current snapshot, by gameId; only touched during startup
+    // or with snapshotLock held
+    private final Map<Long, SnapshotManifest.GameFile> snapshotGameFiles = new HashMap<>();
+    private long snapshotGeneration;
+
+    @Value("${leaderboard.histogram.enabled:false}")
+    private boolean histogramEnabled;
+
+    @Value("${leaderboard.storage:SKIP_LIST}")
+    private LeaderboardStorage leaderboardStorage;
+
+    @Value("${leaderboard.window.engine:PER_ENTRY}")
+    private WindowEngine windowEngine;
+
+    /*
+     * Windowed scores are expired by a hierarchical timing wheel: scheduling is an
+     * O(1) append to a bucket, and the expiration processor wakes once per tick
+     * to take a whole bucket of due scores and hand it to the expiry workers,
+     * sharded by game. Scores leave a window up to one tick late, plus however
+     * far the workers are behind (see getExpiryLag()).
+     */
+    @Value("${leaderboard.expiry.tick-ms:1000}")
+    private long expiryTickMs;
+
+    // Threads removing expired scores; 0 uses one per available processor
+    @Value("${leaderboard.expiry.workers:0}")
+    private int expiryWorkers;
+
+    private TimingWheel<ExpiringScore> expiryWheel;
+    private ExpiryWorkerPool expiryWorkerPool;
+
+    // With the LAZY window engine, how often stale entries are pruned from
+    // windows that no query has pruned
+    @Value("${leaderboard.window.compaction-interval-ms:60000}")
+    private long windowCompactionIntervalMs;
+
+    private final ScheduledExecutorService windowCompactionExecutor = Executors.newSingleThreadScheduledExecutor(
+            runnable -> {
+                Thread thread = new Thread(runnable, "WindowCompaction");
+                thread.setDaemon(true);
+                thread.setPriority(Thread.MIN_PRIORITY);
+                return thread;
+            });
+
+    // Backfills windows added at runtime, one at a time
+    private final ExecutorService windowBackfillExecutor = Executors.newSingleThreadExecutor(runnable -> {
+        Thread thread = new Thread(runnable, "WindowBackfill");
+        thread.setDaemon(true);
+        return thread;
+    });
     private volatile boolean isRunning = true;
     private Thread expirationProcessorThread;
 
+    @Autowired
+    public GlobalLeaderboardManager(WindowConfiguration windowConfiguration) {
+        this.windowConfiguration = windowConfiguration;
+    }
+
     @PostConstruct
     public void initialize() {
         logger.info("Initializing GlobalLeaderboardManager");
         this.walFilePath = Paths.get(walFilePathString);
-        this.archivedWalFilePath = Paths.get(walFilePathString + ".archive"); // Define archived WAL path
         this.snapshotFilePath = Paths.get(snapshotFilePathString);
-        this.tempSnapshotFilePath = Paths.get(snapshotFilePathString + ".tmp");
+        this.snapshotManifestPath = Paths.get(snapshotFilePathString + ".manifest");
         // Create necessary directories
         try {
             Files.createDirectories(walFilePath.getParent());
@@ -79,18 +210,37 @@ public class GlobalLeaderboardManager {
             throw new RuntimeException("Failed to create data directories", e);
         }
 
+        expiryWheel = new TimingWheel<>(expiryTickMs, System.currentTimeMillis());
+
         // Load data from snapshot and WAL
-        long lastTimestamp = loadFromSnapshot(snapshotFilePath);
-        replayWALFile(walFilePath, lastTimestamp);
+        RecoveryPoint recoveryPoint = loadFromSnapshot();
+        replayWAL(recoveryPoint);
+
+        try {
+            walWriter = new WalWriter(walFilePath, walBatchSize, walLingerMs, walFsync, walSegmentMaxBytes,
+                    walSegmentMaxAgeMs);
+        } catch (IOException e) {
+            throw new RuntimeException("Failed to open WAL", e);
+        }
 
+        expiryWorkerPool = new ExpiryWorkerPool(
+                expiryWorkers > 0 ? expiryWorkers : Runtime.getRuntime().availableProcessors(),
+                this::getExpiringLeaderboard);
         expirationProcessorThread = new Thread(this::processExpiringScores, "ScoreExpirationProcessor");
         expirationProcessorThread.setDaemon(true);
         expirationProcessorThread.start();
+
+        if (windowEngine == WindowEngine.LAZY) {
+            windowCompactionExecutor.scheduleWithFixedDelay(this::compactWindows, windowCompactionIntervalMs,
+                    windowCompactionIntervalMs, TimeUnit.MILLISECONDS);
+        }
     }
 
     @PreDestroy
     public void shutdown() {
         isRunning = false;
+        windowBackfillExecutor.shutdownNow();
+        windowCompactionExecutor.shutdownNow();
         if (expirationProcessorThread != null) {
             expirationProcessorThread.interrupt(); // Interrupt the expiration processor thread
             try {
@@ -99,166 +249,405 @@ public class GlobalLeaderboardManager {
                 Thread.currentThread().interrupt();
             }
         }
+        if (expiryWorkerPool != null) {
+            expiryWorkerPool.close();
+        }
         createSnapshot();
+        try {
+            walWriter.close();
+        } catch (IOException e) {
+            logger.error("Failed to close WAL", e);
+        }
     }
 
     public void recordScore(ScoreEntry scoreEntry) {
+        snapshotGate.readLock().lock();
+        try {
+            applyScore(scoreEntry);
+        } finally {
+            snapshotGate.readLock().unlock();
+        }
+    }
+
+    /**
+     * Records a batch of scores: they are appended to the WAL together, waiting
+     * once for all of their group commits, and then applied one game at a time,
+     * each game's scores in order and under one write lock per leaderboard.
+     */
+    public void recordScores(List<ScoreEntry> scoreEntries) {
+        Map<Long, List<ScoreEntry>> byGame = new LinkedHashMap<>();
+        for (ScoreEntry scoreEntry : scoreEntries) {
+            byGame.computeIfAbsent(scoreEntry.gameId(), gameId -> new ArrayList<>()).add(scoreEntry);
+        }
+        snapshotGate.readLock().lock();
+        try {
+            walWriter.appendAll(scoreEntries);
+            byGame.forEach((gameId, gameEntries) -> getOrCreateGameSet(gameId).addScores(gameEntries));
+        } finally {
+            snapshotGate.readLock().unlock();
+        }
+    }
+
+    private void applyScore(ScoreEntry scoreEntry) {
         // 1. Write to WAL first for durability
         writeToWAL(scoreEntry);
 
         // 2. Update in-memory structures
-        GameLeaderboardSet gameSet = gameLeaderboards.get(scoreEntry.gameId());
+        applyToMemory(scoreEntry);
+    }
+
+    private void applyToMemory(ScoreEntry scoreEntry) {
+        getOrCreateGameSet(scoreEntry.gameId()).addScore(scoreEntry);
+    }
+
+    private GameLeaderboardSet getOrCreateGameSet(long gameId) {
+        GameLeaderboardSet gameSet = gameLeaderboards.get(gameId);
         if (gameSet == null) {
             Lock lock = gameCreationLocks.computeIfAbsent(
-                    scoreEntry.gameId(),
+                    gameId,
                     k -> new ReentrantLock());
             lock.lock();
             try {
-                gameSet = gameLeaderboards.computeIfAbsent(scoreEntry.gameId(),
-                        id -> new GameLeaderboardSet(id, expiringScores));
-                gameSet.addScore(scoreEntry);
+                gameSet = gameLeaderboards.computeIfAbsent(gameId, this::newGameSet);
             } finally {
                 lock.unlock();
             }
         }
-        gameSet.addScore(scoreEntry);
+        return gameSet;
     }
 
     private void writeToWAL(ScoreEntry entry) {
-        String entryString = String.format("%d,%d,%d,%d%n",
-                entry.timestamp(),
-                entry.gameId(),
-                entry.userId(),
-                entry.score());
-        try (FileOutputStream fos = new FileOutputStream(this.walFilePath.toFile(), true);
-                FileChannel channel = fos.getChannel();
-                BufferedWriter writer = new BufferedWriter(new OutputStreamWriter(fos, StandardCharsets.UTF_8))) {
-
-            writer.write(entryString);
-            writer.flush();
-            /*
-             * A trade-off has to be made between durability and performance.
-             * 
-             * channel.force(true) will force the OS to flush the file to disk,
-             * but it is slow. But still I have chosen not to use it because the performance
-             * gain is significant.
-             * 
-             * writer.flush() is faster, but the OS may not flush the file to disk
-             * immediately.
-             * 
-             * I have chosen to use writer.flush() because the performance gain is
-             * significant.
-             * 
-             * If you want to use channel.force(true), you can uncomment the line.
-             * 
-             */
-            // channel.force(true);
-
-        } catch (IOException e) {
-            throw new RuntimeException("Failed to write to WAL", e);
-        }
+        walWriter.append(entry);
     }
 
-    @Scheduled(fixedDelayString = "${leaderboard.snapshot.interval:3600000}")
+    /**
+     * Takes an incremental snapshot: only games that changed since the previous
+     * snapshot are written to new files, and a new manifest ties every game file
+     * to the WAL fence.
+     */
+    @Scheduled(fixedDelayString = "${leaderboard.snapshot.interval:300000}")
     public void createSnapshot() {
-        logger.info("Creating snapshot");
-        try (ObjectOutputStream oos = new ObjectOutputStream(
-                Files.newOutputStream(tempSnapshotFilePath, StandardOpenOption.CREATE))) {
-            for (Map.Entry<Long, GameLeaderboardSet> entry : gameLeaderboards.entrySet()) {
-                oos.writeLong(entry.getKey());
-                oos.writeObject(entry.getValue());
-            }
-            // Atomic move to ensure consistency
-            Files.move(tempSnapshotFilePath, snapshotFilePath,
-                    StandardCopyOption.ATOMIC_MOVE,
-                    StandardCopyOption.REPLACE_EXISTING);
-
-            logger.info("Moving WAL {} to archive", walFilePath);
-            if (!Files.exists(walFilePath)) {
-                Files.createFile(walFilePath);
+        snapshotLock.lock();
+        try {
+            logger.info("Creating snapshot");
+            long startNanos = System.nanoTime();
+            long fence = rollWALForSnapshot();
+            long generation = snapshotGeneration + 1;
+            List<SnapshotManifest.GameFile> gameFiles = new ArrayList<>(gameLeaderboards.size());
+            int writtenGames = 0;
+            for (GameLeaderboardSet gameSet : gameLeaderboards.values()) {
+                // Read after the cut: if the version is unchanged, the existing file
+                // already holds every score before the fence
+                long version = gameSet.getVersion();
+                SnapshotManifest.GameFile gameFile = snapshotGameFiles.get(gameSet.getGameId());
+                if (gameFile == null || gameFile.gameVersion() != version) {
+                    gameFile = writeGameSnapshot(gameSet, version, generation, fence);
+                    writtenGames++;
+                }
+                gameFiles.add(gameFile);
             }
-            Files.move(walFilePath, archivedWalFilePath,
-                    StandardCopyOption.REPLACE_EXISTING,
-                    StandardCopyOption.ATOMIC_MOVE);
+            new SnapshotManifest(generation, fence, gameFiles).write(snapshotManifestPath);
 
-            logger.info("Snapshot created");
+            snapshotGeneration = generation;
+            snapshotGameFiles.clear();
+            for (SnapshotManifest.GameFile gameFile : gameFiles) {
+                snapshotGameFiles.put(gameFile.gameId(), gameFile);
+            }
+            deleteUnreferencedSnapshotFiles();
+            // A single-file snapshot from an older version is superseded now
+            Files.deleteIfExists(snapshotFilePath);
+            pruneWALSegments(fence);
+            logger.info("Snapshot generation {} created in {} ms: wrote {} of {} games; WAL replay starts at "
+                    + "segment {}", generation, (System.nanoTime() - startNanos) / 1_000_000, writtenGames,
+                    gameFiles.size(), fence);
         } catch (IOException e) {
             logger.error("Failed to create snapshot", e);
             throw new RuntimeException("Failed to create snapshot", e);
         } finally {
-            try {
-                Files.deleteIfExists(tempSnapshotFilePath);
-            } catch (IOException cleanupEx) {
-            }
+            snapshotLock.unlock();
+        }
+    }
+
+    private SnapshotManifest.GameFile writeGameSnapshot(GameLeaderboardSet gameSet, long version, long generation,
+            long fence) throws IOException {
+        String fileName = snapshotFilePath.getFileName() + "-" + gameSet.getGameId() + "-" + generation
+                + SNAPSHOT_GAME_FILE_SUFFIX;
+        try (SnapshotWriter writer = new SnapshotWriter(snapshotFilePath.resolveSibling(fileName), fence,
+                snapshotCompress)) {
+            writer.writeGame(gameSet.snapshot());
+            writer.commit();
         }
+        return new SnapshotManifest.GameFile(gameSet.getGameId(), version, fileName);
     }
 
-    private long loadFromSnapshot(Path path) {
-        if (!Files.exists(path)) {
-            return 0;
+    // Removes game files replaced by newer ones, and any left by a failed snapshot
+    private void deleteUnreferencedSnapshotFiles() throws IOException {
+        Set<String> referenced = new HashSet<>();
+        for (SnapshotManifest.GameFile gameFile : snapshotGameFiles.values()) {
+            referenced.add(gameFile.fileName());
         }
-        FileTime snapshotFileTime = FileTime.fromMillis(0);
-        try (ObjectInputStream ois = new ObjectInputStream(
-                Files.newInputStream(path))) {
-            snapshotFileTime = Files.getLastModifiedTime(path);
-            while (true) {
-                try {
-                    long gameId = ois.readLong();
-                    GameLeaderboardSet gameSet = (GameLeaderboardSet) ois.readObject();
-                    gameSet.setExpiringScoresQueueRef(expiringScores);
-                    gameLeaderboards.put(gameId, gameSet);
-                    logger.info("Game Set: {} with {} leaderboards", gameId,
-                            gameSet.getLeaderboard(null).getTotalPlayers());
-                } catch (EOFException e) {
-                    break;
+        String pattern = snapshotFilePath.getFileName() + "-*" + SNAPSHOT_GAME_FILE_SUFFIX;
+        try (DirectoryStream<Path> stream = Files.newDirectoryStream(snapshotFilePath.toAbsolutePath().getParent(),
+                pattern)) {
+            for (Path path : stream) {
+                if (!referenced.contains(path.getFileName().toString())) {
+                    Files.delete(path);
                 }
             }
-        } catch (IOException | ClassNotFoundException e) {
+        }
+    }
+
+    // Cuts the WAL: returns the first segment whose scores may not be in memory yet
+    private long rollWALForSnapshot() throws IOException {
+        snapshotGate.writeLock().lock();
+        try {
+            return walWriter.roll();
+        } finally {
+            snapshotGate.writeLock().unlock();
+        }
+    }
+
+    /**
+     * Where WAL replay starts: the first segment not covered by the snapshot and,
+     * for snapshots from older versions, the timestamp records must be newer
+     * than.
+     */
+    private record RecoveryPoint(long walSequence, long timestamp) {
+        static final RecoveryPoint NONE = new RecoveryPoint(0, Long.MIN_VALUE);
+    }
+
+    private RecoveryPoint loadFromSnapshot() {
+        try {
+            SnapshotManifest manifest = SnapshotManifest.read(snapshotManifestPath);
+            if (manifest != null) {
+                return loadFromManifest(manifest);
+            }
+            if (!Files.exists(snapshotFilePath)) {
+                return RecoveryPoint.NONE;
+            }
+            if (!SnapshotReader.isSnapshot(snapshotFilePath)) {
+                return loadFromLegacySnapshot(snapshotFilePath);
+            }
+            // Single-file snapshot written before snapshots became incremental
+            SnapshotReader.SnapshotInfo info = SnapshotReader.read(snapshotFilePath, this::restoreGame);
+            logger.info("Loaded snapshot of {} games; replaying WAL from segment {}", info.games(),
+                    info.walSequence());
+            return new RecoveryPoint(info.walSequence(), Long.MIN_VALUE);
+        } catch (IOException e) {
             throw new RuntimeException("Failed to load snapshot", e);
         }
-        logger.info("Game Set: {}", gameLeaderboards.size());
-        return snapshotFileTime.toMillis();
     }
 
-    private void replayWALFile(Path path, long fromTimestamp) {
-        if (!Files.exists(path)) {
-            return;
+    // Game files are independent, so they are loaded concurrently
+    private RecoveryPoint loadFromManifest(SnapshotManifest manifest) throws IOException {
+        long startNanos = System.nanoTime();
+        int threads = snapshotLoadThreads > 0 ? snapshotLoadThreads : Runtime.getRuntime().availableProcessors();
+        AtomicInteger threadCount = new AtomicInteger();
+        ExecutorService loaderPool = Executors.newFixedThreadPool(threads, runnable -> {
+            Thread thread = new Thread(runnable, "SnapshotLoader-" + threadCount.incrementAndGet());
+            thread.setDaemon(true);
+            return thread;
+        });
+        AtomicInteger loadedGames = new AtomicInteger();
+        try {
+            List<Future<SnapshotManifest.GameFile>> loads = new ArrayList<>(manifest.games().size());
+            for (SnapshotManifest.GameFile gameFile : manifest.games()) {
+                loads.add(loaderPool.submit(() -> loadGameFile(gameFile, loadedGames, manifest.games().size())));
+            }
+            for (Future<SnapshotManifest.GameFile> load : loads) {
+                SnapshotManifest.GameFile gameFile = load.get();
+                snapshotGameFiles.put(gameFile.gameId(), gameFile);
+            }
+        } catch (ExecutionException e) {
+            throw new IOException("Failed to load snapshot game file", e.getCause());
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            throw new IOException("Interrupted while loading snapshot", e);
+        } finally {
+            loaderPool.shutdownNow();
         }
+        snapshotGeneration = manifest.generation();
+        logger.info("Loaded snapshot generation {} of {} games on {} threads in {} ms; replaying WAL from segment {}",
+                manifest.generation(), manifest.games().size(), threads, (System.nanoTime() - startNanos) / 1_000_000,
+                manifest.walSequence());
+        return new RecoveryPoint(manifest.walSequence(), Long.MIN_VALUE);
+    }
 
-        try (BufferedReader reader = Files.newBufferedReader(path)) {
-            String line;
-            while ((line = reader.readLine()) != null) {
-                String[] parts = line.split(",");
-                long timestamp = Long.parseLong(parts[0]);
-                if (timestamp < fromTimestamp) {
-                    continue;
-                }
-                ScoreEntry entry = new ScoreEntry(
-                        Long.parseLong(parts[2]), // userId
-                        Long.parseLong(parts[1]), // gameId
-                        Long.parseLong(parts[3]), // score
-                        timestamp // timestamp
-                );
-                // Skip WAL writing when replaying
-                GameLeaderboardSet gameSet = gameLeaderboards.get(entry.gameId());
-                if (gameSet == null) {
-                    gameSet = new GameLeaderboardSet(entry.gameId(), expiringScores);
-                    gameLeaderboards.put(entry.gameId(), gameSet);
+    private SnapshotManifest.GameFile loadGameFile(SnapshotManifest.GameFile gameFile, AtomicInteger loadedGames,
+            int totalGames) throws IOException {
+        long startNanos = System.nanoTime();
+        SnapshotReader.read(snapshotFilePath.resolveSibling(gameFile.fileName()), this::restoreGame);
+        GameLeaderboardSet gameSet = gameLeaderboards.get(gameFile.gameId());
+        logger.info("Loaded game {} with {} players in {} ms ({}/{})", gameFile.gameId(),
+                gameSet.getLeaderboard(null).getTotalPlayers(), (System.nanoTime() - startNanos) / 1_000_000,
+                loadedGames.incrementAndGet(), totalGames);
+        // Versions restart from zero in a new process; remember the version of the
+        // restored state so that the game keeps its file until it changes
+        return new SnapshotManifest.GameFile(gameFile.gameId(), gameSet.getVersion(), gameFile.fileName());
+    }
+
+    private void restoreGame(GameSnapshot snapshot) {
+        GameLeaderboardSet gameSet = new GameLeaderboardSet(snapshot.gameId(), expiryWheel, leaderboardStorage,
+                histogramEnabled, windowEngine);
+        gameSet.restore(snapshot);
+        gameLeaderboards.put(snapshot.gameId(), gameSet);
+        addConfiguredWindows(gameSet);
+    }
+
+    private GameLeaderboardSet newGameSet(long gameId) {
+        GameLeaderboardSet gameSet = new GameLeaderboardSet(gameId, expiryWheel, leaderboardStorage, histogramEnabled,
+                windowEngine);
+        windowConfiguration.windowsFor(gameId).forEach(gameSet::configureWindow);
+        return gameSet;
+    }
+
+    // A restored game keeps the windows it was snapshotted with, and gets the
+    // configured ones it lacks, backfilled in the background
+    private void addConfiguredWindows(GameLeaderboardSet gameSet) {
+        windowConfiguration.windowsFor(gameSet.getGameId())
+                .forEach((windowKey, duration) -> addWindow(gameSet, windowKey, duration));
+    }
+
+    /**
+     * Adds a window to a game and backfills it in the background. Ingestion and
+     * queries on the game's other leaderboards continue meanwhile.
+     *
+     * @return false if the game already has the window
+     */
+    public boolean addWindow(GameLeaderboardSet gameSet, String windowKey, Duration duration) {
+        if (!gameSet.addWindow(windowKey, duration)) {
+            return false;
+        }
+        windowBackfillExecutor.execute(() -> {
+            long startNanos = System.nanoTime();
+            gameSet.backfillWindow(windowKey);
+            logger.info("Backfilled window {} of game {} in {} ms", windowKey, gameSet.getGameId(),
+                    (System.nanoTime() - startNanos) / 1_000_000);
+        });
+        return true;
+    }
+
+    // Java-serialized snapshot written by an older version; its WAL position is
+    // only known by the file's modification time. Its games are rebuilt like
+    // those of a current snapshot, with this version's storage, window engine
+    // and configured windows.
+    private RecoveryPoint loadFromLegacySnapshot(Path path) throws IOException {
+        long snapshotTimestamp = Files.getLastModifiedTime(path).toMillis();
+        int games = LegacySnapshotReader.read(path, this::restoreGame);
+        logger.info("Loaded legacy snapshot of {} games; replaying WAL records newer than {}", games,
+                snapshotTimestamp);
+        return new RecoveryPoint(0, snapshotTimestamp);
+    }
+
+    private void replayWAL(RecoveryPoint recoveryPoint) {
+        long fromTimestamp = recoveryPoint.timestamp();
+        try {
+            migrateLegacyWAL();
+            List<WalSegments.Segment> segments = WalSegments.list(walFilePath);
+            int replayThreads = walReplayThreads > 0 ? walReplayThreads : Runtime.getRuntime().availableProcessors();
+            long startNanos = System.nanoTime();
+            long records = 0;
+            long bytes = 0;
+            long readNanos = 0;
+            int skippedSegments = 0;
+            // Records of one game always land on the same worker, so per-game order is kept
+            try (PartitionedReplayDispatcher dispatcher = new PartitionedReplayDispatcher(replayThreads,
+                    (timestamp, gameId, userId, score) -> {
+                        // Skip WAL writing when replaying
+                        GameLeaderboardSet gameSet = gameLeaderboards.computeIfAbsent(gameId, this::newGameSet);
+                        gameSet.addScore(new ScoreEntry(userId, gameId, score, timestamp));
+                    })) {
+                for (int i = 0; i < segments.size(); i++) {
+                    WalSegments.Segment segment = segments.get(i);
+                    if (segment.sequence() < recoveryPoint.walSequence()) {
+                        skippedSegments++;
+                        continue;
+                    }
+                    WalSegmentIndex index = WalSegmentIndex.read(segment.indexPath());
+                    if (index != null && index.isCurrentFor(segment.path()) && index.maxTimestamp() < fromTimestamp) {
+                        skippedSegments++;
+                        continue;
+                    }
+                    // Only the last segment, unless it was indexed, can have been cut off
+                    // mid-write; a bad block in any other one fails recovery
+                    boolean activeTail = i == segments.size() - 1
+                            && (index == null || !index.isCurrentFor(segment.path()));
+                    WalReader.ReplayResult result = WalReader.replay(segment.path(), activeTail,
+                            (timestamp, gameId, userId, score) -> {
+                                if (timestamp >= fromTimestamp) {
+                                    dispatcher.accept(timestamp, gameId, userId, score);
+                                }
+                            });
+                    records += result.records();
+                    bytes += result.validBytes();
+                    readNanos += result.elapsedNanos();
+                    indexReplayedSegment(segment, index, result);
                 }
-                gameSet.addScore(entry);
             }
+            long elapsedMillis = (System.nanoTime() - startNanos) / 1_000_000;
+            double readSeconds = readNanos / 1_000_000_000.0;
+            logger.info("Replayed {} WAL records ({} bytes) from {} of {} segments on {} threads in {} ms "
+                    + "(read: {} records/s, {} MB/s)",
+                    records, bytes, segments.size() - skippedSegments, segments.size(), replayThreads, elapsedMillis,
+                    String.format("%.0f", readSeconds == 0 ? 0 : records / readSeconds),
+                    String.format("%.1f", readSeconds == 0 ? 0 : bytes / readSeconds / (1024 * 1024)));
         } catch (IOException e) {
             throw new RuntimeException("Failed to replay WAL", e);
         }
     }
 
+    // Segments left by a crash have no index yet (or one made stale by
+    // truncation); write it now so the next startup can skip them. The writer
+    // never appends to them again.
+    private void indexReplayedSegment(WalSegments.Segment segment, WalSegmentIndex index,
+            WalReader.ReplayResult result) throws IOException {
+        if (result.records() == 0) {
+            Files.deleteIfExists(segment.indexPath());
+            Files.deleteIfExists(segment.path());
+        } else if (index == null || !index.isCurrentFor(segment.path())) {
+            new WalSegmentIndex(result.records(), result.minTimestamp(), result.maxTimestamp(), result.validBytes())
+                    .write(segment.indexPath());
+        }
+    }
+
+    // A WAL from an older version is a single file at the base path, possibly in
+    // CSV; it becomes segment 0, ahead of every segment written since
+    private void migrateLegacyWAL() throws IOException {
+        if (!Files.isRegularFile(walFilePath)) {
+            return;
+        }
+        if (WalFormatConverter.isLegacyCsv(walFilePath)) {
+            WalFormatConverter.migrateInPlace(walFilePath);
+        }
+        Path segmentPath = WalSegments.segment(walFilePath, 0).path();
+        Files.move(walFilePath, segmentPath, StandardCopyOption.ATOMIC_MOVE);
+        logger.info("Moved WAL {} to segment {}", walFilePath, segmentPath);
+    }
+
+    // Deletes the segments before the snapshot's fence; they are all sealed
+    private void pruneWALSegments(long fence) throws IOException {
+        for (WalSegments.Segment segment : WalSegments.list(walFilePath)) {
+            if (segment.sequence() >= fence) {
+                break;
+            }
+            Files.deleteIfExists(segment.path());
+            Files.deleteIfExists(segment.indexPath());
+            logger.info("Deleted WAL segment {} covered by the snapshot", segment.path());
+        }
+    }
+
     private void processExpiringScores() {
         while (isRunning) {
             try {
-                ExpiringScore expired = expiringScores.take();
-                GameLeaderboardSet gameSet = gameLeaderboards.get(expired.gameId());
-                Leaderboard leaderboard = gameSet.getLeaderboard(expired.windowKey());
-                leaderboard.removeScore(expired.scoreEntry());
+                // Wake up on the next tick boundary
+                Thread.sleep(expiryTickMs - System.currentTimeMillis() % expiryTickMs);
+                long now = System.currentTimeMillis();
+                expiryWorkerPool.submit(expiryWheel.advance(now), now);
+                if (windowEngine == WindowEngine.BUCKETED) {
+                    for (GameLeaderboardSet gameSet : gameLeaderboards.values()) {
+                        gameSet.expireBuckets(now);
+                    }
+                }
             } catch (InterruptedException e) {
                 Thread.currentThread().interrupt();
                 break;
@@ -266,45 +655,49 @@ public class GlobalLeaderboardManager {
         }
     }
 
-    public GameLeaderboardSet getGameLeaderboardSet(Long gameId) {
-        return gameLeaderboards.get(gameId);
-    }
-
-    public static class ExpiringScore implements Delayed {
-        private final ScoreEntry scoreEntry;
-        private final long gameId;
-        private final String windowKey;
-        private final long expirationTime;
-
-        public ExpiringScore(ScoreEntry entry, long gameId, String windowKey, long expirationTime) {
-            this.scoreEntry = entry;
-            this.gameId = gameId;
-            this.windowKey = windowKey;
-            this.expirationTime = expirationTime;
+    private void compactWindows() {
+        long now = System.currentTimeMillis();
+        for (GameLeaderboardSet gameSet : gameLeaderboards.values()) {
+            gameSet.compactWindows(now);
         }
+    }
 
-        @Override
-        public long getDelay(TimeUnit unit) {
-            return unit.convert(expirationTime - System.currentTimeMillis(),
-                    TimeUnit.MILLISECONDS);
-        }
+    // Null if the game or the window is gone
+    private Leaderboard getExpiringLeaderboard(ExpiringScore expiringScore) {
+        GameLeaderboardSet gameSet = gameLeaderboards.get(expiringScore.scoreEntry().gameId());
+        return gameSet == null ? null : gameSet.getLeaderboard(expiringScore.windowKey());
+    }
 
-        @Override
-        public int compareTo(Delayed other) {
-            return Long.compare(expirationTime,
-                    ((ExpiringScore) other).expirationTime);
-        }
+    public ExpiryLag getExpiryLag() {
+        long now = System.currentTimeMillis();
+        long oldestPendingDueAt = expiryWorkerPool.oldestPendingDueAt();
+        return new ExpiryLag(
+                Math.max(0, now - expiryWheel.currentTime()),
+                oldestPendingDueAt == Long.MAX_VALUE ? 0 : Math.max(0, now - oldestPendingDueAt),
+                expiryWorkerPool.pendingScores(),
+                expiryWheel.size(),
+                expiryWorkerPool.workerCount());
+    }
 
-        public ScoreEntry scoreEntry() {
-            return scoreEntry;
-        }
+    public GameLeaderboardSet getGameLeaderboardSet(Long gameId) {
+        return gameLeaderboards.get(gameId);
+    }
 
-        public long gameId() {
-            return gameId;
-        }
+    /**
+     * @param wheelLagMs      how far the timing wheel is behind the clock
+     * @param oldestOverdueMs how long the oldest due score that has not been
+     *                        removed yet has been overdue; 0 if there is none
+     * @param pendingScores   due scores waiting for an expiry worker
+     * @param scheduledScores scores scheduled on the timing wheel
+     * @param workers         number of expiry workers
+     */
+    public record ExpiryLag(long wheelLagMs, long oldestOverdueMs, long pendingScores, long scheduledScores,
+            int workers) {
+    }
 
-        public String windowKey() {
-            return windowKey;
-        }
+    /**
+     * A windowed score scheduled for removal from its window.
+     */
+    public record ExpiringScore(ScoreEntry scoreEntry, String windowKey) {
     }
 }
\ No newline at end of file
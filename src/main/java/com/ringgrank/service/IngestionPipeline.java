@@ -0,0 +1,359 @@
+package com.ringgrank.service;
+
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.TimeoutException;
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.concurrent.locks.LockSupport;
+
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Component;
+
+import com.ringgrank.exception.IngestionQueueFullException;
+import com.ringgrank.model.MpscRingBuffer;
+import com.ringgrank.model.ScoreEntry;
+
+import jakarta.annotation.PostConstruct;
+import jakarta.annotation.PreDestroy;
+
+/**
+ * Takes accepted scores off the request threads. A submitted score is placed
+ * in a bounded lock-free ring and the request returns; a small set of writer
+ * threads drain the rings in batches, appending each batch to the WAL at once
+ * and applying it to the leaderboards. Scores are sharded by gameId, so every
+ * score of a game, single or batched, is applied in submission order by one
+ * writer, which takes the game's write locks once per batch and never
+ * contends with another submission for them. Other writes still come from
+ * their own threads: expiry workers removing due scores, the backfill of a
+ * window added at runtime and the pruning of lazy windows take the same
+ * locks and may make the writer wait.
+ * When a writer's ring is full the score is rejected rather than queued, which
+ * the API reports as 429.
+ * A score acknowledged in async mode is durable only once its writer has
+ * appended it to the WAL; scores still queued when the process dies are lost.
+ */
+@Component
+public class IngestionPipeline {
+    // How long an idle writer parks before checking its ring again, unless a
+    // submission wakes it first
+    private static final long IDLE_PARK_NANOS = TimeUnit.MILLISECONDS.toNanos(1);
+    // How long stop() waits for submissions that are placing scores in a ring
+    private static final long STOP_SUBMIT_WAIT_NANOS = TimeUnit.SECONDS.toNanos(1);
+
+    private final Logger logger = LoggerFactory.getLogger(IngestionPipeline.class);
+    private final GlobalLeaderboardManager leaderboardManager;
+
+    // false applies every score on the request thread, as before
+    @Value("${leaderboard.ingestion.async:true}")
+    private boolean async;
+
+    @Value("${leaderboard.ingestion.writers:4}")
+    private int writerCount;
+
+    // Capacity of each writer's ring, rounded up to a power of two
+    @Value("${leaderboard.ingestion.queue-capacity:65536}")
+    private int queueCapacity;
+
+    // Submissions a writer takes from its ring and records at once; a batch
+    // submission brings all of its scores for the writer's games
+    @Value("${leaderboard.ingestion.batch-size:1024}")
+    private int batchSize;
+
+    // How long a batch submission waits for its queued scores to be recorded
+    @Value("${leaderboard.ingestion.record-timeout-ms:30000}")
+    private long recordTimeoutMs;
+
+    /**
+     * Scores queued together for one writer.
+     *
+     * @param completion completed once the scores are recorded; null if nobody
+     *                   waits for them
+     */
+    private record Task(List<ScoreEntry> scores, CompletableFuture<Void> completion) {
+    }
+
+    private Writer[] writers = new Writer[0];
+    private final AtomicLong acceptedScores = new AtomicLong();
+    private final AtomicLong rejectedScores = new AtomicLong();
+    private final AtomicLong failedScores = new AtomicLong();
+    // Submissions between their running check and their offer; stop() waits
+    // for them before letting the writers finish, so that nothing is queued
+    // after a writer's last drain
+    private final AtomicInteger submitting = new AtomicInteger();
+    // Cleared by stop(); no submission is accepted afterwards
+    private volatile boolean running = true;
+    // Set by stop() once no submission can still be queued; writers exit when
+    // it is set and their ring is empty
+    private volatile boolean closed;
+
+    @Autowired
+    public IngestionPipeline(GlobalLeaderboardManager leaderboardManager) {
+        this.leaderboardManager = leaderboardManager;
+    }
+
+    @PostConstruct
+    public void start() {
+        if (!async) {
+            return;
+        }
+        writers = new Writer[Math.max(1, writerCount)];
+        for (int i = 0; i < writers.length; i++) {
+            writers[i] = new Writer(new MpscRingBuffer<>(queueCapacity));
+            Thread thread = new Thread(writers[i], "ScoreIngestionWriter-" + (i + 1));
+            thread.setDaemon(true);
+            writers[i].thread = thread;
+            thread.start();
+        }
+        logger.info("Asynchronous ingestion started with {} writers of capacity {}", writers.length,
+                writers[0].ring.capacity());
+    }
+
+    /**
+     * Stops accepting scores, waits for submissions already past their check to
+     * finish queuing, and then waits for the writers to apply everything
+     * queued. Runs before the leaderboard manager shuts down, which
+     * depends on it.
+     */
+    @PreDestroy
+    public void stop() {
+        running = false;
+        long deadline = System.nanoTime() + STOP_SUBMIT_WAIT_NANOS;
+        while (submitting.get() > 0 && System.nanoTime() < deadline) {
+            LockSupport.parkNanos(IDLE_PARK_NANOS);
+        }
+        closed = true;
+        for (Writer writer : writers) {
+            LockSupport.unpark(writer.thread);
+        }
+        for (Writer writer : writers) {
+            try {
+                writer.thread.join(TimeUnit.SECONDS.toMillis(10));
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                return;
+            }
+        }
+    }
+
+    public boolean isAsync() {
+        return async;
+    }
+
+    /**
+     * Queues a validated score for its game's writer.
+     *
+     * @throws IngestionQueueFullException if the writer's queue is full
+     */
+    public void submit(ScoreEntry scoreEntry) {
+        submitting.incrementAndGet();
+        try {
+            checkRunning();
+            Writer writer = writers[writerOf(scoreEntry.gameId())];
+            if (!writer.offer(new Task(List.of(scoreEntry), null))) {
+                rejectedScores.incrementAndGet();
+                throw new IngestionQueueFullException(
+                        "Ingestion queue for game " + scoreEntry.gameId() + " is full, retry later");
+            }
+            acceptedScores.incrementAndGet();
+        } finally {
+            submitting.decrementAndGet();
+        }
+    }
+
+    /**
+     * Queues a batch of validated scores, each game's share for the game's
+     * writer, and waits until the queued ones are recorded.
+     *
+     * @return positions in scoreEntries of the scores that were not queued
+     *         because their writer's queue was full
+     * @throws RuntimeException if queued scores could not be recorded, or were
+     *                          not recorded within the record timeout
+     */
+    public List<Integer> recordAll(List<ScoreEntry> scoreEntries) {
+        List<List<ScoreEntry>> shares = new ArrayList<>(writers.length);
+        List<List<Integer>> positions = new ArrayList<>(writers.length);
+        for (int i = 0; i < writers.length; i++) {
+            shares.add(new ArrayList<>());
+            positions.add(new ArrayList<>());
+        }
+        for (int position = 0; position < scoreEntries.size(); position++) {
+            int writer = writerOf(scoreEntries.get(position).gameId());
+            shares.get(writer).add(scoreEntries.get(position));
+            positions.get(writer).add(position);
+        }
+
+        List<Integer> rejected = new ArrayList<>();
+        List<CompletableFuture<Void>> completions = new ArrayList<>(writers.length);
+        submitting.incrementAndGet();
+        try {
+            checkRunning();
+            for (int i = 0; i < writers.length; i++) {
+                List<ScoreEntry> share = shares.get(i);
+                if (share.isEmpty()) {
+                    continue;
+                }
+                Task task = new Task(share, new CompletableFuture<>());
+                if (writers[i].offer(task)) {
+                    acceptedScores.addAndGet(share.size());
+                    completions.add(task.completion());
+                } else {
+                    rejectedScores.addAndGet(share.size());
+                    rejected.addAll(positions.get(i));
+                }
+            }
+        } finally {
+            submitting.decrementAndGet();
+        }
+
+        long deadline = System.nanoTime() + TimeUnit.MILLISECONDS.toNanos(recordTimeoutMs);
+        try {
+            for (CompletableFuture<Void> completion : completions) {
+                completion.get(Math.max(0, deadline - System.nanoTime()), TimeUnit.NANOSECONDS);
+            }
+        } catch (ExecutionException e) {
+            throw new RuntimeException("Failed to record scores", e.getCause());
+        } catch (TimeoutException e) {
+            throw new RuntimeException("Timed out after " + recordTimeoutMs + " ms waiting for scores to be recorded",
+                    e);
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            throw new RuntimeException("Interrupted while waiting for scores to be recorded", e);
+        }
+        return rejected;
+    }
+
+    private void checkRunning() {
+        if (!running) {
+            throw new IllegalStateException("Ingestion pipeline is stopped");
+        }
+    }
+
+    /**
+     * @return submissions queued and not yet taken by a writer; a batch's share
+     *         for one writer counts once
+     */
+    public long queueDepth() {
+        long depth = 0;
+        for (Writer writer : writers) {
+            depth += writer.ring.size();
+        }
+        return depth;
+    }
+
+    /**
+     * @return depth of the fullest writer's queue; a game sharded onto it is
+     *         rejected once it reaches the per-writer capacity
+     */
+    public long maxWriterQueueDepth() {
+        long depth = 0;
+        for (Writer writer : writers) {
+            depth = Math.max(depth, writer.ring.size());
+        }
+        return depth;
+    }
+
+    /**
+     * @return capacity of each writer's queue; 0 when ingestion is synchronous
+     */
+    public long writerQueueCapacity() {
+        return writers.length == 0 ? 0 : writers[0].ring.capacity();
+    }
+
+    public int writerCount() {
+        return writers.length;
+    }
+
+    private int writerOf(long gameId) {
+        return Math.floorMod(Long.hashCode(gameId), writers.length);
+    }
+
+    public long acceptedScores() {
+        return acceptedScores.get();
+    }
+
+    public long rejectedScores() {
+        return rejectedScores.get();
+    }
+
+    /**
+     * @return accepted scores that a writer failed to record
+     */
+    public long failedScores() {
+        return failedScores.get();
+    }
+
+    private final class Writer implements Runnable {
+        private final MpscRingBuffer<Task> ring;
+        // Set while parked on an empty ring, so offer() knows to wake it
+        private volatile boolean idle;
+        private Thread thread;
+
+        private Writer(MpscRingBuffer<Task> ring) {
+            this.ring = ring;
+        }
+
+        private boolean offer(Task task) {
+            if (!ring.offer(task)) {
+                return false;
+            }
+            if (idle) {
+                LockSupport.unpark(thread);
+            }
+            return true;
+        }
+
+        @Override
+        public void run() {
+            List<Task> tasks = new ArrayList<>(batchSize);
+            List<ScoreEntry> batch = new ArrayList<>(batchSize);
+            while (true) {
+                if (ring.drainTo(tasks, Math.max(1, batchSize)) == 0) {
+                    if (!closed) {
+                        idle = true;
+                        // Re-checked after announcing idle, so a submission in
+                        // between is not slept through
+                        if (ring.size() == 0) {
+                            LockSupport.parkNanos(IDLE_PARK_NANOS);
+                        }
+                        idle = false;
+                        continue;
+                    }
+                    // A submission may have been queued between the drain above
+                    // and closing; none can be queued after it
+                    if (ring.drainTo(tasks, Math.max(1, batchSize)) == 0) {
+                        return;
+                    }
+                }
+                for (Task task : tasks) {
+                    batch.addAll(task.scores());
+                }
+                try {
+                    leaderboardManager.recordScores(batch);
+                    for (Task task : tasks) {
+                        if (task.completion() != null) {
+                            task.completion().complete(null);
+                        }
+                    }
+                } catch (RuntimeException e) {
+                    failedScores.addAndGet(batch.size());
+                    logger.error("Failed to record {} queued scores", batch.size(), e);
+                    for (Task task : tasks) {
+                        if (task.completion() != null) {
+                            task.completion().completeExceptionally(e);
+                        }
+                    }
+                } finally {
+                    tasks.clear();
+                    batch.clear();
+                }
+            }
+        }
+    }
+}
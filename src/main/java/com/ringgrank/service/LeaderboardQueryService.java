@@ -1,37 +1,162 @@
 package com.ringgrank.service;
 
+import java.io.ByteArrayOutputStream;
 import java.util.ArrayList;
+import java.util.LinkedHashSet;
 import java.util.List;
+import java.util.Set;
+import java.util.concurrent.atomic.AtomicLong;
 
 import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.stereotype.Service;
 
+import com.fasterxml.jackson.core.JsonProcessingException;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.fasterxml.jackson.databind.ObjectWriter;
 import com.ringgrank.dto.LeaderboardEntryResponse;
 import com.ringgrank.dto.UserRankResponse;
+import com.ringgrank.dto.UserRanksResponse;
 import com.ringgrank.exception.GameNotFoundException;
+import com.ringgrank.exception.InvalidWindowException;
 import com.ringgrank.exception.UserNotFoundInLeaderboardException;
+import com.ringgrank.exception.WindowBackfillInProgressException;
 import com.ringgrank.model.GameLeaderboardSet;
 import com.ringgrank.model.Leaderboard;
+import com.ringgrank.model.RankLookup;
+import com.ringgrank.model.RankRange;
 import com.ringgrank.model.ScoreEntry;
+import com.ringgrank.model.TopKView;
 
 @Service
 public class LeaderboardQueryService {
+    // ETags number the encoded views; the start time keeps a number from an
+    // earlier run from matching
+    private static final String ETAG_PREFIX = Long.toString(System.currentTimeMillis(), 36);
+
     private final GlobalLeaderboardManager leaderboardManager;
+    private final ObjectWriter entryWriter;
+    private final AtomicLong encodedViews = new AtomicLong();
+
+    /**
+     * A list of leaderboard entries encoded as JSON.
+     *
+     * @param etag  identifies the top view the list was encoded from; null if
+     *              the list was not taken from a view
+     * @param json  JSON array holding at least the requested entries
+     * @param start offset of the first requested entry in json
+     * @param end   offset just past the last requested entry in json
+     */
+    public record EncodedLeaders(String etag, byte[] json, int start, int end) {
+
+        /**
+         * @return the JSON array of the requested entries
+         */
+        public byte[] body() {
+            if (start == 1 && end == json.length - 1) {
+                return json;
+            }
+            byte[] body = new byte[end - start + 2];
+            body[0] = '[';
+            System.arraycopy(json, start, body, 1, end - start);
+            body[body.length - 1] = ']';
+            return body;
+        }
+    }
+
+    /**
+     * A top view encoded once as a JSON array.
+     *
+     * @param entryEnds offset just past each entry's JSON object; entries i to
+     *                  j are the bytes from just past entry i - 1 and its comma
+     *                  up to entryEnds[j]
+     */
+    private record EncodedView(String etag, byte[] json, int[] entryEnds) {
+
+        private int entryStart(int index) {
+            return index == 0 ? 1 : entryEnds[index - 1] + 1;
+        }
+    }
 
     @Autowired
-    public LeaderboardQueryService(GlobalLeaderboardManager leaderboardManager) {
+    public LeaderboardQueryService(GlobalLeaderboardManager leaderboardManager, ObjectMapper objectMapper) {
         this.leaderboardManager = leaderboardManager;
+        this.entryWriter = objectMapper.writerFor(LeaderboardEntryResponse.class);
     }
 
-    public List<LeaderboardEntryResponse> getTopKLeaders(long gameId, int limit, String window) {
-        GameLeaderboardSet gameSet = getGameLeaderboardSet(gameId);
-        Leaderboard leaderboard = gameSet.getLeaderboard(window);
+    /**
+     * Returns the entries ranked offset + 1 to offset + limit, already encoded.
+     * Each top view is encoded once; a range inside it copies a slice of those
+     * bytes, and its ETag changes only when the view does. A range reaching
+     * past the view seeks to its first rank in the sorted index and is encoded
+     * on its own.
+     */
+    public EncodedLeaders getLeadersJson(long gameId, int offset, int limit, String window) {
+        Leaderboard leaderboard = getLeaderboard(gameId, window);
 
-        List<ScoreEntry> topK = leaderboard.getTopK(limit);
-        int rank = 1;
+        if ((long) offset + limit > Leaderboard.TOP_VIEW_SIZE) {
+            RankRange range = new RankRange(offset + 1, leaderboard.getRange(offset + 1, limit));
+            byte[] json = encode(toResponses(range), new int[0]);
+            return new EncodedLeaders(null, json, 1, json.length - 1);
+        }
+        EncodedView encoded = leaderboard.getTopKView().derive(EncodedView.class, this::encodeView);
+        int size = encoded.entryEnds().length;
+        int from = Math.min(offset, size);
+        int to = Math.min(offset + limit, size);
+        if (from == to) {
+            return new EncodedLeaders(encoded.etag(), encoded.json(), 1, 1);
+        }
+        return new EncodedLeaders(encoded.etag(), encoded.json(), encoded.entryStart(from),
+                encoded.entryEnds()[to - 1]);
+    }
+
+    /**
+     * Returns the user and up to radius players ranked directly above and below
+     * them.
+     */
+    public List<LeaderboardEntryResponse> getNeighbors(long gameId, long userId, int radius, String window) {
+        Leaderboard leaderboard = getLeaderboard(gameId, window);
+
+        RankRange neighbors = leaderboard.getNeighbors(userId, radius);
+        if (neighbors == null) {
+            throw new UserNotFoundInLeaderboardException(
+                    "User " + userId + " not found in leaderboard for game " + gameId);
+        }
+        return toResponses(neighbors);
+    }
+
+    private EncodedView encodeView(TopKView view) {
+        List<LeaderboardEntryResponse> responses = toResponses(new RankRange(1, view.entries()));
+        int[] entryEnds = new int[responses.size()];
+        byte[] json = encode(responses, entryEnds);
+        return new EncodedView("\"" + ETAG_PREFIX + "-" + encodedViews.incrementAndGet() + "\"", json, entryEnds);
+    }
 
-        List<LeaderboardEntryResponse> responses = new ArrayList<>();
-        for (ScoreEntry entry : topK) {
+    // Encodes the responses as a JSON array, recording where each one ends
+    private byte[] encode(List<LeaderboardEntryResponse> responses, int[] entryEnds) {
+        ByteArrayOutputStream out = new ByteArrayOutputStream(64 * responses.size() + 2);
+        out.write('[');
+        try {
+            for (int i = 0; i < responses.size(); i++) {
+                if (i > 0) {
+                    out.write(',');
+                }
+                out.writeBytes(entryWriter.writeValueAsBytes(responses.get(i)));
+                if (i < entryEnds.length) {
+                    entryEnds[i] = out.size();
+                }
+            }
+        } catch (JsonProcessingException e) {
+            throw new IllegalStateException("Failed to encode leaderboard entries", e);
+        }
+        out.write(']');
+        return out.toByteArray();
+    }
+
+    private List<LeaderboardEntryResponse> toResponses(RankRange range) {
+        int rank = range.firstRank();
+
+        List<LeaderboardEntryResponse> responses = new ArrayList<>(range.entries().size());
+        for (ScoreEntry entry : range.entries()) {
             responses.add(new LeaderboardEntryResponse(
                     entry.userId(),
                     entry.score(),
@@ -39,12 +164,20 @@ public class LeaderboardQueryService {
                     rank));
             rank++;
         }
-        return responses;
+        return List.copyOf(responses);
     }
 
     public UserRankResponse getUserRank(long gameId, long userId, String window) {
-        GameLeaderboardSet gameSet = getGameLeaderboardSet(gameId);
-        Leaderboard leaderboard = gameSet.getLeaderboard(window);
+        return getUserRank(gameId, userId, window, false);
+    }
+
+    /**
+     * @param approximate answer from the leaderboard's score histogram instead of
+     *                    the sorted index. Falls back to the exact rank when the
+     *                    leaderboard has no histogram.
+     */
+    public UserRankResponse getUserRank(long gameId, long userId, String window, boolean approximate) {
+        Leaderboard leaderboard = getLeaderboard(gameId, window);
 
         ScoreEntry userScore = leaderboard.getUserScore(userId);
         if (userScore == null) {
@@ -52,8 +185,15 @@ public class LeaderboardQueryService {
                     "User " + userId + " not found in leaderboard for game " + gameId);
         }
 
-        int rank = leaderboard.getUserRank(userId);
-        int totalPlayers = leaderboard.getTotalPlayers();
+        int rank;
+        int totalPlayers;
+        if (approximate) {
+            rank = leaderboard.getApproximateUserRank(userId);
+            totalPlayers = leaderboard.getApproximateTotalPlayers();
+        } else {
+            rank = leaderboard.getUserRank(userId);
+            totalPlayers = leaderboard.getTotalPlayers();
+        }
         double percentile = calculatePercentile(rank, totalPlayers);
 
         return new UserRankResponse(
@@ -64,6 +204,43 @@ public class LeaderboardQueryService {
                 userScore.timestamp());
     }
 
+    /**
+     * Looks up the exact ranks of several users in one pass over the
+     * leaderboard (see {@link Leaderboard#getUserRanks}). Duplicate user IDs are
+     * answered once.
+     */
+    public UserRanksResponse getUserRanks(long gameId, List<Long> userIds, String window) {
+        Leaderboard leaderboard = getLeaderboard(gameId, window);
+
+        Set<Long> requested = new LinkedHashSet<>(userIds);
+        RankLookup lookup = leaderboard.getUserRanks(requested);
+        List<UserRankResponse> ranks = new ArrayList<>(lookup.entries().size());
+        for (int i = 0; i < lookup.ranks().length; i++) {
+            ScoreEntry entry = lookup.entries().get(i);
+            requested.remove(entry.userId());
+            ranks.add(new UserRankResponse(
+                    entry.userId(),
+                    lookup.ranks()[i],
+                    entry.score(),
+                    calculatePercentile(lookup.ranks()[i], lookup.totalPlayers()),
+                    entry.timestamp()));
+        }
+        return new UserRanksResponse(ranks, new ArrayList<>(requested));
+    }
+
+    private Leaderboard getLeaderboard(long gameId, String window) {
+        GameLeaderboardSet gameSet = getGameLeaderboardSet(gameId);
+        Leaderboard leaderboard = gameSet.getLeaderboard(window);
+        if (leaderboard == null) {
+            throw new InvalidWindowException("Window " + window + " is not configured for game " + gameId);
+        }
+        if (gameSet.isBackfilling(window)) {
+            throw new WindowBackfillInProgressException(
+                    "Window " + window + " of game " + gameId + " is still being backfilled");
+        }
+        return leaderboard;
+    }
+
     private GameLeaderboardSet getGameLeaderboardSet(long gameId) {
         GameLeaderboardSet gameSet = leaderboardManager.getGameLeaderboardSet(gameId);
         if (gameSet == null) {
@@ -72,9 +249,11 @@ public class LeaderboardQueryService {
         return gameSet;
     }
 
-    private double calculatePercentile(int rank, int totalPlayers) {
+    static double calculatePercentile(int rank, int totalPlayers) {
         if (totalPlayers == 0)
             return 0.0;
+        // An approximate rank can briefly exceed a concurrently read player count
+        rank = Math.min(rank, totalPlayers);
         return ((totalPlayers - rank + 1) * 100.0) / totalPlayers;
     }
 }
\ No newline at end of file
@@ -0,0 +1,156 @@
+package com.ringgrank.service;
+
+import java.util.ArrayList;
+import java.util.LinkedHashSet;
+import java.util.List;
+import java.util.TreeSet;
+import java.util.concurrent.ArrayBlockingQueue;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.CompletionException;
+import java.util.concurrent.ThreadPoolExecutor;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicInteger;
+
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Service;
+
+import com.ringgrank.dto.GameRanksResponse;
+import com.ringgrank.dto.PlayerRanksResponse;
+import com.ringgrank.dto.WindowRankResponse;
+import com.ringgrank.exception.GameNotFoundException;
+import com.ringgrank.model.GameLeaderboardSet;
+import com.ringgrank.model.Leaderboard;
+import com.ringgrank.model.RankLookup;
+import com.ringgrank.model.ScoreEntry;
+
+import jakarta.annotation.PostConstruct;
+import jakarta.annotation.PreDestroy;
+
+/**
+ * Answers a player's rank in every leaderboard of one or more games in one
+ * call. Each leaderboard is looked up as its own task on a bounded executor,
+ * so the lookups of a profile screen run concurrently instead of one request
+ * per window and game.
+ */
+@Service
+public class PlayerRankService {
+    private final GlobalLeaderboardManager leaderboardManager;
+
+    // Threads looking up ranks; 0 uses one per available processor
+    @Value("${leaderboard.query.rank-threads:0}")
+    private int rankThreads;
+
+    // Lookups waiting for a thread; beyond this the request thread runs them
+    // itself
+    @Value("${leaderboard.query.rank-queue-capacity:1024}")
+    private int rankQueueCapacity;
+
+    private ThreadPoolExecutor rankExecutor;
+
+    private record WindowLookup(String window, CompletableFuture<RankLookup> lookup) {
+    }
+
+    @Autowired
+    public PlayerRankService(GlobalLeaderboardManager leaderboardManager) {
+        this.leaderboardManager = leaderboardManager;
+    }
+
+    @PostConstruct
+    public void start() {
+        int threads = rankThreads > 0 ? rankThreads : Runtime.getRuntime().availableProcessors();
+        AtomicInteger threadNumber = new AtomicInteger();
+        rankExecutor = new ThreadPoolExecutor(threads, threads, 0, TimeUnit.MILLISECONDS,
+                new ArrayBlockingQueue<>(Math.max(1, rankQueueCapacity)),
+                runnable -> {
+                    Thread thread = new Thread(runnable, "RankQuery-" + threadNumber.incrementAndGet());
+                    thread.setDaemon(true);
+                    return thread;
+                },
+                new ThreadPoolExecutor.CallerRunsPolicy());
+    }
+
+    @PreDestroy
+    public void stop() {
+        rankExecutor.shutdownNow();
+    }
+
+    /**
+     * Returns the user's rank in the all-time leaderboard and every window of
+     * each game. Windows still being backfilled and leaderboards without a score
+     * of the user are left out; unknown games are listed separately.
+     */
+    public PlayerRanksResponse getPlayerRanks(long userId, List<Long> gameIds) {
+        List<Long> gamesNotFound = new ArrayList<>();
+        List<Long> foundGameIds = new ArrayList<>();
+        List<List<WindowLookup>> gameLookups = new ArrayList<>();
+        for (long gameId : new LinkedHashSet<>(gameIds)) {
+            GameLeaderboardSet gameSet = leaderboardManager.getGameLeaderboardSet(gameId);
+            if (gameSet == null) {
+                gamesNotFound.add(gameId);
+                continue;
+            }
+            foundGameIds.add(gameId);
+            gameLookups.add(submitLookups(gameSet, userId));
+        }
+
+        List<GameRanksResponse> games = new ArrayList<>(foundGameIds.size());
+        try {
+            for (int i = 0; i < foundGameIds.size(); i++) {
+                List<WindowRankResponse> ranks = new ArrayList<>();
+                for (WindowLookup windowLookup : gameLookups.get(i)) {
+                    RankLookup lookup = windowLookup.lookup().join();
+                    if (lookup.entries().isEmpty()) {
+                        continue;
+                    }
+                    ScoreEntry entry = lookup.entries().get(0);
+                    ranks.add(new WindowRankResponse(
+                            windowLookup.window(),
+                            lookup.ranks()[0],
+                            entry.score(),
+                            LeaderboardQueryService.calculatePercentile(lookup.ranks()[0], lookup.totalPlayers()),
+                            entry.timestamp()));
+                }
+                games.add(new GameRanksResponse(foundGameIds.get(i), ranks));
+            }
+        } catch (CompletionException e) {
+            if (e.getCause() instanceof RuntimeException cause) {
+                throw cause;
+            }
+            throw e;
+        }
+        return new PlayerRanksResponse(userId, games, gamesNotFound);
+    }
+
+    /**
+     * Returns the user's rank in the all-time leaderboard and every window of
+     * one game.
+     *
+     * @throws GameNotFoundException if the game does not exist
+     */
+    public GameRanksResponse getGameRanks(long gameId, long userId) {
+        PlayerRanksResponse ranks = getPlayerRanks(userId, List.of(gameId));
+        if (ranks.games().isEmpty()) {
+            throw new GameNotFoundException("Game " + gameId + " not found");
+        }
+        return ranks.games().get(0);
+    }
+
+    // The all-time leaderboard first, then the windows by key
+    private List<WindowLookup> submitLookups(GameLeaderboardSet gameSet, long userId) {
+        List<String> windows = new ArrayList<>();
+        windows.add(null);
+        windows.addAll(new TreeSet<>(gameSet.getWindowDurations().keySet()));
+
+        List<WindowLookup> lookups = new ArrayList<>(windows.size());
+        for (String window : windows) {
+            Leaderboard leaderboard = gameSet.getLeaderboard(window);
+            if (leaderboard == null || gameSet.isBackfilling(window)) {
+                continue;
+            }
+            lookups.add(new WindowLookup(window,
+                    CompletableFuture.supplyAsync(() -> leaderboard.getUserRanks(List.of(userId)), rankExecutor)));
+        }
+        return lookups;
+    }
+}
@@ -1,21 +1,45 @@
 package com.ringgrank.service;
 
+import java.io.BufferedReader;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.nio.charset.StandardCharsets;
 import java.time.Instant;
+import java.util.ArrayList;
+import java.util.List;
 
 import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.stereotype.Service;
 
+import com.fasterxml.jackson.core.JsonProcessingException;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.fasterxml.jackson.databind.ObjectReader;
+import com.ringgrank.dto.BatchScoreSubmissionResponse;
+import com.ringgrank.dto.IngestionMetricsResponse;
 import com.ringgrank.dto.ScoreSubmissionRequest;
 import com.ringgrank.exception.InvalidScoreException;
 import com.ringgrank.model.ScoreEntry;
 
 @Service
 public class ScoreIngestionService {
+    // Items of a batch submission validated and recorded together: one WAL
+    // append and one write lock per leaderboard
+    private static final int BATCH_CHUNK_SIZE = 4096;
+
     private final GlobalLeaderboardManager leaderboardManager;
+    private final IngestionPipeline ingestionPipeline;
+    private final ObjectReader scoreReader;
+
+    private record BatchItem(int index, ScoreSubmissionRequest request) {
+    }
 
     @Autowired
-    public ScoreIngestionService(GlobalLeaderboardManager leaderboardManager) {
+    public ScoreIngestionService(GlobalLeaderboardManager leaderboardManager, IngestionPipeline ingestionPipeline,
+            ObjectMapper objectMapper) {
         this.leaderboardManager = leaderboardManager;
+        this.ingestionPipeline = ingestionPipeline;
+        this.scoreReader = objectMapper.readerFor(ScoreSubmissionRequest.class);
     }
 
     public void processScore(ScoreSubmissionRequest request) {
@@ -27,15 +51,130 @@ public class ScoreIngestionService {
                 request.score(),
                 request.timestamp());
 
-        leaderboardManager.recordScore(entry);
+        if (ingestionPipeline.isAsync()) {
+            ingestionPipeline.submit(entry);
+        } else {
+            leaderboardManager.recordScore(entry);
+        }
+    }
+
+    /**
+     * Validates and records a batch of scores. Valid scores are recorded
+     * before returning; with asynchronous ingestion they are recorded by their
+     * games' writers, and scores whose writer's queue is full are rejected.
+     * Rejected scores are reported by their index.
+     */
+    public BatchScoreSubmissionResponse processScores(List<ScoreSubmissionRequest> requests) {
+        List<BatchScoreSubmissionResponse.Rejection> rejections = new ArrayList<>();
+        List<BatchItem> chunk = new ArrayList<>(Math.min(requests.size(), BATCH_CHUNK_SIZE));
+        int accepted = 0;
+        for (int i = 0; i < requests.size(); i++) {
+            chunk.add(new BatchItem(i, requests.get(i)));
+            if (chunk.size() == BATCH_CHUNK_SIZE) {
+                accepted += recordChunk(chunk, rejections);
+            }
+        }
+        accepted += recordChunk(chunk, rejections);
+        return new BatchScoreSubmissionResponse(accepted, rejections.size(), rejections);
+    }
+
+    /**
+     * Like {@link #processScores(List)} for newline-delimited JSON, one score
+     * per line. The stream is recorded chunk by chunk as it is read, so its
+     * size is not limited by memory. Blank lines are skipped; a line that is
+     * not a valid score is rejected on its own.
+     */
+    public BatchScoreSubmissionResponse processScoreStream(InputStream ndjson) throws IOException {
+        List<BatchScoreSubmissionResponse.Rejection> rejections = new ArrayList<>();
+        List<BatchItem> chunk = new ArrayList<>(BATCH_CHUNK_SIZE);
+        int accepted = 0;
+        int index = 0;
+        BufferedReader reader = new BufferedReader(new InputStreamReader(ndjson, StandardCharsets.UTF_8));
+        String line;
+        while ((line = reader.readLine()) != null) {
+            if (line.isBlank()) {
+                continue;
+            }
+            try {
+                chunk.add(new BatchItem(index, scoreReader.readValue(line)));
+            } catch (JsonProcessingException e) {
+                rejections.add(new BatchScoreSubmissionResponse.Rejection(index,
+                        "Malformed score: " + e.getOriginalMessage()));
+            }
+            index++;
+            if (chunk.size() == BATCH_CHUNK_SIZE) {
+                accepted += recordChunk(chunk, rejections);
+            }
+        }
+        accepted += recordChunk(chunk, rejections);
+        return new BatchScoreSubmissionResponse(accepted, rejections.size(), rejections);
+    }
+
+    // Records the chunk's valid items together and clears it; returns how many
+    // were recorded
+    private int recordChunk(List<BatchItem> chunk, List<BatchScoreSubmissionResponse.Rejection> rejections) {
+        long now = Instant.now().toEpochMilli();
+        List<ScoreEntry> entries = new ArrayList<>(chunk.size());
+        List<Integer> indexes = new ArrayList<>(chunk.size());
+        for (BatchItem item : chunk) {
+            ScoreSubmissionRequest request = item.request();
+            String error = request == null ? "Score is required" : validationError(request, now);
+            if (error != null) {
+                rejections.add(new BatchScoreSubmissionResponse.Rejection(item.index(), error));
+                continue;
+            }
+            entries.add(new ScoreEntry(
+                    request.userId(),
+                    request.gameId(),
+                    request.score(),
+                    request.timestamp()));
+            indexes.add(item.index());
+        }
+        chunk.clear();
+        if (entries.isEmpty()) {
+            return 0;
+        }
+        if (!ingestionPipeline.isAsync()) {
+            leaderboardManager.recordScores(entries);
+            return entries.size();
+        }
+        List<Integer> notQueued = ingestionPipeline.recordAll(entries);
+        for (int position : notQueued) {
+            rejections.add(new BatchScoreSubmissionResponse.Rejection(indexes.get(position),
+                    "Ingestion queue is full, retry later"));
+        }
+        return entries.size() - notQueued.size();
+    }
+
+    public IngestionMetricsResponse getIngestionMetrics() {
+        return new IngestionMetricsResponse(
+                ingestionPipeline.isAsync(),
+                ingestionPipeline.writerCount(),
+                ingestionPipeline.queueDepth(),
+                ingestionPipeline.maxWriterQueueDepth(),
+                ingestionPipeline.writerQueueCapacity(),
+                ingestionPipeline.acceptedScores(),
+                ingestionPipeline.rejectedScores(),
+                ingestionPipeline.failedScores());
     }
 
     private void validateScore(ScoreSubmissionRequest request) {
-        if (request.timestamp() > Instant.now().toEpochMilli()) {
-            throw new InvalidScoreException("Score timestamp cannot be in the future");
+        String error = validationError(request, Instant.now().toEpochMilli());
+        if (error != null) {
+            throw new InvalidScoreException(error);
+        }
+    }
+
+    /**
+     * @return why the score is invalid, or null if it is valid
+     */
+    private String validationError(ScoreSubmissionRequest request, long now) {
+        if (request.timestamp() > now) {
+            return "Score timestamp cannot be in the future";
         }
         if (request.score() < 0) {
-            throw new InvalidScoreException("Score cannot be negative");
+            return "Score cannot be negative";
         }
+        return null;
     }
 }
\ No newline at end of file
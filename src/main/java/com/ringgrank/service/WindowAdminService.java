@@ -0,0 +1,94 @@
+package com.ringgrank.service;
+
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Map;
+import java.util.TreeMap;
+
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.stereotype.Service;
+
+import com.ringgrank.dto.ExpiryMetricsResponse;
+import com.ringgrank.dto.WindowResponse;
+import com.ringgrank.exception.GameNotFoundException;
+import com.ringgrank.exception.InvalidWindowException;
+import com.ringgrank.model.GameLeaderboardSet;
+import com.ringgrank.model.Leaderboard;
+import com.ringgrank.model.WindowKeys;
+
+@Service
+public class WindowAdminService {
+    private static final String STATUS_ACTIVE = "ACTIVE";
+    private static final String STATUS_BACKFILLING = "BACKFILLING";
+
+    private final GlobalLeaderboardManager leaderboardManager;
+
+    @Autowired
+    public WindowAdminService(GlobalLeaderboardManager leaderboardManager) {
+        this.leaderboardManager = leaderboardManager;
+    }
+
+    public List<WindowResponse> getWindows(long gameId) {
+        GameLeaderboardSet gameSet = getGameLeaderboardSet(gameId);
+        List<WindowResponse> windows = new ArrayList<>();
+        for (Map.Entry<String, Duration> window : new TreeMap<>(gameSet.getWindowDurations()).entrySet()) {
+            WindowResponse response = toResponse(gameSet, window.getKey(), window.getValue());
+            if (response != null) {
+                windows.add(response);
+            }
+        }
+        return windows;
+    }
+
+    /**
+     * Adds the window to the game; a new window is backfilled in the
+     * background.
+     *
+     * @return true if the window was added, false if the game already had it
+     */
+    public boolean addWindow(long gameId, String window) {
+        Duration duration = WindowKeys.parse(window);
+        return leaderboardManager.addWindow(getGameLeaderboardSet(gameId), window, duration);
+    }
+
+    public WindowResponse getWindow(long gameId, String window) {
+        GameLeaderboardSet gameSet = getGameLeaderboardSet(gameId);
+        Duration duration = gameSet.getWindowDurations().get(window);
+        WindowResponse response = duration == null ? null : toResponse(gameSet, window, duration);
+        if (response == null) {
+            throw new InvalidWindowException("Window " + window + " is not configured for game " + gameId);
+        }
+        return response;
+    }
+
+    public void removeWindow(long gameId, String window) {
+        if (!getGameLeaderboardSet(gameId).removeWindow(window)) {
+            throw new InvalidWindowException("Window " + window + " is not configured for game " + gameId);
+        }
+    }
+
+    public ExpiryMetricsResponse getExpiryMetrics() {
+        GlobalLeaderboardManager.ExpiryLag lag = leaderboardManager.getExpiryLag();
+        return new ExpiryMetricsResponse(lag.wheelLagMs(), lag.oldestOverdueMs(), lag.pendingScores(),
+                lag.scheduledScores(), lag.workers());
+    }
+
+    // Null if the window was removed concurrently
+    private WindowResponse toResponse(GameLeaderboardSet gameSet, String window, Duration duration) {
+        Leaderboard leaderboard = gameSet.getLeaderboard(window);
+        if (leaderboard == null) {
+            return null;
+        }
+        String status = gameSet.isBackfilling(window) ? STATUS_BACKFILLING : STATUS_ACTIVE;
+        return new WindowResponse(window, duration.toSeconds(), status, leaderboard.getTotalPlayers());
+    }
+
+    private GameLeaderboardSet getGameLeaderboardSet(long gameId) {
+        GameLeaderboardSet gameSet = leaderboardManager.getGameLeaderboardSet(gameId);
+        if (gameSet == null) {
+            throw new GameNotFoundException("Game " + gameId + " not found");
+        }
+        return gameSet;
+    }
+}
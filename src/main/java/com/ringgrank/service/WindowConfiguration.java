@@ -0,0 +1,100 @@
+package com.ringgrank.service;
+
+import java.io.IOException;
+import java.io.Reader;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.time.Duration;
+import java.util.Collections;
+import java.util.HashMap;
+import java.util.LinkedHashMap;
+import java.util.Map;
+import java.util.Properties;
+
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Component;
+
+import com.ringgrank.model.WindowKeys;
+
+import jakarta.annotation.PostConstruct;
+
+/**
+ * Windows every game starts with. leaderboard.windows.default applies to all
+ * games; the optional properties file at leaderboard.windows.config-file can
+ * replace it and declare windows per game:
+ *
+ * <pre>
+ * default=24h,7d
+ * game.42=24h,1h
+ * </pre>
+ *
+ * Windows can also be added and removed at runtime through the admin API;
+ * those changes are kept in the snapshot.
+ */
+@Component
+public class WindowConfiguration {
+    private static final String DEFAULT_KEY = "default";
+    private static final String GAME_KEY_PREFIX = "game.";
+
+    private final Logger logger = LoggerFactory.getLogger(WindowConfiguration.class);
+
+    @Value("${leaderboard.windows.default:24h}")
+    private String defaultWindowKeys;
+
+    @Value("${leaderboard.windows.config-file:}")
+    private String configFile;
+
+    private Map<String, Duration> defaultWindows;
+    private final Map<Long, Map<String, Duration>> gameWindows = new HashMap<>();
+
+    @PostConstruct
+    public void load() {
+        defaultWindows = parseWindows(defaultWindowKeys);
+        if (configFile.isBlank()) {
+            return;
+        }
+        Path path = Paths.get(configFile);
+        Properties properties = new Properties();
+        try (Reader reader = Files.newBufferedReader(path)) {
+            properties.load(reader);
+        } catch (IOException e) {
+            throw new IllegalStateException("Failed to read window configuration " + path, e);
+        }
+        for (String key : properties.stringPropertyNames()) {
+            String value = properties.getProperty(key);
+            if (key.equals(DEFAULT_KEY)) {
+                defaultWindows = parseWindows(value);
+            } else if (key.startsWith(GAME_KEY_PREFIX)) {
+                try {
+                    gameWindows.put(Long.parseLong(key.substring(GAME_KEY_PREFIX.length())), parseWindows(value));
+                } catch (NumberFormatException e) {
+                    throw new IllegalStateException("Invalid game id in window configuration: " + key, e);
+                }
+            } else {
+                throw new IllegalStateException("Unknown key in window configuration: " + key);
+            }
+        }
+        logger.info("Loaded window configuration from {}: default {}, {} game overrides", path,
+                defaultWindows.keySet(), gameWindows.size());
+    }
+
+    /**
+     * @return the windows a game is configured with, by window key
+     */
+    public Map<String, Duration> windowsFor(long gameId) {
+        return gameWindows.getOrDefault(gameId, defaultWindows);
+    }
+
+    private static Map<String, Duration> parseWindows(String windowKeys) {
+        Map<String, Duration> windows = new LinkedHashMap<>();
+        for (String windowKey : windowKeys.split(",")) {
+            if (!windowKey.isBlank()) {
+                windows.put(windowKey.trim(), WindowKeys.parse(windowKey.trim()));
+            }
+        }
+        return Collections.unmodifiableMap(windows);
+    }
+}
@@ -0,0 +1,105 @@
+package com.ringgrank.model;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertFalse;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Random;
+import java.util.TreeSet;
+
+import org.junit.jupiter.api.Test;
+
+class ChunkedRankIndexTest {
+    private static final int SLOTS = 20_000;
+
+    // Sort key of each slot; ties are broken by slot number
+    private final int[] keys = new int[SLOTS];
+    private final ChunkedRankIndex index = new ChunkedRankIndex(this::compareSlots);
+    private final TreeSet<Integer> expected = new TreeSet<>(this::compareSlots);
+
+    @Test
+    void ranksAndSeeksLikeASortedSetAfterRandomInsertsAndRemovals() {
+        Random random = new Random(42);
+        // Enough inserts to split chunks, then enough removals to merge them
+        for (int i = 0; i < 60_000; i++) {
+            int slot = random.nextInt(SLOTS);
+            boolean removeBias = i >= 40_000;
+            if (expected.contains(slot)) {
+                if (removeBias || random.nextInt(3) == 0) {
+                    assertTrue(index.remove(slot));
+                    expected.remove(slot);
+                }
+            } else if (!removeBias || random.nextInt(4) == 0) {
+                keys[slot] = random.nextInt(1_000);
+                index.insert(slot);
+                expected.add(slot);
+            }
+            if (i % 10_000 == 9_999) {
+                assertMatchesExpected();
+            }
+        }
+        assertMatchesExpected();
+    }
+
+    @Test
+    void buildFromSortedThenUpdate() {
+        Random random = new Random(7);
+        for (int slot = 0; slot < SLOTS; slot++) {
+            keys[slot] = random.nextInt(100_000);
+            expected.add(slot);
+        }
+        int[] sortedSlots = expected.stream().mapToInt(Integer::intValue).toArray();
+        index.buildFromSorted(sortedSlots, sortedSlots.length);
+        assertMatchesExpected();
+
+        for (int i = 0; i < 5_000; i++) {
+            int slot = random.nextInt(SLOTS);
+            assertTrue(index.remove(slot));
+            expected.remove(slot);
+            keys[slot] = random.nextInt(100_000);
+            index.insert(slot);
+            expected.add(slot);
+        }
+        assertMatchesExpected();
+    }
+
+    @Test
+    void reportsMissingSlots() {
+        keys[1] = 5;
+        index.insert(1);
+
+        assertEquals(-1, index.rankOf(2));
+        assertFalse(index.remove(2));
+        assertFalse(index.cursorAt(2).hasNext());
+        assertTrue(index.remove(1));
+        assertEquals(0, index.size());
+        assertEquals(-1, index.rankOf(1));
+    }
+
+    private void assertMatchesExpected() {
+        List<Integer> sorted = new ArrayList<>(expected);
+        assertEquals(sorted.size(), index.size());
+        for (int rank = 1; rank <= sorted.size(); rank++) {
+            assertEquals(rank, index.rankOf(sorted.get(rank - 1)));
+        }
+        for (int rank = 1; rank <= sorted.size(); rank += 331) {
+            ChunkedRankIndex.Cursor cursor = index.cursorAt(rank);
+            for (int i = rank - 1; i < Math.min(rank + 50, sorted.size()); i++) {
+                assertTrue(cursor.hasNext());
+                assertEquals(sorted.get(i), cursor.nextSlot());
+            }
+        }
+        ChunkedRankIndex.Cursor cursor = index.cursorAt(1);
+        for (Integer slot : sorted) {
+            assertEquals(slot, cursor.nextSlot());
+        }
+        assertFalse(cursor.hasNext());
+    }
+
+    private int compareSlots(int slotA, int slotB) {
+        int keyCompare = Integer.compare(keys[slotA], keys[slotB]);
+        return keyCompare != 0 ? keyCompare : Integer.compare(slotA, slotB);
+    }
+}
@@ -0,0 +1,111 @@
+package com.ringgrank.model;
+
+import static org.junit.jupiter.api.Assertions.assertArrayEquals;
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertNull;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Random;
+import java.util.TreeSet;
+
+import org.junit.jupiter.api.Test;
+
+class CompactLeaderboardTest {
+    private static final long GAME_ID = 7;
+
+    @Test
+    void matchesSortedReferenceAfterRandomUpdatesAndRemovals() {
+        Random random = new Random(42);
+        CompactLeaderboard leaderboard = new CompactLeaderboard(GAME_ID);
+        TreeSet<ScoreEntry> expected = new TreeSet<>();
+        Map<Long, ScoreEntry> current = new HashMap<>();
+
+        for (int i = 0; i < 20_000; i++) {
+            long userId = random.nextInt(3_000);
+            ScoreEntry old = current.get(userId);
+            if (old != null && random.nextInt(4) == 0) {
+                leaderboard.removeScore(old);
+                expected.remove(old);
+                current.remove(userId);
+                continue;
+            }
+            ScoreEntry entry = new ScoreEntry(userId, GAME_ID, random.nextInt(500), i);
+            leaderboard.addOrUpdateScore(entry);
+            if (old != null) {
+                expected.remove(old);
+            }
+            expected.add(entry);
+            current.put(userId, entry);
+        }
+
+        assertEquals(expected.size(), leaderboard.getTotalPlayers());
+        assertArrayEquals(expected.toArray(new ScoreEntry[0]), leaderboard.copyEntries());
+        int rank = 1;
+        for (ScoreEntry entry : expected) {
+            assertEquals(rank++, leaderboard.getUserRank(entry.userId()));
+            assertEquals(entry, leaderboard.getUserScore(entry.userId()));
+        }
+        List<ScoreEntry> ordered = new ArrayList<>(expected);
+        assertEquals(ordered.subList(1_500, 1_550), leaderboard.getRange(1_501, 50));
+    }
+
+    @Test
+    void ignoresRemovalOfReplacedEntry() {
+        CompactLeaderboard leaderboard = new CompactLeaderboard(GAME_ID);
+        ScoreEntry first = new ScoreEntry(1L, GAME_ID, 10, 1);
+        ScoreEntry second = new ScoreEntry(1L, GAME_ID, 20, 2);
+        leaderboard.addOrUpdateScore(first);
+        leaderboard.addOrUpdateScore(second);
+
+        leaderboard.removeScore(first);
+
+        assertEquals(second, leaderboard.getUserScore(1L));
+        leaderboard.removeScore(second);
+        assertNull(leaderboard.getUserScore(1L));
+        assertEquals(-1, leaderboard.getUserRank(1L));
+    }
+
+    // The class doc promises about 39 bytes per player on average while players
+    // are added, and under 40 once loaded from a snapshot
+    @Test
+    void staysWithinMemoryBudgetWhileGrowing() {
+        Random random = new Random(1);
+        CompactLeaderboard leaderboard = new CompactLeaderboard(GAME_ID);
+        double total = 0;
+        double worst = 0;
+        int samples = 0;
+        for (int player = 1; player <= 200_000; player++) {
+            leaderboard.addOrUpdateScore(new ScoreEntry(player, GAME_ID, random.nextInt(1_000_000), player));
+            if (player >= 20_000 && player % 2_500 == 0) {
+                double bytesPerPlayer = (double) leaderboard.footprintBytes() / player;
+                total += bytesPerPlayer;
+                worst = Math.max(worst, bytesPerPlayer);
+                samples++;
+            }
+        }
+        double average = total / samples;
+        assertTrue(average < 40, "average " + average + " bytes per player");
+        assertTrue(worst < 45, "worst " + worst + " bytes per player");
+    }
+
+    @Test
+    void staysUnderFortyBytesPerPlayerAfterSnapshotLoad() {
+        // Just past a user table resize, where the table is emptiest
+        for (int count : new int[] { 98_305, 100_000, 196_609 }) {
+            ScoreEntry[] entries = new ScoreEntry[count];
+            for (int i = 0; i < count; i++) {
+                entries[i] = new ScoreEntry(i, GAME_ID, count - i, 0);
+            }
+            CompactLeaderboard leaderboard = new CompactLeaderboard(GAME_ID);
+            leaderboard.loadEntries(entries, count);
+
+            double bytesPerPlayer = (double) leaderboard.footprintBytes() / count;
+            assertTrue(bytesPerPlayer < 40, count + " players: " + bytesPerPlayer + " bytes per player");
+            assertEquals(count, leaderboard.getUserRank((long) count - 1));
+        }
+    }
+}
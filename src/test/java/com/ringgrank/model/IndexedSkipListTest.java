@@ -0,0 +1,103 @@
+package com.ringgrank.model;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertFalse;
+import static org.junit.jupiter.api.Assertions.assertThrows;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.Comparator;
+import java.util.Iterator;
+import java.util.List;
+import java.util.Random;
+
+import org.junit.jupiter.api.Test;
+
+class IndexedSkipListTest {
+
+    @Test
+    void ranksAndSelectsLikeASortedListAfterRandomInsertsAndRemovals() {
+        Random random = new Random(42);
+        IndexedSkipList<Integer> list = new IndexedSkipList<>(Comparator.naturalOrder());
+        List<Integer> expected = new ArrayList<>();
+
+        for (int i = 0; i < 20_000; i++) {
+            int value = random.nextInt(5_000);
+            int position = Collections.binarySearch(expected, value);
+            if (position >= 0) {
+                assertTrue(list.remove(value));
+                expected.remove(position);
+            } else {
+                list.add(value);
+                expected.add(-position - 1, value);
+            }
+        }
+
+        assertEquals(expected.size(), list.size());
+        for (int rank = 1; rank <= expected.size(); rank++) {
+            Integer value = expected.get(rank - 1);
+            assertEquals(value, list.get(rank));
+            assertEquals(rank, list.rankOf(value));
+            assertEquals(rank - 1, list.countBefore(value));
+        }
+        assertEquals(expected, toList(list.iterator()));
+    }
+
+    @Test
+    void countsValuesThatAreNotPresent() {
+        IndexedSkipList<Integer> list = new IndexedSkipList<>(Comparator.naturalOrder());
+        for (int value = 0; value < 100; value += 10) {
+            list.add(value);
+        }
+
+        assertEquals(-1, list.rankOf(15));
+        assertEquals(2, list.countBefore(15));
+        assertEquals(10, list.countBefore(1_000));
+        assertFalse(list.remove(15));
+    }
+
+    @Test
+    void iteratesFromAnyRank() {
+        IndexedSkipList<Integer> list = new IndexedSkipList<>(Comparator.naturalOrder());
+        Integer[] values = new Integer[1_000];
+        for (int i = 0; i < values.length; i++) {
+            values[i] = i * 2;
+        }
+        list.buildFromSorted(values, values.length);
+
+        assertEquals(List.of(1_000, 1_002, 1_004), toList(list.iteratorFrom(501)).subList(0, 3));
+        assertEquals(List.of(1_998), toList(list.iteratorFrom(1_000)));
+        assertFalse(list.iteratorFrom(1_001).hasNext());
+        assertThrows(IndexOutOfBoundsException.class, () -> list.get(1_001));
+    }
+
+    @Test
+    void buildFromSortedMatchesInsertingOneByOne() {
+        Random random = new Random(7);
+        List<Integer> sorted = new ArrayList<>();
+        for (int i = 0; i < 5_000; i++) {
+            sorted.add(random.nextInt());
+        }
+        sorted = new ArrayList<>(sorted.stream().distinct().sorted().toList());
+        IndexedSkipList<Integer> list = new IndexedSkipList<>(Comparator.naturalOrder());
+        list.buildFromSorted(sorted.toArray(new Integer[0]), sorted.size());
+
+        // Keeps working as an index after the bulk build
+        list.add(Integer.MIN_VALUE);
+        sorted.add(0, Integer.MIN_VALUE);
+        assertTrue(list.remove(sorted.remove(2_500)));
+
+        for (int rank = 1; rank <= sorted.size(); rank += 97) {
+            assertEquals(sorted.get(rank - 1), list.get(rank));
+            assertEquals(rank, list.rankOf(sorted.get(rank - 1)));
+        }
+        assertEquals(sorted, toList(list.iterator()));
+    }
+
+    private static <E> List<E> toList(Iterator<E> iterator) {
+        List<E> values = new ArrayList<>();
+        iterator.forEachRemaining(values::add);
+        return values;
+    }
+}
@@ -0,0 +1,87 @@
+package com.ringgrank.model;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Random;
+
+import org.junit.jupiter.api.Test;
+
+class TimingWheelTest {
+    private static final long TICK_MS = 1_000;
+    private static final long START = 1_000_000_000L;
+
+    @Test
+    void returnsItemsNoEarlierThanDueAndAtMostOneTickLate() {
+        Random random = new Random(42);
+        TimingWheel<Long> wheel = new TimingWheel<>(TICK_MS, START);
+        Map<Long, Long> dueAt = new HashMap<>();
+        // Spans every level, up to about a year
+        long[] horizons = { 10_000L, 3_600_000L, 86_400_000L, 365L * 86_400_000L };
+        for (long item = 0; item < 4_000; item++) {
+            long expiration = START + 1 + (long) (random.nextDouble() * horizons[(int) (item % horizons.length)]);
+            wheel.add(item, expiration);
+            dueAt.put(item, expiration);
+        }
+        assertEquals(dueAt.size(), wheel.size());
+
+        long now = START;
+        long end = START + 366L * 86_400_000L;
+        while (now < end) {
+            // Uneven steps, as when the expiry thread falls behind
+            now += TICK_MS * (1 + random.nextInt(5_000));
+            for (Long item : wheel.advance(now)) {
+                long expiration = dueAt.remove(item);
+                assertTrue(expiration <= now, "item " + item + " returned before it was due");
+                assertTrue(Math.ceilDiv(expiration, TICK_MS) <= now / TICK_MS, "item " + item + " past its tick");
+            }
+            for (long expiration : dueAt.values()) {
+                assertTrue(Math.ceilDiv(expiration, TICK_MS) > now / TICK_MS, "item due at " + expiration
+                        + " not returned by " + now);
+            }
+        }
+        assertTrue(dueAt.isEmpty());
+        assertEquals(0, wheel.size());
+    }
+
+    @Test
+    void returnsItemsOnTheFirstTickAtOrAfterTheirExpiration() {
+        TimingWheel<String> wheel = new TimingWheel<>(TICK_MS, START);
+        wheel.add("exact", START + 5 * TICK_MS);
+        wheel.add("rounded up", START + 5 * TICK_MS + 1);
+
+        assertEquals(List.of(), wheel.advance(START + 4 * TICK_MS));
+        assertEquals(List.of("exact"), wheel.advance(START + 5 * TICK_MS));
+        assertEquals(List.of("rounded up"), wheel.advance(START + 6 * TICK_MS));
+        assertEquals(START + 6 * TICK_MS, wheel.currentTime());
+    }
+
+    @Test
+    void returnsItemsAddedForAPastTimeOnTheNextAdvance() {
+        TimingWheel<String> wheel = new TimingWheel<>(TICK_MS, START);
+        wheel.advance(START + 10 * TICK_MS);
+        wheel.add("late", START + 2 * TICK_MS);
+
+        assertEquals(List.of("late"), wheel.advance(START + 10 * TICK_MS));
+        assertEquals(0, wheel.size());
+    }
+
+    @Test
+    void keepsItemsBeyondItsRangeUntilTheyAreDue() {
+        TimingWheel<String> wheel = new TimingWheel<>(TICK_MS, START);
+        // 64^4 one second ticks is about 194 days
+        long farAway = START + 300L * 86_400_000L;
+        wheel.add("far", farAway);
+
+        List<String> expired = new ArrayList<>();
+        for (long now = START; now < farAway; now += 86_400_000L) {
+            expired.addAll(wheel.advance(now));
+        }
+        assertEquals(List.of(), expired);
+        assertEquals(List.of("far"), wheel.advance(farAway));
+    }
+}
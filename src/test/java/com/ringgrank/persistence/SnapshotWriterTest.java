@@ -0,0 +1,130 @@
+package com.ringgrank.persistence;
+
+import static org.junit.jupiter.api.Assertions.assertArrayEquals;
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertFalse;
+import static org.junit.jupiter.api.Assertions.assertSame;
+import static org.junit.jupiter.api.Assertions.assertThrows;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+
+import java.io.IOException;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+import java.util.Random;
+
+import org.junit.jupiter.api.Test;
+import org.junit.jupiter.api.io.TempDir;
+
+import com.ringgrank.model.GameSnapshot;
+import com.ringgrank.model.ScoreEntry;
+
+class SnapshotWriterTest {
+    // More entries than fit in the 64KB scratch buffer, so columns take several chunks
+    private static final int PLAYERS = 20_000;
+
+    @TempDir
+    Path directory;
+
+    @Test
+    void readsBackWhatWasWritten() throws IOException {
+        for (boolean compress : new boolean[] { false, true }) {
+            List<GameSnapshot> games = List.of(game(1, PLAYERS, new Random(42)), game(2, 0, new Random(7)),
+                    game(3, 500, new Random(9)));
+            Path path = directory.resolve("snapshot-" + compress + ".bin");
+            try (SnapshotWriter writer = new SnapshotWriter(path, 17, compress)) {
+                for (GameSnapshot game : games) {
+                    writer.writeGame(game);
+                }
+                assertEquals(games.size(), writer.commit());
+            }
+
+            List<GameSnapshot> read = new ArrayList<>();
+            SnapshotReader.SnapshotInfo info = SnapshotReader.read(path, read::add);
+
+            assertTrue(SnapshotReader.isSnapshot(path));
+            assertEquals(17, info.walSequence());
+            assertEquals(games.size(), info.games());
+            assertEquals(games.size(), read.size());
+            for (int i = 0; i < games.size(); i++) {
+                assertGameEquals(games.get(i), read.get(i));
+            }
+        }
+    }
+
+    @Test
+    void rejectsCorruptedBody() throws IOException {
+        Path path = directory.resolve("snapshot.bin");
+        try (SnapshotWriter writer = new SnapshotWriter(path, 0, false)) {
+            writer.writeGame(game(1, 100, new Random(42)));
+            writer.commit();
+        }
+        // Flip a byte of the score column, which still decodes but fails the checksum
+        byte[] bytes = Files.readAllBytes(path);
+        int scoreColumn = SnapshotFormat.HEADER_SIZE + 1 + Long.BYTES + Integer.BYTES + 100 * Long.BYTES;
+        bytes[scoreColumn + 3] ^= 0x10;
+        Files.write(path, bytes);
+
+        IOException e = assertThrows(IOException.class, () -> SnapshotReader.read(path, game -> { }));
+        assertTrue(e.getMessage().contains("checksum"), e.getMessage());
+    }
+
+    @Test
+    void rejectsFileThatIsNotASnapshot() throws IOException {
+        Path path = directory.resolve("other.bin");
+        Files.write(path, new byte[64]);
+
+        assertFalse(SnapshotReader.isSnapshot(path));
+        assertThrows(IOException.class, () -> SnapshotReader.read(path, game -> { }));
+    }
+
+    // A window keeps a third of the all-time entries as they are, holds a newer
+    // entry for another third, and lacks the rest
+    private static GameSnapshot game(long gameId, int players, Random random) {
+        ScoreEntry[] allTime = new ScoreEntry[players];
+        List<ScoreEntry> daily = new ArrayList<>();
+        for (int userId = 0; userId < players; userId++) {
+            allTime[userId] = new ScoreEntry(userId, gameId, random.nextInt(1_000_000), random.nextInt(1_000));
+            switch (userId % 3) {
+                case 0 -> daily.add(allTime[userId]);
+                case 1 -> daily.add(new ScoreEntry(userId, gameId, random.nextInt(1_000_000), 1_000 + userId));
+                default -> {
+                }
+            }
+        }
+        Arrays.sort(allTime);
+        ScoreEntry[] window = daily.toArray(new ScoreEntry[0]);
+        Arrays.sort(window);
+        return new GameSnapshot(gameId, allTime, List.of(
+                new GameSnapshot.Window("daily", Duration.ofDays(1), window),
+                new GameSnapshot.Window("hourly", Duration.ofHours(1), new ScoreEntry[0])));
+    }
+
+    private static void assertGameEquals(GameSnapshot expected, GameSnapshot actual) {
+        assertEquals(expected.gameId(), actual.gameId());
+        assertArrayEquals(expected.allTimeEntries(), actual.allTimeEntries());
+        assertEquals(expected.windows().size(), actual.windows().size());
+        for (int i = 0; i < expected.windows().size(); i++) {
+            GameSnapshot.Window expectedWindow = expected.windows().get(i);
+            GameSnapshot.Window actualWindow = actual.windows().get(i);
+            assertEquals(expectedWindow.windowKey(), actualWindow.windowKey());
+            assertEquals(expectedWindow.duration(), actualWindow.duration());
+            assertArrayEquals(expectedWindow.entries(), actualWindow.entries());
+            // Entries shared with the all-time leaderboard are not decoded twice
+            int allTimeIndex = 0;
+            for (ScoreEntry entry : actualWindow.entries()) {
+                while (allTimeIndex < actual.allTimeEntries().length
+                        && actual.allTimeEntries()[allTimeIndex].compareTo(entry) < 0) {
+                    allTimeIndex++;
+                }
+                if (allTimeIndex < actual.allTimeEntries().length
+                        && actual.allTimeEntries()[allTimeIndex].equals(entry)) {
+                    assertSame(actual.allTimeEntries()[allTimeIndex], entry);
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,166 @@
+package com.ringgrank.persistence;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertFalse;
+import static org.junit.jupiter.api.Assertions.assertThrows;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+
+import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.nio.channels.FileChannel;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.StandardOpenOption;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.zip.CRC32C;
+
+import org.junit.jupiter.api.Test;
+import org.junit.jupiter.api.io.TempDir;
+
+import com.ringgrank.model.ScoreEntry;
+
+class WalReaderTest {
+    // Blocks of 3, 4 and 5 records start at these offsets; the file ends at 448
+    private static final int[] BLOCK_RECORDS = { 3, 4, 5 };
+    private static final long SECOND_BLOCK = 128;
+    private static final long THIRD_BLOCK = 272;
+    private static final long FILE_SIZE = 448;
+
+    @TempDir
+    Path directory;
+
+    @Test
+    void replaysEveryRecordInOrder() throws IOException {
+        Path path = writeWal();
+
+        for (boolean activeTail : new boolean[] { false, true }) {
+            List<ScoreEntry> replayed = new ArrayList<>();
+            WalReader.ReplayResult result = WalReader.replay(path, activeTail, collectInto(replayed));
+
+            assertEquals(expectedEntries(12), replayed);
+            assertEquals(12, result.records());
+            assertEquals(FILE_SIZE, result.validBytes());
+            assertFalse(result.truncated());
+            assertEquals(1_000, result.minTimestamp());
+            assertEquals(1_011, result.maxTimestamp());
+        }
+    }
+
+    @Test
+    void truncatesTornTailOfActiveSegment() throws IOException {
+        Path path = writeWal();
+        try (FileChannel channel = FileChannel.open(path, StandardOpenOption.WRITE)) {
+            channel.truncate(FILE_SIZE - 10);
+        }
+
+        List<ScoreEntry> replayed = new ArrayList<>();
+        WalReader.ReplayResult result = WalReader.replay(path, true, collectInto(replayed));
+
+        assertEquals(expectedEntries(7), replayed);
+        assertTrue(result.truncated());
+        assertEquals(THIRD_BLOCK, result.validBytes());
+        assertEquals(THIRD_BLOCK, Files.size(path));
+    }
+
+    @Test
+    void truncatesPartialBlockHeader() throws IOException {
+        Path path = writeWal();
+        Files.write(path, new byte[8], StandardOpenOption.APPEND);
+
+        WalReader.ReplayResult result = WalReader.replay(path, true, collectInto(new ArrayList<>()));
+
+        assertEquals(12, result.records());
+        assertTrue(result.truncated());
+        assertEquals(FILE_SIZE, Files.size(path));
+    }
+
+    @Test
+    void truncatesActiveSegmentAtCorruptBlock() throws IOException {
+        Path path = writeWal();
+        flipByte(path, SECOND_BLOCK + WalFormat.BLOCK_HEADER_SIZE + 5);
+
+        List<ScoreEntry> replayed = new ArrayList<>();
+        WalReader.ReplayResult result = WalReader.replay(path, true, collectInto(replayed));
+
+        // The intact block after the corrupt one is dropped too
+        assertEquals(expectedEntries(3), replayed);
+        assertTrue(result.truncated());
+        assertEquals(SECOND_BLOCK, Files.size(path));
+    }
+
+    @Test
+    void failsOnCorruptBlockInSealedSegmentWithoutTruncating() throws IOException {
+        Path path = writeWal();
+        flipByte(path, SECOND_BLOCK + WalFormat.BLOCK_HEADER_SIZE + 5);
+
+        assertThrows(IOException.class, () -> WalReader.replay(path, false, collectInto(new ArrayList<>())));
+        assertEquals(FILE_SIZE, Files.size(path));
+    }
+
+    @Test
+    void treatsImpossibleRecordCountAsCorruptBlock() throws IOException {
+        Path path = writeWal();
+        try (FileChannel channel = FileChannel.open(path, StandardOpenOption.WRITE)) {
+            ByteBuffer count = ByteBuffer.allocate(4).order(WalFormat.BYTE_ORDER).putInt(0, Integer.MAX_VALUE);
+            channel.write(count, THIRD_BLOCK + 4);
+        }
+
+        WalReader.ReplayResult result = WalReader.replay(path, true, collectInto(new ArrayList<>()));
+
+        assertEquals(7, result.records());
+        assertEquals(THIRD_BLOCK, Files.size(path));
+    }
+
+    @Test
+    void rejectsFileWithoutWalHeader() throws IOException {
+        Path path = directory.resolve("other.wal");
+        Files.write(path, new byte[64]);
+
+        assertThrows(IOException.class, () -> WalReader.replay(path, true, collectInto(new ArrayList<>())));
+        assertEquals(64, Files.size(path));
+    }
+
+    private Path writeWal() throws IOException {
+        ByteBuffer file = ByteBuffer.allocate((int) FILE_SIZE).order(WalFormat.BYTE_ORDER);
+        WalFormat.putFileHeader(file);
+        ByteBuffer block = ByteBuffer.allocate(WalFormat.blockSize(5)).order(WalFormat.BYTE_ORDER);
+        CRC32C crc = new CRC32C();
+        List<ScoreEntry> entries = expectedEntries(12);
+        int next = 0;
+        for (int recordCount : BLOCK_RECORDS) {
+            WalFormat.beginBlock(block);
+            for (int i = 0; i < recordCount; i++) {
+                WalFormat.putRecord(block, entries.get(next++));
+            }
+            WalFormat.sealBlock(block, recordCount, crc);
+            file.put(block);
+        }
+        assertFalse(file.hasRemaining());
+
+        Path path = directory.resolve("scores.wal");
+        Files.write(path, file.array());
+        return path;
+    }
+
+    private static List<ScoreEntry> expectedEntries(int count) {
+        List<ScoreEntry> entries = new ArrayList<>(count);
+        for (int i = 0; i < count; i++) {
+            entries.add(new ScoreEntry(i, i % 3, i * 10L, 1_000 + i));
+        }
+        return entries;
+    }
+
+    private static WalReader.RecordConsumer collectInto(List<ScoreEntry> entries) {
+        return (timestamp, gameId, userId, score) -> entries.add(new ScoreEntry(userId, gameId, score, timestamp));
+    }
+
+    private static void flipByte(Path path, long offset) throws IOException {
+        try (FileChannel channel = FileChannel.open(path, StandardOpenOption.READ, StandardOpenOption.WRITE)) {
+            ByteBuffer value = ByteBuffer.allocate(1);
+            channel.read(value, offset);
+            value.put(0, (byte) (value.get(0) ^ 0xFF)).rewind();
+            channel.write(value, offset);
+        }
+    }
+}
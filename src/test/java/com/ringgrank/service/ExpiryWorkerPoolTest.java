@@ -0,0 +1,147 @@
+package com.ringgrank.service;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertNull;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.TimeUnit;
+
+import org.junit.jupiter.api.Test;
+
+import com.ringgrank.model.Leaderboard;
+import com.ringgrank.model.ScoreEntry;
+import com.ringgrank.model.SkipListLeaderboard;
+
+class ExpiryWorkerPoolTest {
+    private static final int GAMES = 4;
+    private static final int PLAYERS = 2_000;
+
+    private final Map<String, Leaderboard> leaderboards = new HashMap<>();
+
+    @Test
+    void removesDueScoresFromTheirWindows() throws InterruptedException {
+        for (long gameId = 1; gameId <= GAMES; gameId++) {
+            for (String windowKey : List.of("daily", "hourly")) {
+                Leaderboard leaderboard = new SkipListLeaderboard();
+                for (long userId = 0; userId < PLAYERS; userId++) {
+                    leaderboard.addOrUpdateScore(new ScoreEntry(userId, gameId, userId, 0));
+                }
+                leaderboards.put(gameId + "/" + windowKey, leaderboard);
+            }
+        }
+        // A newer score replaces this one before it expires, and must survive
+        ScoreEntry newer = new ScoreEntry(2L, 1, 5_000, 10);
+        leaderboards.get("1/hourly").addOrUpdateScore(newer);
+
+        try (ExpiryWorkerPool pool = new ExpiryWorkerPool(3, this::resolve)) {
+            for (int second = 0; second < 10; second++) {
+                List<GlobalLeaderboardManager.ExpiringScore> due = new ArrayList<>();
+                for (long gameId = 1; gameId <= GAMES; gameId++) {
+                    for (long userId = second; userId < PLAYERS; userId += 10) {
+                        ScoreEntry entry = new ScoreEntry(userId, gameId, userId, 0);
+                        if (userId % 2 == 0) {
+                            due.add(new GlobalLeaderboardManager.ExpiringScore(entry, "hourly"));
+                        }
+                        if (userId % 5 == 0) {
+                            due.add(new GlobalLeaderboardManager.ExpiringScore(entry, "daily"));
+                        }
+                        // The window was removed since the score was scheduled
+                        due.add(new GlobalLeaderboardManager.ExpiringScore(entry, "weekly"));
+                    }
+                }
+                pool.submit(due, 1_000L * second);
+            }
+            awaitDrained(pool);
+        }
+
+        for (long gameId = 1; gameId <= GAMES; gameId++) {
+            Leaderboard hourly = leaderboards.get(gameId + "/hourly");
+            Leaderboard daily = leaderboards.get(gameId + "/daily");
+            for (long userId = 0; userId < PLAYERS; userId++) {
+                if (gameId == 1 && userId == 2) {
+                    assertEquals(newer, hourly.getUserScore(userId));
+                } else {
+                    assertEquals(userId % 2 == 0, hourly.getUserScore(userId) == null, "hourly user " + userId);
+                }
+                assertEquals(userId % 5 == 0, daily.getUserScore(userId) == null, "daily user " + userId);
+            }
+        }
+    }
+
+    @Test
+    void reportsBacklogUntilRemoved() throws InterruptedException {
+        Leaderboard leaderboard = new SkipListLeaderboard();
+        ScoreEntry first = new ScoreEntry(1L, 1, 10, 0);
+        ScoreEntry second = new ScoreEntry(2L, 1, 20, 0);
+        leaderboard.addOrUpdateScore(first);
+        leaderboard.addOrUpdateScore(second);
+        CountDownLatch started = new CountDownLatch(1);
+        CountDownLatch release = new CountDownLatch(1);
+
+        try (ExpiryWorkerPool pool = new ExpiryWorkerPool(2, dueScore -> {
+            started.countDown();
+            awaitUninterruptibly(release);
+            return leaderboard;
+        })) {
+            assertEquals(Long.MAX_VALUE, pool.oldestPendingDueAt());
+            pool.submit(List.of(new GlobalLeaderboardManager.ExpiringScore(first, "daily")), 100);
+            assertTrue(started.await(5, TimeUnit.SECONDS));
+            pool.submit(List.of(new GlobalLeaderboardManager.ExpiringScore(second, "daily")), 200);
+
+            // The stalled batch and the one queued behind it, on the same game's worker
+            assertEquals(2, pool.pendingScores());
+            assertEquals(100, pool.oldestPendingDueAt());
+
+            release.countDown();
+            awaitDrained(pool);
+            assertEquals(Long.MAX_VALUE, pool.oldestPendingDueAt());
+        }
+        assertNull(leaderboard.getUserScore(1L));
+        assertNull(leaderboard.getUserScore(2L));
+    }
+
+    @Test
+    void keepsWorkingAfterAFailedBatch() throws InterruptedException {
+        Leaderboard leaderboard = new SkipListLeaderboard();
+        ScoreEntry entry = new ScoreEntry(1L, 2, 10, 0);
+        leaderboard.addOrUpdateScore(entry);
+
+        try (ExpiryWorkerPool pool = new ExpiryWorkerPool(1, dueScore -> {
+            if (dueScore.scoreEntry().gameId() == 1) {
+                throw new IllegalStateException("resolver failed");
+            }
+            return leaderboard;
+        })) {
+            pool.submit(List.of(new GlobalLeaderboardManager.ExpiringScore(new ScoreEntry(1L, 1, 10, 0), "daily")),
+                    100);
+            pool.submit(List.of(new GlobalLeaderboardManager.ExpiringScore(entry, "daily")), 200);
+            awaitDrained(pool);
+        }
+        assertNull(leaderboard.getUserScore(1L));
+    }
+
+    private Leaderboard resolve(GlobalLeaderboardManager.ExpiringScore dueScore) {
+        return leaderboards.get(dueScore.scoreEntry().gameId() + "/" + dueScore.windowKey());
+    }
+
+    private static void awaitDrained(ExpiryWorkerPool pool) throws InterruptedException {
+        long deadline = System.nanoTime() + TimeUnit.SECONDS.toNanos(10);
+        while (pool.pendingScores() > 0) {
+            assertTrue(System.nanoTime() < deadline, pool.pendingScores() + " scores still pending");
+            Thread.sleep(1);
+        }
+    }
+
+    private static void awaitUninterruptibly(CountDownLatch latch) {
+        try {
+            latch.await();
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+        }
+    }
+}
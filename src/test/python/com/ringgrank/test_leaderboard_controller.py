@@ -1,4 +1,5 @@
 import asyncio
+import json
 import os
 import random
 import time
@@ -40,6 +41,123 @@ def test_score():
     assert response.status_code == 202
 
 
+def test_approx_rank():
+    # The batch endpoint records the score before responding; /scores only
+    # queues it
+    requests.post(f"{BASE_URL}/scores:batch", json=[generate_score_payload()])
+    response = requests.get(
+        f"{BASE_URL}/games/{TARGET_GAME_ID}/users/{ID_POINTER}/rank",
+        params={"precision": "approx"},
+    )
+    assert response.status_code == 200
+    assert response.json()["rank"] >= 1
+
+
+def test_add_window():
+    requests.post(f"{BASE_URL}/scores:batch", json=[generate_score_payload()])
+    response = requests.put(f"{BASE_URL}/admin/games/{TARGET_GAME_ID}/windows/1h")
+    assert response.status_code in (200, 202)
+    assert response.json()["window"] == "1h"
+
+    for _ in range(50):
+        windows = requests.get(f"{BASE_URL}/admin/games/{TARGET_GAME_ID}/windows").json()
+        if any(w["window"] == "1h" and w["status"] == "ACTIVE" for w in windows):
+            break
+        time.sleep(0.1)
+    response = requests.get(f"{BASE_URL}/games/{TARGET_GAME_ID}/leaders", params={"window": "1h"})
+    assert response.status_code == 200
+
+    response = requests.delete(f"{BASE_URL}/admin/games/{TARGET_GAME_ID}/windows/1h")
+    assert response.status_code == 204
+    response = requests.get(f"{BASE_URL}/games/{TARGET_GAME_ID}/leaders", params={"window": "1h"})
+    assert response.status_code == 400
+
+
+def test_batch_score():
+    scores = [generate_score_payload() for _ in range(3)]
+    scores[1]["score"] = -1
+    response = requests.post(f"{BASE_URL}/scores:batch", json=scores)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["accepted"] == 2
+    assert [r["index"] for r in result["rejections"]] == [1]
+
+    ndjson = "\n".join(json.dumps(generate_score_payload()) for _ in range(3))
+    response = requests.post(
+        f"{BASE_URL}/scores:batch",
+        data=ndjson + "\nnot json\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.json()["accepted"] == 3
+    assert response.json()["rejections"][0]["index"] == 3
+
+
+def test_leaders_etag():
+    requests.post(f"{BASE_URL}/scores:batch", json=[generate_score_payload()])
+    url = f"{BASE_URL}/games/{TARGET_GAME_ID}/leaders"
+    response = requests.get(url, params={"limit": 5})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = requests.get(url, params={"limit": 5}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_leaders_page_and_neighbors():
+    url = f"{BASE_URL}/games/{TARGET_GAME_ID}"
+    requests.post(f"{BASE_URL}/scores:batch", json=[generate_score_payload()])
+    top = requests.get(f"{url}/leaders", params={"limit": 20}).json()
+    page = requests.get(f"{url}/leaders", params={"offset": 10, "limit": 10}).json()
+    assert page == top[10:20]
+
+    response = requests.get(f"{url}/users/{ID_POINTER}/neighbors", params={"radius": 2})
+    assert response.status_code == 200
+    neighbors = response.json()
+    assert ID_POINTER in [n["userId"] for n in neighbors]
+    assert [n["rank"] for n in neighbors] == list(
+        range(neighbors[0]["rank"], neighbors[0]["rank"] + len(neighbors))
+    )
+
+
+def test_batch_ranks():
+    requests.post(f"{BASE_URL}/scores:batch", json=[generate_score_payload()])
+    response = requests.post(
+        f"{BASE_URL}/games/{TARGET_GAME_ID}/ranks",
+        json={"userIds": [ID_POINTER, 999999999]},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert [r["userId"] for r in result["ranks"]] == [ID_POINTER]
+    assert result["notFound"] == [999999999]
+
+
+def test_player_ranks_across_windows_and_games():
+    requests.post(f"{BASE_URL}/scores:batch", json=[generate_score_payload()])
+    game = requests.get(f"{BASE_URL}/games/{TARGET_GAME_ID}/users/{ID_POINTER}/ranks")
+    assert game.status_code == 200
+    assert game.json()["ranks"][0]["window"] is None
+    response = requests.get(
+        f"{BASE_URL}/users/{ID_POINTER}/ranks",
+        params={"gameIds": f"{TARGET_GAME_ID},999999999"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert [g["gameId"] for g in result["games"]] == [TARGET_GAME_ID]
+    assert result["gamesNotFound"] == [999999999]
+
+
+def test_ingestion_metrics():
+    before = requests.get(f"{BASE_URL}/admin/metrics/ingestion").json()
+    response = requests.post(f"{BASE_URL}/scores", json=generate_score_payload())
+    assert response.status_code == 202
+    after = requests.get(f"{BASE_URL}/admin/metrics/ingestion").json()
+    if after["async"]:
+        assert after["acceptedScores"] == before["acceptedScores"] + 1
+        assert after["queueDepth"] <= after["writers"] * after["writerQueueCapacity"]
+
+
 def post_score(session: requests.Session, payload: Dict[str, Any]) -> requests.Response:
     """Sends a single score submission request."""
     try: